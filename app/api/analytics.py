@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.core.dependencies import get_current_user
+from typing import Optional
+from datetime import date, datetime, timedelta
+from app.db.session import get_read_db
+from app.db.read_cache import read_cache
+from app.core.dependencies import get_admin_user, get_current_user
 from app.services.analytics_service import AnalyticsService
+from app.services.rollup_service import RollupService
 from app.models.user import User
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
@@ -10,8 +14,39 @@ router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 @router.get("/stats")
 async def get_stats(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get user analytics and statistics"""
-    stats = AnalyticsService.get_user_stats(db, current_user.id)
-    return stats
+    user_id = current_user.id
+    return await read_cache.get(db, user_id, "stats", (),
+                                lambda session: AnalyticsService.get_user_stats(session, user_id))
+
+@router.get("/activity")
+async def get_activity(
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Activity heatmap: 1/0 per day for a calendar year, or for the last
+    365 days by default, with current and longest streak.
+    """
+    if year:
+        start, end = date(year, 1, 1), date(year, 12, 31)
+    else:
+        end = datetime.utcnow().date()
+        start = end - timedelta(days=364)
+    return AnalyticsService.activity_heatmap(db, current_user.id, start, end)
+
+@router.get("/admin/daily")
+async def get_daily_rollups(
+    days: int = Query(90, ge=1, le=366),
+    admin: User = Depends(get_admin_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Cross-user activity per day (admin only): active and new students,
+    explains, confidence distribution, topics created. Reads the daily
+    rollups - one row per day - not the source tables.
+    """
+    return RollupService.daily(db, days)
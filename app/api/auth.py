@@ -4,6 +4,7 @@ from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.db.crud import UserCRUD, TokenCRUD
+from app.db.writer import run_write
 from app.services.google_auth import GoogleAuthService
 from app.core.security import create_access_token
 import secrets
@@ -49,23 +50,28 @@ async def auth_callback(
         # Get user info from Google
         user_info = GoogleAuthService.get_user_info(token_data)
         
-        # Check if user exists
-        user = UserCRUD.get_by_email(db, user_info['email'])
+        def write(db: Session) -> str:
+            # Check if user exists
+            user = UserCRUD.get_by_email(db, user_info['email'])
+            
+            if not user:
+                # Create new user
+                user = UserCRUD.create(db, user_info)
+            else:
+                # Update last login
+                UserCRUD.update_last_login(db, user.id)
+            # Track session
+            AnalyticsService.update_session(db, user.id)
+            
+            # Store/update OAuth token
+            TokenCRUD.create_or_update(db, user.id, token_data)
+            return user.id
         
-        if not user:
-            # Create new user
-            user = UserCRUD.create(db, user_info)
-        else:
-            # Update last login
-            UserCRUD.update_last_login(db, user.id)
-        # ADD THIS LINE - Track session
-        AnalyticsService.update_session(db, user.id)
-        
-        # Store/update OAuth token
-        TokenCRUD.create_or_update(db, user.id, token_data)
+        # Through the single writer on SQLite, like every other write
+        user_id = await run_write(db, write)
         
         # Create session token (JWT)
-        access_token = create_access_token(data={"sub": user.id})
+        access_token = create_access_token(data={"sub": user_id})
         
         # Redirect to dashboard with token in cookie
         response = RedirectResponse(url="/dashboard")
@@ -1,79 +1,76 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from datetime import datetime, date
-from app.db.session import get_db
-from app.models.schedule import Schedule
-from app.models.topic import Topic
+from app.db.session import get_read_db
+from app.models.review_item import ReviewItem
+from app.db.crud import ReviewItemCRUD
+from app.db.read_cache import read_cache
 from app.db.topic_crud import TopicCRUD
 from app.core.dependencies import get_current_user
 from app.models.user import User
 
 router = APIRouter(prefix="/api", tags=["dashboard"])
 
-@router.get("/due-today")
-async def get_due_today(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get schedules and topics due for review today"""
-    
-    # Get current date/time
-    today = date.today()
+def build_due_today(db: Session, user_id: str, today: date) -> dict:
+    """The due-today read model"""
     now = datetime.now()
+    end_of_today = datetime.combine(today, datetime.max.time())
     
-    # ✅ OPTIMIZED: Eager-load topics with schedules (prevents N+1 queries)
-    due_schedules = db.query(Schedule).options(
-        joinedload(Schedule.topic_relation)
-    ).filter(
-        Schedule.user_id == current_user.id,
-        Schedule.start_date <= datetime.combine(today, datetime.max.time()),
-        Schedule.topic_id != None  # Only schedules with linked topics
-    ).all()
+    # Pending review items up to today - range scan on (user_id, due_at),
+    # schedule and topic eager-loaded
+    due_items = ReviewItemCRUD.get_pending_due(db, user_id, end_of_today)
     
     # Get all user's topics for context
-    all_topics = TopicCRUD.get_user_topics(db, current_user.id)
+    all_topics = TopicCRUD.get_user_topics(db, user_id)
     
-    # Build response
+    # Build response - one card per schedule, for its oldest pending review
     reviews_due = []
+    seen_schedules = set()
     
-    for schedule in due_schedules:
-        # ✅ Use eager-loaded topic (already in memory, no extra query)
-        topic = schedule.topic_relation
+    for item in due_items:
+        if item.schedule_id in seen_schedules:
+            continue
+        seen_schedules.add(item.schedule_id)
+        topic = item.topic
         
         # Calculate how overdue (if at all)
-        days_overdue = (now.date() - schedule.start_date.date()).days
+        days_overdue = (now.date() - item.due_at.date()).days
         
         reviews_due.append({
-            "schedule_id": schedule.id,
-            "topic": topic.title if topic else schedule.topic,  # ✅ Fallback to schedule.topic
-            "topic_id": schedule.topic_id,
+            "schedule_id": item.schedule_id,
+            "review_id": item.id,
+            "topic": topic.title if topic else item.schedule.topic,  # ✅ Fallback to schedule.topic
+            "topic_id": item.topic_id,
             "topic_exists": topic is not None,
             "can_explain": topic is not None,
             "confidence": topic.avg_confidence if topic else 0,
             "last_explained": topic.last_explained.isoformat() if topic and topic.last_explained else None,
-            "due_date": schedule.start_date.date().isoformat(),
+            "due_date": item.due_at.date().isoformat(),
             "days_overdue": days_overdue if days_overdue > 0 else 0,
             "status": "overdue" if days_overdue > 0 else "due_today"
         })
     
     # ✅ Topics that need review (exclude if they have FUTURE schedule)
     topics_needing_review = []
-    scheduled_topic_ids = {s.topic_id for s in due_schedules if s.topic_id}
+    scheduled_topic_ids = {item.topic_id for item in due_items if item.topic_id}
+    
+    # ✅ One query for all topics with a future review (was one query per topic)
+    future_topic_ids = {
+        topic_id for (topic_id,) in db.query(ReviewItem.topic_id).filter(
+            ReviewItem.user_id == user_id,
+            ReviewItem.due_at > end_of_today,
+            ReviewItem.status == "pending",
+            ReviewItem.topic_id != None
+        ).all()
+    }
     
     for topic in all_topics:
         # Skip if already in due_schedules
         if topic.id in scheduled_topic_ids:
             continue
         
-        # Check if has future schedule (not due yet)
-        future_schedule = db.query(Schedule).filter(
-            Schedule.topic_id == topic.id,
-            Schedule.user_id == current_user.id,
-            Schedule.start_date > now
-        ).first()
-        
         # If has future schedule, skip
-        if future_schedule:
+        if topic.id in future_topic_ids:
             continue
         
         # If never explained, skip
@@ -100,3 +97,14 @@ async def get_due_today(
         "topics_needing_review": topics_needing_review,
         "total_due": len(reviews_due) + len(topics_needing_review)
     }
+
+@router.get("/due-today")
+async def get_due_today(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get schedules and topics due for review today"""
+    user_id = current_user.id
+    today = date.today()
+    return await read_cache.get(db, user_id, "due_today", today,
+                                lambda session: build_due_today(session, user_id, today))
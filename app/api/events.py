@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from app.core.admission import user_id_from_cookie
+from app.core.config import settings
+from app.db.events import FEEDBACK_CHANNEL, broker, user_channel
+
+router = APIRouter(prefix="/api", tags=["events"])
+
+
+@router.get("/events")
+async def stream_events(request: Request, feedback: bool = False):
+    """
+    Server-sent change events for the signed-in user (and new feedback,
+    with ?feedback=1). Pages refetch when told to instead of polling.
+    The stream holds no DB connection: the user comes from the cookie.
+    """
+    user_id = user_id_from_cookie(request.scope)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    if len(broker) >= settings.SSE_MAX_CLIENTS:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many open event streams",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+        )
+
+    channels = {user_channel(user_id)}
+    if feedback:
+        channels.add(FEEDBACK_CHANNEL)
+    subscription = broker.subscribe(channels)
+
+    async def stream():
+        try:
+            yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+            while True:
+                yield await subscription.next_frame()
+        finally:  # client gone: the response cancels the stream
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,13 +1,18 @@
 from fastapi import APIRouter, Depends, Request, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.feedback import Feedback
 from app.core.dependencies import get_current_user_optional
 from app.services.email_service import EmailService
-import uuid
+from app.db.writer import run_write
+from app.db.events import FEEDBACK_CHANNEL, notify
+from app.db.types import new_id
+import logging
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/feedback", tags=["feedback"])
 
 class FeedbackRequest(BaseModel):
@@ -35,7 +40,7 @@ async def submit_feedback(
     
     # Create feedback record
     feedback = Feedback(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         name=feedback_data.name,
         email=feedback_data.email,
         type=feedback_data.type,
@@ -43,10 +48,13 @@ async def submit_feedback(
         user_id=current_user.id if current_user else None,
         created_at=datetime.utcnow()
     )
+    feedback_id, created_at = feedback.id, feedback.created_at
+    
+    def write(db: Session):
+        db.add(feedback)
+        notify(db, FEEDBACK_CHANNEL, "feedback.created", feedback_id=feedback_id, type=feedback.type)
     
-    db.add(feedback)
-    db.commit()
-    db.refresh(feedback)
+    await run_write(db, write)
     
     # Send email notification to admin
     try:
@@ -55,25 +63,25 @@ async def submit_feedback(
             "name": feedback_data.name,
             "email": feedback_data.email,
             "message": feedback_data.message,
-            "created_at": feedback.created_at.strftime('%Y-%m-%d %H:%M:%S')
+            "created_at": created_at.strftime('%Y-%m-%d %H:%M:%S')
         }
         
         # Send email (async, won't block response)
         await EmailService.send_feedback_notification(notification_data)
         
     except Exception as e:
-        print(f"⚠️ Email notification failed: {str(e)}")
+        logger.warning("Email notification failed: %s", e)
         # Don't fail the request if email fails
     
     return {
         "success": True, 
         "message": "Thank you! Your feedback has been received.",
-        "feedback_id": feedback.id
+        "feedback_id": feedback_id
     }
 
 @router.get("/admin/list")
 async def list_feedback(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_user_optional)
 ):
     """Get all feedback (admin only - add proper auth later)"""
@@ -0,0 +1,68 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from app.db.session import engine
+from app.core.config import settings
+import threading
+import time
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+# Readiness result is cached so probes never hit the DB more than
+# once per READINESS_CACHE_SECONDS, no matter how often they arrive
+_readiness = {"checked_at": None, "ok": False, "error": None}
+_readiness_lock = threading.Lock()
+
+def _is_fresh() -> bool:
+    checked_at = _readiness["checked_at"]
+    return checked_at is not None and time.monotonic() - checked_at < settings.READINESS_CACHE_SECONDS
+
+def check_database() -> dict:
+    """Run a cached, rate-limited SELECT 1 against the connection pool"""
+    if _is_fresh():
+        return _readiness
+
+    # Only one caller refreshes; everyone else reuses the last result
+    # (the very first probe waits so it never reports a stale failure)
+    if not _readiness_lock.acquire(blocking=_readiness["checked_at"] is None):
+        return _readiness
+
+    if _is_fresh():
+        _readiness_lock.release()
+        return _readiness
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        _readiness.update(ok=True, error=None)
+    except Exception as e:
+        _readiness.update(ok=False, error=str(e))
+    finally:
+        _readiness["checked_at"] = time.monotonic()
+        _readiness_lock.release()
+
+    return _readiness
+
+def readiness_payload() -> tuple:
+    """Build the readiness body and status code"""
+    result = check_database()
+    payload = {
+        "status": "ready" if result["ok"] else "unavailable",
+        "environment": settings.ENVIRONMENT,
+        "database": "connected" if result["ok"] else "disconnected",
+        "database_type": "PostgreSQL" if "postgresql" in settings.DATABASE_URL else "SQLite",
+    }
+    if result["error"]:
+        payload["error"] = result["error"]
+    return payload, 200 if result["ok"] else 503
+
+@router.api_route("/live", methods=["GET", "HEAD"])
+async def liveness():
+    """Liveness probe - the process is up and serving requests"""
+    return {"status": "alive"}
+
+@router.api_route("/ready", methods=["GET", "HEAD"])
+def readiness():
+    """Readiness probe - the database pool can serve a query"""
+    payload, status_code = readiness_payload()
+    return JSONResponse(content=payload, status_code=status_code)
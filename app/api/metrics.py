@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+import secrets
+from app.core.config import settings
+from app.core.dependencies import get_admin_user, get_current_user
+from app.core.metrics import render_metrics
+from app.db.session import get_db
+
+router = APIRouter(tags=["monitoring"])
+
+def require_metrics_access(request: Request, db: Session = Depends(get_db)):
+    """A scraper holding METRICS_TOKEN, or a logged-in admin"""
+    if not settings.METRICS_ENDPOINT_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    header = request.headers.get("authorization", "")
+    if settings.METRICS_TOKEN and header.startswith("Bearer ") and secrets.compare_digest(
+            header[7:].encode(), settings.METRICS_TOKEN.encode()):
+        return
+    
+    get_admin_user(get_current_user(request, db))
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+async def metrics():
+    """Prometheus text-format metrics"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -4,8 +4,10 @@ from pydantic import BaseModel, Field
 from datetime import date, datetime, timedelta
 from typing import List, Optional
 
-from app.db.session import get_db
-from app.db.crud import ScheduleCRUD
+from app.db.session import get_db, get_read_db
+from app.db.crud import ScheduleCRUD, ReviewItemCRUD
+from app.db.events import notify, user_channel
+from app.db.writer import run_write
 from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.core.config import settings
@@ -74,21 +76,27 @@ async def create_schedule(
     # Generate review dates
     review_dates = generate_review_dates(start_date, intervals)
     
+    # Store schedule in database (internal tracking only)
+    schedule_data = {
+        'user_id': current_user.id,
+        'topic': request.topic,
+        'topic_id': request.topic_id,
+        'start_date': start_date,
+        'intervals': intervals,
+        'review_dates': review_dates,
+    }
+    
+    def write(db: Session) -> str:
+        schedule_id = ScheduleCRUD.create(db, schedule_data)
+        notify(db, user_channel(schedule_data['user_id']), "schedule.created", schedule_id=schedule_id)
+        return schedule_id
+    
     try:
-        # Store schedule in database (internal tracking only)
-        schedule_data = {
-            'user_id': current_user.id,
-            'topic': request.topic,
-            'topic_id': request.topic_id,
-            'start_date': start_date,
-            'intervals': intervals,
-        }
-        
-        schedule = ScheduleCRUD.create(db, schedule_data)
+        schedule_id = await run_write(db, write)
         
         return {
             'success': True,
-            'schedule_id': schedule.id,
+            'schedule_id': schedule_id,
             'topic': request.topic,
             'start_date': start_date.isoformat(),
             'intervals': intervals,
@@ -104,7 +112,7 @@ async def create_schedule(
 @router.get("/my-schedules")
 async def get_my_schedules(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all schedules for the current user"""
     schedules = ScheduleCRUD.get_by_user(db, current_user.id)
@@ -123,3 +131,66 @@ async def get_my_schedules(
             for s in schedules
         ]
     }
+
+
+@router.post("/reviews/{item_id}/complete")
+async def complete_review(
+    item_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark one scheduled review as done"""
+    user_id = current_user.id
+    
+    def write(db: Session) -> bool:
+        if not ReviewItemCRUD.complete(db, item_id, user_id):
+            return False
+        notify(db, user_channel(user_id), "review.completed", review_id=item_id)
+        return True
+    
+    if not await run_write(db, write):
+        raise HTTPException(status_code=404, detail="Review not found or already completed")
+    
+    return {'success': True, 'review_id': item_id}
+
+
+@router.get("/calendar")
+async def get_review_calendar(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Reviews due between start and end (YYYY-MM-DD, end exclusive; default: the next 30 days)"""
+    try:
+        start_date = datetime.strptime(start, "%Y-%m-%d").date() if start else date.today()
+        end_date = datetime.strptime(end, "%Y-%m-%d").date() if end else start_date + timedelta(days=30)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    
+    if end_date <= start_date or (end_date - start_date).days > 366:
+        raise HTTPException(status_code=400, detail="Range must be between 1 and 366 days")
+    
+    items = ReviewItemCRUD.get_in_range(
+        db,
+        current_user.id,
+        datetime.combine(start_date, datetime.min.time()),
+        datetime.combine(end_date, datetime.min.time())
+    )
+    
+    return {
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'reviews': [
+            {
+                'id': item.id,
+                'schedule_id': item.schedule_id,
+                'topic_id': item.topic_id,
+                'topic': item.schedule.topic,
+                'due_date': item.due_at.date().isoformat(),
+                'status': item.status,
+                'completed_at': item.completed_at.isoformat() if item.completed_at else None
+            }
+            for item in items
+        ]
+    }
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.db.session import get_read_db
+from app.core.dependencies import get_current_user
+from app.models.user import User
+from app.services.search_service import SearchService
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+@router.get("")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[str] = Query(None, pattern="^(topic|session)$"),
+    page: int = Query(1, ge=1, le=100),
+    per_page: int = Query(20, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Search your topics and explain-session reflections (best match first)"""
+    if not SearchService.query_terms(q):
+        raise HTTPException(status_code=400, detail="Search query has no words")
+
+    found = SearchService.search(
+        db,
+        current_user.id,
+        q,
+        limit=per_page,
+        offset=(page - 1) * per_page,
+        doc_type=type
+    )
+
+    return {
+        "query": q,
+        "page": page,
+        "per_page": per_page,
+        "has_more": found["has_more"],
+        "results": found["results"]
+    }
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
+from app.db.events import notify, user_channel
+from app.db.read_cache import read_cache
+from app.db.writer import run_write
 from app.db.topic_crud import TopicCRUD, ExplainSessionCRUD
+from app.db.crud import ReviewItemCRUD, ScheduleCRUD
 from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.models.schedule import Schedule
 from datetime import datetime, timedelta, date
-import uuid
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/topics", tags=["topics"])
 
@@ -24,7 +30,7 @@ class CreateExplainSessionRequest(BaseModel):
     struggles: Optional[str] = None
     forgot: Optional[str] = None
     unclear: Optional[str] = None
-    confidence: Optional[int] = None
+    confidence: Optional[int] = Field(None, ge=1, le=5)
 
 # Helper: Calculate next review date based on confidence
 def calculate_next_review_date(confidence: int) -> date:
@@ -46,10 +52,20 @@ def calculate_next_review_date(confidence: int) -> date:
     days = confidence_to_days.get(confidence, 3)
     return date.today() + timedelta(days=days)
 
-# Helper: Calculate memory strength for a topic
+# Display for each memory strength status
+MEMORY_STRENGTH_DISPLAY = {
+    "AUTOMATIC": {"color": "#8b5cf6", "emoji": "💎", "message": "Mastered - automatic recall"},
+    "STRONG": {"color": "#10b981", "emoji": "🟢", "message": "Strong memory - well retained"},
+    "STRENGTHENING": {"color": "#eab308", "emoji": "🟡", "message": "Strengthening - needs more practice"},
+    "WEAK": {"color": "#f97316", "emoji": "🟠", "message": "Weak memory - review soon"},
+    "CRITICAL": {"color": "#ef4444", "emoji": "🔴", "message": "Critical - forgetting likely"},
+}
+
+# Helper: Memory strength for a topic
 def calculate_memory_strength(topic) -> dict:
     """
-    Calculate memory strength status for a topic.
+    Memory strength status for a topic, from the stored `memory_status`
+    (rules and upkeep in app/services/memory_service.py).
     
     Returns:
         {
@@ -59,66 +75,11 @@ def calculate_memory_strength(topic) -> dict:
             "message": str  # Explanation
         }
     """
-    # Default state (never explained)
-    if topic.total_explains == 0:
-        return {
-            "status": "CRITICAL",
-            "color": "#ef4444",
-            "emoji": "🔴",
-            "message": "Never explained - high forgetting risk"
-        }
-    
-    # Calculate days since last explain
-    days_since_last = None
-    if topic.last_explained:
-        days_since_last = (datetime.utcnow() - topic.last_explained).days
-    
-    avg_conf = topic.avg_confidence or 0
-    total = topic.total_explains
-    
-    # AUTOMATIC: Mastered (5/5 confidence + 5+ repetitions)
-    if avg_conf >= 5.0 and total >= 5:
-        return {
-            "status": "AUTOMATIC",
-            "color": "#8b5cf6",
-            "emoji": "💎",
-            "message": "Mastered - automatic recall"
-        }
-    
-    # STRONG: High confidence + recent review
-    if avg_conf >= 4.0 and (days_since_last is None or days_since_last < 7):
-        return {
-            "status": "STRONG",
-            "color": "#10b981",
-            "emoji": "🟢",
-            "message": "Strong memory - well retained"
-        }
-    
-    # STRENGTHENING: Moderate confidence + reasonable recency
-    if avg_conf >= 3.0 and (days_since_last is None or days_since_last < 7):
-        return {
-            "status": "STRENGTHENING",
-            "color": "#eab308",
-            "emoji": "🟡",
-            "message": "Strengthening - needs more practice"
-        }
-    
-    # WEAK: Low confidence OR moderate staleness
-    if avg_conf < 3.0 or (days_since_last and 7 <= days_since_last < 14):
-        return {
-            "status": "WEAK",
-            "color": "#f97316",
-            "emoji": "🟠",
-            "message": "Weak memory - review soon"
-        }
-    
-    # CRITICAL: Very low confidence OR very stale
-    return {
-        "status": "CRITICAL",
-        "color": "#ef4444",
-        "emoji": "🔴",
-        "message": "Critical - forgetting likely"
-    }
+    status = topic.memory_status or "CRITICAL"
+    strength = {"status": status, **MEMORY_STRENGTH_DISPLAY[status]}
+    if not topic.total_explains:
+        strength["message"] = "Never explained - high forgetting risk"
+    return strength
 
 # Helper: Create or update schedule (ONE schedule per topic)
 def create_or_update_schedule(
@@ -127,41 +88,31 @@ def create_or_update_schedule(
     topic_id: str,
     topic_title: str,
     next_review_date: date
-) -> Schedule:
+) -> str:
     """
     CRITICAL RULE: One topic = one active schedule.
-    Most recent explain always wins.
+    Most recent explain always wins: the explain counts as the review, so
+    the schedule's pending review items are closed and one new item is
+    added at the next review date.
+    
+    The schedule is upserted in one statement (unique on user + topic),
+    so concurrent explains of a topic still end with one schedule.
+    Returns the schedule id. Flushes only - the caller commits.
     """
-    # Check if schedule already exists for this topic
-    existing = db.query(Schedule).filter(
-        Schedule.topic_id == topic_id,
-        Schedule.user_id == user_id
-    ).first()
-
-    if existing:
-        # UPDATE existing schedule (most recent explain wins)
-        existing.start_date = datetime.combine(next_review_date, datetime.min.time())
-        db.commit()
-        db.refresh(existing)
-        print(f"✅ Updated schedule for topic {topic_id}: next review {next_review_date}")
-        return existing
-    else:
-        # CREATE new schedule
-        schedule = Schedule(
-            id=str(uuid.uuid4()),
-            user_id=user_id,
-            topic_id=topic_id,
-            topic=topic_title,
-            start_date=datetime.combine(next_review_date, datetime.min.time()),
-            intervals=[1, 3, 7, 14],  # Default intervals
-            completed=0,
-            created_at=datetime.utcnow()
-        )
-        db.add(schedule)
-        db.commit()
-        db.refresh(schedule)
-        print(f"✅ Created schedule for topic {topic_id}: next review {next_review_date}")
-        return schedule
+    schedule_id, created = ScheduleCRUD.upsert_for_topic(
+        db,
+        user_id=user_id,
+        topic_id=topic_id,
+        topic=topic_title,
+        start_date=datetime.combine(next_review_date, datetime.min.time()),
+        intervals=[1, 3, 7, 14]  # Default intervals
+    )
+    if not created:
+        ReviewItemCRUD.complete_pending_for_schedule(db, schedule_id)
+    ReviewItemCRUD.add_for_schedule_id(db, schedule_id, user_id, topic_id, [next_review_date])
+    logger.debug("Created schedule" if created else "Updated schedule",
+                 extra={"topic_id": topic_id, "next_review": next_review_date})
+    return schedule_id
 
 @router.post("/create")
 async def create_topic(
@@ -173,66 +124,95 @@ async def create_topic(
     if not request.title.strip():
         raise HTTPException(status_code=400, detail="Topic title cannot be empty")
 
-    topic = TopicCRUD.create(
-        db=db,
-        user_id=current_user.id,
-        title=request.title,
-        subject=request.subject,
-        description=request.description
-    )
+    user_id = current_user.id
 
-    return {
-        "success": True,
-        "force_explain": True,
-        "topic": {
-            "id": topic.id,
-            "title": topic.title,
-            "subject": topic.subject,
-            "description": topic.description
+    def write(db: Session) -> dict:
+        topic = TopicCRUD.create(
+            db=db,
+            user_id=user_id,
+            title=request.title,
+            subject=request.subject,
+            description=request.description
+        )
+        notify(db, user_channel(user_id), "topic.created", topic_id=topic.id)
+        return {
+            "success": True,
+            "force_explain": True,
+            "topic": {
+                "id": topic.id,
+                "title": topic.title,
+                "subject": topic.subject,
+                "description": topic.description
+            }
         }
-    }
+
+    return await run_write(db, write)
+
+# Sort keys for /list and the direction each one defaults to (True = descending)
+TOPIC_SORTS = {
+    "created": True,
+    "last_explained": True,
+    "confidence": True,
+    "next_review": False,
+    "title": False,
+}
 
 @router.get("/list")
 async def list_topics(
+    subject: Optional[str] = None,
+    status: Optional[str] = Query(None, pattern="^(CRITICAL|WEAK|STRENGTHENING|STRONG|AUTOMATIC)$"),
+    due_before: Optional[date] = Query(None, description="Next review strictly before this date"),
+    sort: str = Query("created", pattern="^(created|last_explained|confidence|next_review|title)$"),
+    order: Optional[str] = Query(None, pattern="^(asc|desc)$"),
+    page: int = Query(1, ge=1),
+    per_page: Optional[int] = Query(None, ge=1, le=200, description="Omit for every topic"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get all topics for current user WITH MEMORY STRENGTH"""
-    topics = TopicCRUD.get_user_topics(db, current_user.id)
+    """Get topics for current user WITH MEMORY STRENGTH, filtered, sorted and paged in SQL"""
+    user_id = current_user.id
+
+    def compute(db: Session) -> dict:
+        rows, total = TopicCRUD.list_for_user(
+            db,
+            user_id,
+            subject=subject,
+            status=status,
+            due_before=datetime.combine(due_before, datetime.min.time()) if due_before else None,
+            sort=sort,
+            descending=TOPIC_SORTS[sort] if order is None else order == "desc",
+            limit=per_page,
+            offset=(page - 1) * per_page if per_page else 0
+        )
 
-    return {
-        "total": len(topics),
-        "topics": [
-            {
-                "id": t.id,
-                "title": t.title,
-                "subject": t.subject,
-                "description": t.description,
-                "total_explains": t.total_explains,
-                "avg_confidence": t.avg_confidence,
-                "last_explained": t.last_explained.isoformat() if t.last_explained else None,
-                "created_at": t.created_at.isoformat(),
-                "memory_strength": calculate_memory_strength(t)  # ← NEW
-            }
-            for t in topics
-        ]
-    }
+        return {
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "has_more": per_page is not None and page * per_page < total,
+            "topics": [
+                {
+                    "id": t.id,
+                    "title": t.title,
+                    "subject": t.subject,
+                    "description": t.description,
+                    "total_explains": t.total_explains,
+                    "avg_confidence": t.avg_confidence,
+                    "last_explained": t.last_explained.isoformat() if t.last_explained else None,
+                    "created_at": t.created_at.isoformat(),
+                    "next_review": next_review.date().isoformat() if next_review else None,
+                    "memory_strength": calculate_memory_strength(t)  # ← NEW
+                }
+                for t, next_review in rows
+            ]
+        }
 
-@router.get("/memory-stats")
-async def get_memory_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Get memory strength statistics for dashboard.
-    
-    Returns:
-        - Total topics
-        - Topics by memory strength status
-        - Exam-ready percentage
-        - Topics at risk count
-    """
-    topics = TopicCRUD.get_user_topics(db, current_user.id)
+    params = (subject, status, due_before, sort, order, page, per_page)
+    return await read_cache.get(db, user_id, "topic_list", params, compute)
+
+def build_memory_stats(db: Session, user_id: str) -> dict:
+    """The memory-stats read model"""
+    topics = TopicCRUD.get_user_topics(db, user_id)
     
     if not topics:
         return {
@@ -301,11 +281,60 @@ async def get_memory_stats(
         "topics_needing_attention": topics_needing_attention
     }
 
+@router.get("/memory-stats")
+async def get_memory_stats(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get memory strength statistics for dashboard.
+    
+    Returns:
+        - Total topics
+        - Topics by memory strength status
+        - Exam-ready percentage
+        - Topics at risk count
+    """
+    user_id = current_user.id
+    return await read_cache.get(db, user_id, "memory_stats", (),
+                                lambda session: build_memory_stats(session, user_id))
+
+@router.get("/recall")
+async def get_recall_estimates(
+    exam_date: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Estimated recall probability for every topic, now and on the exam
+    date if given, from a forgetting curve fitted to the explain history.
+    Most at-risk topics first.
+    """
+    if exam_date and exam_date < date.today():
+        raise HTTPException(status_code=400, detail="Exam date is in the past")
+
+    user_id = current_user.id
+
+    def compute(db: Session) -> dict:
+        # NumPy is slow to import, so it loads with the first recall request
+        from app.services.recall_service import RecallService
+
+        now = datetime.utcnow()
+        exam_at = datetime.combine(exam_date, datetime.min.time()) if exam_date else None
+        estimates = RecallService.estimate(db, user_id, now=now, exam_at=exam_at)
+        return {
+            "as_of": now.isoformat(),
+            "exam_date": exam_date.isoformat() if exam_date else None,
+            **estimates
+        }
+
+    return await read_cache.get(db, user_id, "recall", exam_date, compute)
+
 @router.get("/{topic_id}")
 async def get_topic(
     topic_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific topic"""
     topic = TopicCRUD.get_by_id(db, topic_id)
@@ -316,8 +345,8 @@ async def get_topic(
     if topic.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to access this topic")
 
-    # Get recent sessions
-    sessions = ExplainSessionCRUD.get_topic_sessions(db, topic_id)
+    # Get recent sessions (the last five, without reflections)
+    sessions = ExplainSessionCRUD.get_topic_sessions(db, current_user.id, topic_id, limit=5)
 
     # Get next review date (if scheduled)
     schedule = db.query(Schedule).filter(
@@ -346,7 +375,7 @@ async def get_topic(
                 "confidence": s.confidence,
                 "created_at": s.created_at.isoformat()
             }
-            for s in sessions[:5]
+            for s in sessions
         ]
     }
 
@@ -356,81 +385,93 @@ async def save_explain_session(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Save explain session and AUTO-SCHEDULE next review"""
-
-    print(f"\n🎯 Explain endpoint called for topic {request.topic_id}")
-    print(f"   Confidence: {request.confidence}")
-
-    # Verify topic belongs to user
-    topic = TopicCRUD.get_by_id(db, request.topic_id)
-    if not topic:
-        raise HTTPException(status_code=404, detail="Topic not found")
-
-    if topic.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    # Create session
-    session_data = {
-        "topic_id": request.topic_id,
-        "user_id": current_user.id,
-        "duration_seconds": request.duration_seconds,
-        "struggles": request.struggles,
-        "forgot": request.forgot,
-        "unclear": request.unclear,
-        "confidence": request.confidence
-    }
-
-    session = ExplainSessionCRUD.create(db, session_data)
-    print(f"✅ Explain session saved: {session.id}")
-
-    # Update analytics (optional)
-    try:
-        from app.services.analytics_service import AnalyticsService
-        AnalyticsService.update_explain_completed(db, current_user.id)
-    except Exception as e:
-        print(f"⚠️  Analytics update failed: {e}")
-
-    # AUTO-SCHEDULE next review based on confidence
-    next_review_date = None
-    days_until_review = None
-
-    if request.confidence:
-        print(f"📅 Auto-scheduling review...")
-        next_review_date = calculate_next_review_date(request.confidence)
-        days_until_review = (next_review_date - date.today()).days
+    """
+    Save explain session and AUTO-SCHEDULE next review.
+    
+    Session, topic stats, analytics and schedule are written in one
+    transaction with a single commit at the end.
+    """
 
-        # Create or update schedule (ONE schedule per topic)
-        schedule = create_or_update_schedule(
-            db=db,
-            user_id=current_user.id,
-            topic_id=request.topic_id,
-            topic_title=topic.title,
-            next_review_date=next_review_date
-        )
+    logger.debug("Explain session submitted", extra={"topic_id": request.topic_id, "confidence": request.confidence})
+    user_id = current_user.id
+
+    def write(db: Session) -> dict:
+        # Verify topic belongs to user
+        topic = TopicCRUD.get_by_id(db, request.topic_id)
+        if not topic:
+            raise HTTPException(status_code=404, detail="Topic not found")
+
+        if topic.user_id != user_id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+
+        # Create session
+        session_data = {
+            "topic_id": request.topic_id,
+            "user_id": user_id,
+            "duration_seconds": request.duration_seconds,
+            "struggles": request.struggles,
+            "forgot": request.forgot,
+            "unclear": request.unclear,
+            "confidence": request.confidence
+        }
 
-        # ✅ FORCE COMMIT (ensure DB writes immediately)
-        db.commit()
-        db.flush()
+        session = ExplainSessionCRUD.create(db, session_data)
+        logger.debug("Explain session saved", extra={"session_id": session.id})
+        notify(db, user_channel(user_id), "session.saved", topic_id=request.topic_id, session_id=session.id)
+
+        # Update analytics (optional): in a savepoint, so a failure rolls back
+        # only its own changes and the session is still usable for the rest
+        try:
+            from app.services.analytics_service import AnalyticsService
+            with db.begin_nested():
+                AnalyticsService.update_explain_completed(db, user_id)
+        except Exception as e:
+            logger.warning("Analytics update failed: %s", e)
+
+        # AUTO-SCHEDULE next review based on confidence
+        next_review_date = None
+        days_until_review = None
+
+        if request.confidence:
+            next_review_date = calculate_next_review_date(request.confidence)
+            days_until_review = (next_review_date - date.today()).days
+
+            # Create or update schedule (ONE schedule per topic)
+            schedule_id = create_or_update_schedule(
+                db=db,
+                user_id=user_id,
+                topic_id=request.topic_id,
+                topic_title=topic.title,
+                next_review_date=next_review_date
+            )
+            notify(db, user_channel(user_id), "topic.rescheduled",
+                   topic_id=request.topic_id, next_review=next_review_date.isoformat())
+
+            logger.debug("Review scheduled", extra={
+                "schedule_id": schedule_id,
+                "next_review": next_review_date,
+                "days_until_review": days_until_review
+            })
+        else:
+            logger.debug("No confidence provided, skipping auto-scheduling")
 
-        print(f"✅ Schedule saved: {schedule.id}")
-        print(f"   Next review: {next_review_date} ({days_until_review} days)")
-    else:
-        print(f"⚠️  No confidence provided, skipping auto-scheduling")
+        return {
+            "success": True,
+            "session_id": session.id,
+            "message": "Session saved and review scheduled" if next_review_date else "Session saved",
+            "next_review_date": next_review_date.isoformat() if next_review_date else None,
+            "days_until_review": days_until_review,
+            "confidence": request.confidence
+        }
 
-    return {
-        "success": True,
-        "session_id": session.id,
-        "message": "Session saved and review scheduled" if next_review_date else "Session saved",
-        "next_review_date": next_review_date.isoformat() if next_review_date else None,
-        "days_until_review": days_until_review,
-        "confidence": request.confidence
-    }
+    # ✅ ONE COMMIT for the whole submission
+    return await run_write(db, write)
 
 @router.get("/{topic_id}/sessions")
 async def get_topic_sessions(
     topic_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all explain sessions for a topic with reflections"""
 
@@ -440,7 +481,7 @@ async def get_topic_sessions(
         raise HTTPException(status_code=404, detail="Topic not found")
 
     # Get all sessions
-    sessions = ExplainSessionCRUD.get_topic_sessions(db, topic_id)
+    sessions = ExplainSessionCRUD.get_topic_sessions(db, current_user.id, topic_id, reflections=True)
 
     return {
         "topic_id": topic_id,
@@ -468,14 +509,19 @@ async def delete_topic(
     db: Session = Depends(get_db)
 ):
     """Delete a topic"""
-    topic = TopicCRUD.get_by_id(db, topic_id)
+    user_id = current_user.id
 
-    if not topic:
-        raise HTTPException(status_code=404, detail="Topic not found")
+    def write(db: Session) -> dict:
+        topic = TopicCRUD.get_by_id(db, topic_id)
 
-    if topic.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
+        if not topic:
+            raise HTTPException(status_code=404, detail="Topic not found")
+
+        if topic.user_id != user_id:
+            raise HTTPException(status_code=403, detail="Not authorized")
 
-    TopicCRUD.delete(db, topic_id)
+        TopicCRUD.delete(db, topic_id)
+        notify(db, user_channel(user_id), "topic.deleted", topic_id=topic_id)
+        return {"success": True, "message": "Topic deleted"}
 
-    return {"success": True, "message": "Topic deleted"}
+    return await run_write(db, write)
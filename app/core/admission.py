@@ -0,0 +1,236 @@
+"""
+Admission control: per-client rate limits and a global concurrency cap.
+
+Each request outside EXEMPT_PREFIXES is charged to a token bucket keyed
+by the signed-in user (the access token's subject) or, without one, by
+client IP. Reads, writes and anonymous requests have separate budgets;
+an empty bucket answers 429 with Retry-After set to when the next token
+arrives.
+
+Admitted requests then take one of ADMISSION_MAX_CONCURRENT slots, set
+below the DB pool size so that excess requests wait here, in the event
+loop, instead of on a pool checkout in a worker thread. A request that
+finds ADMISSION_MAX_QUEUE already waiting, or doesn't get a slot within
+ADMISSION_QUEUE_TIMEOUT_MS, is shed with 503 and Retry-After. Event
+streams (STREAMING_PATHS) stay open for hours without touching the DB,
+so they are only rate-limited.
+
+All of this runs on the event loop thread, so buckets and counters are
+plain dicts and numbers without locks. The fast path's cost is verifying
+the access token (tens of microseconds for HS256); the decoded payload is
+left in the request state for get_current_user, so it isn't verified
+twice. Limits are per process.
+"""
+from collections import deque
+from starlette.requests import cookie_parser
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Deque, Dict, List, Optional
+import asyncio
+import math
+import time
+
+from app.core.config import settings
+from app.core.metrics import ADMISSION_QUEUE_WAIT, ADMISSION_REJECTED, _admission
+from app.core.middleware import SAFE_METHODS
+from app.core.security import TOKEN_PAYLOAD_STATE, decode_access_token
+
+# Probes, scrapes and static files are never limited
+EXEMPT_PREFIXES = ("/health", "/metrics", "/static")
+# Long-lived streams are rate-limited on connect but hold no slot (nor a DB connection)
+STREAMING_PATHS = ("/api/events",)
+
+
+class RateLimiter:
+    """Token buckets per key: `rate` tokens a second, holding at most `burst`"""
+
+    def __init__(self, rate: float, burst: int, max_keys: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: Dict[str, List[float]] = {}  # key -> [tokens, last refill]
+
+    def acquire(self, key: str, now: float) -> float:
+        """Take a token: 0 if there was one, else seconds until there will be"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            self._buckets[key] = [self.burst - 1, now]
+            return 0.0
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / self.rate
+
+    def _prune(self, now: float):
+        """Forget buckets that have refilled - their clients have gone quiet"""
+        refill = self.burst / self.rate
+        self._buckets = {key: b for key, b in self._buckets.items() if now - b[1] < refill}
+        if len(self._buckets) >= self.max_keys:
+            # Too many active keys to track (spoofed IPs?): start over rather than grow
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class ConcurrencyLimiter:
+    """At most `limit` requests in flight; a bounded FIFO queue for the rest"""
+
+    def __init__(self, limit: int, max_queue: int, timeout: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting up to `timeout` seconds; False if shed"""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.max_queue or self.timeout <= 0:
+            return False
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiters.append(future)
+
+        def expire():
+            if not future.done():
+                self._waiters.remove(future)
+                future.set_result(False)
+
+        expiry = loop.call_later(self.timeout, expire)
+        start = loop.time()
+        try:
+            granted = await future
+        except asyncio.CancelledError:
+            # Client went away: give back a slot that was handed over meanwhile
+            if future.done() and not future.cancelled() and future.result():
+                self.release()
+            elif future in self._waiters:
+                self._waiters.remove(future)
+            raise
+        finally:
+            expiry.cancel()
+        if settings.METRICS_ENABLED:
+            ADMISSION_QUEUE_WAIT.observe(loop.time() - start, "admitted" if granted else "shed")
+        return granted
+
+    def release(self):
+        """Hand the slot to the longest waiter, or free it"""
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(True)
+                return
+        self.in_flight -= 1
+
+
+def client_ip(scope: Scope) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def user_id_from_cookie(scope: Scope) -> Optional[str]:
+    """
+    The signed-in user, from a valid access_token cookie (no DB lookup).
+    The decoded payload is kept in the request state for get_current_user.
+    """
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            token = cookie_parser(value.decode("latin-1")).get("access_token")
+            if not token:
+                return None
+            if token.startswith("Bearer "):
+                token = token[7:]
+            payload = decode_access_token(token)
+            scope.setdefault("state", {})[TOKEN_PAYLOAD_STATE] = payload
+            return payload.get("sub") if payload else None
+    return None
+
+
+class Admission:
+    """The process-wide limits, built from settings on first use"""
+
+    def __init__(self):
+        max_keys = settings.RATE_LIMIT_MAX_KEYS
+        self.limiters = {
+            "read": RateLimiter(settings.RATE_LIMIT_READS_PER_SECOND, settings.RATE_LIMIT_READ_BURST, max_keys),
+            "write": RateLimiter(settings.RATE_LIMIT_WRITES_PER_SECOND, settings.RATE_LIMIT_WRITE_BURST, max_keys),
+            "anonymous": RateLimiter(
+                settings.RATE_LIMIT_ANONYMOUS_PER_SECOND, settings.RATE_LIMIT_ANONYMOUS_BURST, max_keys
+            ),
+        }
+        self.concurrency = ConcurrencyLimiter(
+            settings.ADMISSION_MAX_CONCURRENT,
+            settings.ADMISSION_MAX_QUEUE,
+            settings.ADMISSION_QUEUE_TIMEOUT_MS / 1000
+        )
+        _admission["current"] = self
+
+
+async def _reject(scope: Scope, receive: Receive, send: Send, status: int, retry_after: float, detail: str):
+    response = JSONResponse(
+        {"detail": detail},
+        status_code=status,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+    await response(scope, receive, send)
+
+
+class AdmissionMiddleware:
+    """Rate-limit per client, then cap requests in flight (see module docstring)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.admission: Optional[Admission] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (scope["type"] != "http" or not settings.ADMISSION_ENABLED
+                or scope["path"].startswith(EXEMPT_PREFIXES)):
+            await self.app(scope, receive, send)
+            return
+        if self.admission is None:
+            self.admission = Admission()
+
+        user_id = user_id_from_cookie(scope)
+        if user_id is None:
+            kind, key = "anonymous", client_ip(scope)
+        else:
+            kind, key = ("read" if scope["method"] in SAFE_METHODS else "write"), user_id
+
+        wait = self.admission.limiters[kind].acquire(key, time.monotonic())
+        if wait:
+            if settings.METRICS_ENABLED:
+                ADMISSION_REJECTED.inc("rate_limited", kind)
+            await _reject(scope, receive, send, 429, wait, "Too many requests - slow down")
+            return
+
+        if scope["path"] in STREAMING_PATHS:
+            await self.app(scope, receive, send)
+            return
+        concurrency = self.admission.concurrency
+        if not await concurrency.acquire():
+            if settings.METRICS_ENABLED:
+                ADMISSION_REJECTED.inc("overloaded", kind)
+            await _reject(scope, receive, send, 503, settings.ADMISSION_RETRY_AFTER_SECONDS,
+                          "Server busy - try again shortly")
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            concurrency.release()
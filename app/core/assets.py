@@ -0,0 +1,110 @@
+"""
+Static assets and page templates.
+
+Stylesheets and scripts live in app/static and are linked from templates
+with `static_url("css/dashboard.css")`, which returns a fingerprinted
+URL - /static/css/dashboard.3f9c2a17b0d4.css, the hash taken from the
+file's contents. Those URLs are served with a one-year immutable
+Cache-Control: a browser fetches each version once, and a changed file
+gets a new URL. Unfingerprinted URLs (and fingerprints of an older
+version, still in pages rendered before a deploy) serve the current file
+with no-cache, so the browser revalidates by ETag.
+
+Templates are compiled once per process and cached in memory by Jinja;
+the bytecode cache keeps the compiled code on disk so a fresh worker
+skips the compile, and warm_templates() does the loading at startup
+rather than on each page's first request.
+"""
+from jinja2 import Environment, FileSystemBytecodeCache
+from pathlib import Path
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from typing import Dict, Tuple
+import hashlib
+import logging
+import os
+import re
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+IMMUTABLE = "public, max-age=31536000, immutable"
+FINGERPRINT_RE = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{12})(?P<suffix>\.[A-Za-z0-9]+)$")
+
+
+class AssetManifest:
+    """Fingerprinted name of each file under `root`, from a hash of its contents"""
+
+    def __init__(self, root: Path, auto_reload: bool):
+        self.root = root
+        self.auto_reload = auto_reload
+        self._urls: Dict[str, Tuple[int, str]] = {}  # path -> (mtime_ns, fingerprinted path)
+        self._sources: Dict[str, str] = {}  # fingerprinted path -> path
+
+    def fingerprinted(self, path: str) -> str:
+        entry = self._urls.get(path)
+        if entry is not None and not self.auto_reload:
+            return entry[1]
+        full_path = self.root / path
+        mtime = full_path.stat().st_mtime_ns
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+        digest = hashlib.sha256(full_path.read_bytes()).hexdigest()[:12]
+        stem, suffix = os.path.splitext(path)
+        name = f"{stem}.{digest}{suffix}"
+        self._urls[path] = (mtime, name)
+        self._sources[name] = path
+        return name
+
+    def source(self, path: str) -> Tuple[str, bool]:
+        """File to serve for a requested path, and whether it is the current version's URL"""
+        source = self._sources.get(path)
+        if source is not None:
+            return source, self._urls[source][1] == path
+        match = FINGERPRINT_RE.match(path)
+        if match:  # another version's URL: serve what we have now
+            return match["stem"] + match["suffix"], False
+        return path, False
+
+
+manifest = AssetManifest(STATIC_DIR, auto_reload=settings.ENVIRONMENT != "production")
+
+
+def static_url(path: str) -> str:
+    """URL of a file in app/static, fingerprinted for immutable caching"""
+    return f"/static/{manifest.fingerprinted(path)}"
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """StaticFiles that maps fingerprinted names back to files and sets Cache-Control"""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        source, current = manifest.source(path.replace(os.sep, "/"))
+        response = await super().get_response(os.path.normpath(source), scope)
+        response.headers["Cache-Control"] = IMMUTABLE if current else "no-cache"
+        return response
+
+
+def configure_templates(env: Environment):
+    """static_url() for templates; compiled code cached on disk; no mtime checks in production"""
+    env.globals["static_url"] = static_url
+    if settings.TEMPLATE_BYTECODE_CACHE:
+        env.bytecode_cache = FileSystemBytecodeCache(settings.TEMPLATE_CACHE_DIR or None)
+    env.auto_reload = settings.ENVIRONMENT != "production"
+
+
+def warm_templates(env: Environment):
+    """Load (from the bytecode cache, or compile) every template, and fingerprint every asset"""
+    start = time.perf_counter()
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    assets = [p.relative_to(STATIC_DIR).as_posix() for p in STATIC_DIR.rglob("*") if p.is_file()]
+    for path in assets:
+        manifest.fingerprinted(path)
+    logger.info("Warmed %d templates and %d assets in %.0f ms", len(names), len(assets),
+                (time.perf_counter() - start) * 1000)
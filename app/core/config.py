@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Set
 from app.db.persistent import get_database_url
 from dotenv import load_dotenv
 import os
@@ -13,9 +13,96 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     SECRET_KEY: str
     
+    # Pages (compiled templates are cached on disk; "" = a per-user temp directory)
+    TEMPLATE_BYTECODE_CACHE: bool = True
+    TEMPLATE_CACHE_DIR: str = ""
+    
     # Database
     DATABASE_URL: str = get_database_url()
     
+    # SQLite profile (ignored on PostgreSQL)
+    SQLITE_WAL: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_KB: int = 64 * 1024
+    SQLITE_SINGLE_WRITER: bool = True  # route writes through the group-commit writer
+    WRITER_MAX_BATCH: int = 64
+    WRITER_MAX_WAIT_MS: float = 2.0
+    
+    # Read replica (optional - reads use the primary when unset)
+    READ_DATABASE_URL: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_SECONDS: float = 1.0
+    READ_YOUR_WRITES_SECONDS: float = 10.0
+    REPLICA_SIMULATED_DELAY_SECONDS: float = 0.0  # >0: replicate SQLite DATABASE_URL into READ_DATABASE_URL locally
+    
+    # Per-user read-model cache (per process; writes in other processes show after the TTL)
+    READ_CACHE_ENABLED: bool = True
+    READ_CACHE_MAX_ENTRIES: int = 10000
+    READ_CACHE_TTL_SECONDS: float = 30.0
+    
+    # Search (SQLite ranks at most this many of a user's matches per query; past it, the best by bm25)
+    SEARCH_MAX_CANDIDATES: int = 500
+    
+    # Memory-status sweeper (re-evaluates topics whose status is due to change)
+    STATUS_SWEEP_INTERVAL_SECONDS: float = 60.0
+    STATUS_SWEEP_BATCH: int = 500
+    
+    # Daily cross-user rollups (folded in from a created_at high-water mark)
+    ROLLUP_INTERVAL_SECONDS: float = 300.0
+    ROLLUP_SETTLE_SECONDS: float = 60.0  # rows younger than this may still be uncommitted
+    ROLLUP_MAX_WINDOW_HOURS: int = 24  # per transaction, while catching up
+    
+    # Hot/cold tiering: explain sessions older than this move to explain_sessions_archive
+    ARCHIVE_ENABLED: bool = True
+    ARCHIVE_AFTER_DAYS: int = 365
+    ARCHIVE_BATCH: int = 500  # sessions per transaction
+    ARCHIVE_BATCH_PAUSE_MS: float = 50.0  # between batches, so other writes get in
+    ARCHIVE_INTERVAL_SECONDS: float = 3600.0
+    
+    # Admission control (per process; rates are requests per second per client)
+    ADMISSION_ENABLED: bool = True
+    RATE_LIMIT_READS_PER_SECOND: float = 10.0  # signed-in GETs
+    RATE_LIMIT_READ_BURST: int = 60
+    RATE_LIMIT_WRITES_PER_SECOND: float = 2.0  # signed-in POST/PUT/DELETE
+    RATE_LIMIT_WRITE_BURST: int = 20
+    RATE_LIMIT_ANONYMOUS_PER_SECOND: float = 2.0  # per IP, no valid session cookie
+    RATE_LIMIT_ANONYMOUS_BURST: int = 30
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False  # behind a proxy: key by X-Forwarded-For
+    ADMISSION_MAX_CONCURRENT: int = 12  # below the DB pool's 15 connections (5 + 10 overflow)
+    ADMISSION_MAX_QUEUE: int = 200
+    ADMISSION_QUEUE_TIMEOUT_MS: float = 2000.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+    
+    # Server-sent change events (GET /api/events)
+    SSE_MAX_CLIENTS: int = 5000  # open streams per process
+    SSE_CLIENT_BUFFER: int = 32  # events queued per stream before it is told to resync
+    SSE_HEARTBEAT_SECONDS: float = 25.0
+    SSE_RETRY_MS: int = 5000  # browser reconnect delay
+    EVENTS_PG_NOTIFY: bool = True  # on PostgreSQL, fan out across workers with LISTEN/NOTIFY
+    
+    # Admin-only endpoints (comma-separated emails)
+    ADMIN_EMAILS: str = ""
+    
+    # Health probes
+    READINESS_CACHE_SECONDS: float = 5.0
+    
+    # Metrics
+    METRICS_ENABLED: bool = True
+    METRICS_ENDPOINT_ENABLED: bool = True  # serve /metrics
+    METRICS_TOKEN: str = ""  # scrapers send "Authorization: Bearer <token>"; admins can always read
+    
+    # SQL accounting (X-DB-* headers are for local debugging only)
+    SQL_DEBUG_HEADERS: bool = False
+    SLOW_QUERY_MS: float = 200.0
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""  # per-module overrides, e.g. "app.api.topics=DEBUG"
+    LOG_FORMAT: str = "text"  # text or json
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0  # fraction of DEBUG lines kept
+    
     # Google OAuth
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
@@ -34,6 +121,10 @@ class Settings(BaseSettings):
     def intervals_list(self) -> List[int]:
         return [int(x.strip()) for x in self.DEFAULT_INTERVALS.split(",")]
     
+    @property
+    def admin_emails(self) -> Set[str]:
+        return {x.strip().lower() for x in self.ADMIN_EMAILS.split(",") if x.strip()}
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -2,7 +2,8 @@ from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.db.crud import UserCRUD
-from app.core.security import decode_access_token
+from app.core.config import settings
+from app.core.security import TOKEN_PAYLOAD_STATE, decode_access_token
 from app.models.user import User
 from typing import Optional
 
@@ -22,8 +23,9 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
     if token.startswith("Bearer "):
         token = token[7:]
     
-    # Decode token
-    payload = decode_access_token(token)
+    # Decode token, unless admission control already has (same cookie, same request)
+    state = request.scope.get("state", {})
+    payload = state[TOKEN_PAYLOAD_STATE] if TOKEN_PAYLOAD_STATE in state else decode_access_token(token)
     
     if not payload:
         raise HTTPException(
@@ -56,3 +58,12 @@ def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -
         return get_current_user(request, db)
     except HTTPException:
         return None
+
+def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """Admin-only routes: the logged-in user's email must be in ADMIN_EMAILS"""
+    if (current_user.email or "").lower() not in settings.admin_emails:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
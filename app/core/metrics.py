@@ -0,0 +1,336 @@
+"""
+In-process Prometheus-style metrics.
+
+Collection is deliberately lock-free: every update is a dict lookup plus
+an integer/float add, which the GIL already serializes well enough for
+monitoring purposes. Only creating a new label set takes a lock.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+import asyncio
+import threading
+import time
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.query_stats import RequestStats, _request_stats
+
+# Seconds - tuned for web requests and DB calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+_registry = []
+_create_lock = threading.Lock()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], le: Optional[str] = None) -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if le is not None:
+        parts.append(f'le="{le}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        _registry.append(self)
+
+    def inc(self, *label_values: str, amount: float = 1):
+        values = self._values
+        if label_values in values:
+            values[label_values] += amount
+        else:
+            with _create_lock:
+                values[label_values] = values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self):
+        for label_values, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {value}"
+
+
+class Gauge(Counter):
+    """Value that can go up and down, or be read from a callback"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), callback=None):
+        super().__init__(name, help, labels)
+        self.callback = callback
+
+    def set(self, *label_values: str, value: float):
+        self._values[label_values] = value
+
+    def render(self):
+        if self.callback is not None:
+            try:
+                # Callback returns a number, or a {label_values: number} dict
+                value = self.callback()
+                if isinstance(value, dict):
+                    self._values.update(value)
+                else:
+                    self._values[()] = value
+            except Exception:
+                pass
+        yield from super().render()
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram:
+    """Fixed-bucket histogram with optional labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._children: Dict[Tuple[str, ...], _HistogramChild] = {}
+        _registry.append(self)
+
+    def observe(self, value: float, *label_values: str):
+        child = self._children.get(label_values)
+        if child is None:
+            with _create_lock:
+                child = self._children.setdefault(label_values, _HistogramChild(len(self.buckets) + 1))
+        child.counts[bisect_left(self.buckets, value)] += 1
+        child.sum += value
+        child.count += 1
+
+    def render(self):
+        for label_values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, child.counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(self.labels, label_values, str(bound))} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(self.labels, label_values, '+Inf')} {child.count}"
+            yield f"{self.name}_sum{_format_labels(self.labels, label_values)} {child.sum}"
+            yield f"{self.name}_count{_format_labels(self.labels, label_values)} {child.count}"
+
+
+def render_metrics() -> str:
+    """Render every registered metric in Prometheus text format"""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# HTTP
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+
+# Database
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements executed")
+DB_STATEMENTS_PER_REQUEST = Histogram("db_statements_per_request", "SQL statements per HTTP request", ("route",), buckets=COUNT_BUCKETS)
+DB_TIME_PER_REQUEST = Histogram("db_time_per_request_seconds", "Time spent in SQL per HTTP request", ("route",))
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of the pool", ("pool",))
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time a checkout took to get a connection from the pool (waiting for one, or opening one)",
+    ("pool",),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_OVERFLOW_CHECKOUTS = Counter("db_pool_overflow_checkouts_total", "Checkouts made while the pool had overflow connections open (past pool_size)", ("pool",))
+_pools = {}
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out",
+    ("pool",),
+    callback=lambda: {(name,): (e.pool.checkedout() if hasattr(e.pool, "checkedout") else 0) for name, e in _pools.items()},
+)
+DB_WRITE_BATCH_SIZE = Histogram("db_write_batch_size", "Jobs group-committed per writer transaction", buckets=COUNT_BUCKETS)
+DB_READ_ROUTING = Counter("db_read_routing_total", "Read sessions by target database and reason", ("target", "reason"))
+
+# Admission control (app.core.admission registers its limits here)
+_admission = {}
+ADMISSION_REJECTED = Counter("admission_rejected_total", "Requests turned away by admission control", ("reason", "class"))
+ADMISSION_QUEUE_WAIT = Histogram("admission_queue_wait_seconds", "Time queued for a concurrency slot", ("outcome",))
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Requests holding a concurrency slot, and waiting for one",
+    ("state",),
+    callback=lambda: {("running",): a.concurrency.in_flight for a in _admission.values()}
+    | {("queued",): a.concurrency.queued for a in _admission.values()},
+)
+ADMISSION_TRACKED_CLIENTS = Gauge(
+    "admission_tracked_clients",
+    "Clients with a rate-limit bucket",
+    ("class",),
+    callback=lambda: {(kind,): len(limiter) for a in _admission.values() for kind, limiter in a.limiters.items()},
+)
+ADMISSION_LIMIT = Gauge(
+    "admission_limit",
+    "Configured admission limits",
+    ("limit",),
+    callback=lambda: {
+        ("max_concurrent",): settings.ADMISSION_MAX_CONCURRENT,
+        ("max_queue",): settings.ADMISSION_MAX_QUEUE,
+        ("read_per_second",): settings.RATE_LIMIT_READS_PER_SECOND,
+        ("read_burst",): settings.RATE_LIMIT_READ_BURST,
+        ("write_per_second",): settings.RATE_LIMIT_WRITES_PER_SECOND,
+        ("write_burst",): settings.RATE_LIMIT_WRITE_BURST,
+        ("anonymous_per_second",): settings.RATE_LIMIT_ANONYMOUS_PER_SECOND,
+        ("anonymous_burst",): settings.RATE_LIMIT_ANONYMOUS_BURST,
+    } if settings.ADMISSION_ENABLED else {},
+)
+
+# Read-model cache (app.db.read_cache registers itself here)
+_read_caches = []
+READ_CACHE_REQUESTS = Counter("read_cache_requests_total", "Read-model lookups: hit, miss, or coalesced into a running miss", ("model", "result"))
+READ_CACHE_ENTRIES = Gauge("read_cache_entries", "Read models held in the cache", callback=lambda: sum(len(c) for c in _read_caches))
+
+# Change events (app.db.events registers its broker here)
+_event_brokers = []
+EVENTS_PUBLISHED = Counter("events_published_total", "Change events raised by write paths (sent if their transaction commits)", ("event",))
+EVENTS_DROPPED = Counter("events_dropped_total", "Events dropped for a stream whose buffer was full (sent a resync instead)")
+SSE_CLIENTS = Gauge("sse_clients", "Open server-sent event streams", callback=lambda: sum(len(b) for b in _event_brokers))
+
+# Background jobs
+MEMORY_STATUS_TRANSITIONS = Counter("memory_status_transitions_total", "Topic status changes made by the sweeper", ("status",))
+ROLLUP_ROWS = Counter("rollup_source_rows_total", "Source rows folded into the daily rollups", ("source",))
+ARCHIVED_SESSIONS = Counter("archived_explain_sessions_total", "Explain sessions moved to the cold archive")
+
+# Outbound calls (Google APIs, SMTP)
+OUTBOUND_LATENCY = Histogram("outbound_request_duration_seconds", "Latency of outbound calls", ("service", "operation", "outcome"))
+
+# Event loop
+EVENT_LOOP_LAG = Histogram("event_loop_lag_seconds", "Delay between scheduled and actual event loop wakeups")
+
+
+@contextmanager
+def time_outbound(service: str, operation: str):
+    """Record the latency of a call to an external service"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        if settings.METRICS_ENABLED:
+            OUTBOUND_LATENCY.observe(time.perf_counter() - start, service, operation, outcome)
+
+
+_timed_pool_classes = {}
+
+
+def _timed_pool_class(pool_class, pool: str):
+    """
+    Subclass of `pool_class` that times getting a connection. SQLAlchemy's
+    pool events only fire once a connection is in hand, so the wait is
+    timed around the pool's own _do_get. A subclass (rather than a
+    wrapped method) survives engine.dispose(), which recreates the pool
+    from its class.
+    """
+    key = (pool_class, pool)
+    if key not in _timed_pool_classes:
+        def _do_get(self):
+            if not settings.METRICS_ENABLED:
+                return pool_class._do_get(self)
+            start = time.perf_counter()
+            try:
+                return pool_class._do_get(self)
+            finally:
+                DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start, pool)
+
+        _timed_pool_classes[key] = type(f"Timed{pool_class.__name__}", (pool_class,), {"_do_get": _do_get})
+    return _timed_pool_classes[key]
+
+
+def instrument_engine(engine, pool: str = "primary"):
+    """Attach statement and pool counters, and the checkout-wait timer, to a SQLAlchemy engine"""
+    _pools[pool] = engine
+    engine.pool.__class__ = _timed_pool_class(type(engine.pool), pool)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        if settings.METRICS_ENABLED:
+            DB_STATEMENTS.inc()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        if not settings.METRICS_ENABLED:
+            return
+        DB_POOL_CHECKOUTS.inc(pool)
+        overflow = getattr(engine.pool, "overflow", None)
+        if overflow is not None and overflow() > 0:
+            DB_POOL_OVERFLOW_CHECKOUTS.inc(pool)
+
+
+async def monitor_event_loop(interval: float = 0.5):
+    """Background task measuring how late the event loop wakes up"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        if settings.METRICS_ENABLED:
+            EVENT_LOOP_LAG.observe(max(0.0, loop.time() - start - interval))
+
+
+class MetricsMiddleware:
+    """
+    Count requests and time them per route template.
+
+    Also owns the per-request SQL counters; with SQL_DEBUG_HEADERS on
+    they are returned to the client as X-DB-* response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        debug_headers = settings.SQL_DEBUG_HEADERS
+        if scope["type"] != "http" or not (settings.METRICS_ENABLED or debug_headers):
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = ["500"]
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+                if debug_headers:
+                    message["headers"] = list(message.get("headers", [])) + stats.as_headers()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            if settings.METRICS_ENABLED:
+                route = scope.get("route")
+                route_path = route.path if route is not None else "unmatched"
+                method = scope["method"]
+                HTTP_REQUESTS.inc(method, route_path, status[0])
+                HTTP_LATENCY.observe(time.perf_counter() - start, method, route_path)
+                DB_STATEMENTS_PER_REQUEST.observe(stats.statements, route_path)
+                DB_TIME_PER_REQUEST.observe(stats.db_time, route_path)
@@ -0,0 +1,69 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import time
+
+from app.core.config import settings
+from app.db.replica import READ_PRIMARY_COOKIE
+
+# Public page routes served from templates, which answer 200 to anyone.
+# HEAD on these only needs headers, so we skip auth/DB dependencies and
+# Jinja entirely. Pages that redirect signed-out users don't belong here:
+# HEAD must answer what GET would.
+HTML_PAGE_PATHS = {
+    "/",
+    "/feedback",
+    "/privacy",
+    "/terms",
+}
+
+
+class HeadFastPathMiddleware:
+    """Answer HEAD requests for public HTML pages without running the route"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "HEAD" or scope["path"] not in HTML_PAGE_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/html; charset=utf-8"),
+                (b"cache-control", b"no-cache"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b""})
+
+
+# Requests that write. The OAuth callback is a GET but creates the user.
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+WRITE_GET_PATHS = {"/auth/callback"}
+
+
+class ReadYourWritesMiddleware:
+    """
+    After a successful write, set a cookie that pins the client's reads
+    to the primary for READ_YOUR_WRITES_SECONDS (see get_read_db).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (scope["type"] != "http" or not settings.READ_DATABASE_URL
+                or (scope["method"] in SAFE_METHODS and scope["path"] not in WRITE_GET_PATHS)):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.READ_YOUR_WRITES_SECONDS
+                cookie = (f"{READ_PRIMARY_COOKIE}={time.time() + window:.3f}; Max-Age={int(window) + 1}; "
+                          f"Path=/; HttpOnly; SameSite=Lax")
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -6,6 +6,9 @@ from app.core.config import settings
 # JWT settings
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
+# Request state key under which middleware leaves the access_token cookie's
+# decoded payload (None if invalid), so the auth dependency needn't verify it again
+TOKEN_PAYLOAD_STATE = "access_token_payload"
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT token for session management"""
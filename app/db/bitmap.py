@@ -0,0 +1,106 @@
+"""
+Day bitmaps stored as bytes.
+
+Bit i is day `origin + i`, numbered least-significant bit first within
+each byte - the order PostgreSQL's set_bit() uses - so the whole value
+reads as one Python int with int.from_bytes(bitmap, "little"). A year
+of activity is 46 bytes.
+
+`bitmap_set(column, index)` sets a bit inside an UPDATE, growing the
+value as needed, so marking a day is a single atomic statement:
+set_bit() on PostgreSQL, a registered function on SQLite.
+"""
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import LargeBinary
+from datetime import date
+from typing import Optional, Tuple
+
+EPOCH = date(1970, 1, 1)
+
+
+def day_number(day: date) -> int:
+    """Days since 1970-01-01 (plain integers keep the SQL dialect-neutral)"""
+    return (day - EPOCH).days
+
+
+def set_bit(bitmap: Optional[bytes], index: int) -> Optional[bytes]:
+    """`bitmap` with bit `index` set (negative indexes are ignored)"""
+    if index is None or index < 0:
+        return bitmap
+    data = bytearray(bitmap or b"")
+    byte = index // 8
+    if byte >= len(data):
+        data.extend(bytes(byte + 1 - len(data)))
+    data[byte] |= 1 << (index % 8)
+    return bytes(data)
+
+
+def to_int(bitmap: Optional[bytes]) -> int:
+    return int.from_bytes(bitmap or b"", "little")
+
+
+def from_int(bits: int) -> bytes:
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def from_days(days) -> Tuple[Optional[int], Optional[bytes]]:
+    """(origin, bitmap) with a bit set for each of the day numbers in `days`"""
+    days = list(days)
+    if not days:
+        return None, None
+    origin = min(days)
+    bits = 0
+    for day in days:
+        bits |= 1 << (day - origin)
+    return origin, from_int(bits)
+
+
+def window(bits: int, start: int, length: int) -> int:
+    """Bits [start, start + length) as an int; bits before 0 read as unset"""
+    shifted = bits >> start if start >= 0 else bits << -start
+    return shifted & ((1 << length) - 1)
+
+
+def run_ending_at(bits: int, index: int) -> int:
+    """Length of the run of set bits that ends at `index`"""
+    if index < 0 or not (bits >> index) & 1:
+        return 0
+    unset = ~bits & ((1 << (index + 1)) - 1)
+    return index - (unset.bit_length() - 1)
+
+
+def longest_run(bits: int) -> int:
+    """Longest run of set bits: each AND with itself shifted shortens every run by one"""
+    length = 0
+    while bits:
+        bits &= bits >> 1
+        length += 1
+    return length
+
+
+class bitmap_set(FunctionElement):
+    """SQL: the bitmap expression with bit `index` set"""
+
+    type = LargeBinary()
+    inherit_cache = True
+    name = "bitmap_set"
+
+
+@compiles(bitmap_set)
+def _compile_bitmap_set(element, compiler, **kw):
+    # SQLite: the function registered on each connection (register_sqlite_functions)
+    bitmap, index = list(element.clauses)
+    return f"bitmap_set({compiler.process(bitmap, **kw)}, {compiler.process(index, **kw)})"
+
+
+@compiles(bitmap_set, "postgresql")
+def _compile_bitmap_set_postgresql(element, compiler, **kw):
+    bitmap, index = (compiler.process(clause, **kw) for clause in element.clauses)
+    current = f"coalesce({bitmap}, ''::bytea)"
+    padded = f"{current} || decode(repeat('00', greatest(0, ({index}) / 8 + 1 - length({current}))), 'hex')"
+    return f"(CASE WHEN ({index}) < 0 THEN {bitmap} ELSE set_bit({padded}, {index}, 1) END)"
+
+
+def register_sqlite_functions(dbapi_connection):
+    dbapi_connection.create_function("bitmap_set", 2, set_bit, deterministic=True)
@@ -1,10 +1,19 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload
 from app.models.user import User
 from app.models.oauth_token import OAuthToken
 from app.models.schedule import Schedule
-from typing import Optional, Dict, Any
-import uuid
-from datetime import datetime
+from app.models.review_item import ReviewItem
+from app.db.read_cache import touch
+from app.db.types import new_id
+from typing import Optional, Dict, Any, Iterable, List, Sequence, Tuple
+from datetime import date, datetime
+
+# CRUD methods flush but never commit: the caller owns the transaction
+# and commits once when the whole unit of work is done. Writes to a
+# user's study data touch() the user, so their cached read models are
+# dropped when that transaction commits.
 
 class UserCRUD:
     """Database operations for Users"""
@@ -28,8 +37,7 @@ class UserCRUD:
             last_login=datetime.utcnow()
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        db.flush()
         return user
     
     @staticmethod
@@ -37,7 +45,6 @@ class UserCRUD:
         user = UserCRUD.get_by_id(db, user_id)
         if user:
             user.last_login = datetime.utcnow()
-            db.commit()
 
 class TokenCRUD:
     """Database operations for OAuth Tokens"""
@@ -57,15 +64,14 @@ class TokenCRUD:
         else:
             # Create new token
             token = OAuthToken(
-                id=str(uuid.uuid4()),
+                id=new_id(),
                 user_id=user_id,
                 token_data=token_data,
                 created_at=datetime.utcnow()
             )
             db.add(token)
         
-        db.commit()
-        db.refresh(token)
+        db.flush()
         return token
 
 class ScheduleCRUD:
@@ -76,17 +82,169 @@ class ScheduleCRUD:
         return db.query(Schedule).filter(Schedule.user_id == user_id).all()
     
     @staticmethod
-    def create(db: Session, schedule_data: Dict[str, Any]) -> Schedule:
-        schedule = Schedule(
-            id=str(uuid.uuid4()),
-            user_id=schedule_data['user_id'],
-            topic=schedule_data['topic'],
-            topic_id=schedule_data.get('topic_id'),
-            start_date=schedule_data['start_date'],
-            intervals=schedule_data['intervals'],
+    def create(db: Session, schedule_data: Dict[str, Any]) -> str:
+        """
+        New schedule with one review item per review date; returns its id.
+        With a topic_id it replaces that topic's schedule if there is one.
+        """
+        start_date = schedule_data['start_date']
+        if not isinstance(start_date, datetime):
+            start_date = datetime.combine(start_date, datetime.min.time())
+        touch(db, schedule_data['user_id'])
+        due_dates = schedule_data.get('review_dates') or [start_date]
+        topic_id = schedule_data.get('topic_id')
+        
+        if topic_id:
+            schedule_id, created = ScheduleCRUD.upsert_for_topic(
+                db, schedule_data['user_id'], topic_id, schedule_data['topic'], start_date,
+                schedule_data['intervals'], update_columns=("topic", "start_date", "intervals")
+            )
+            if not created:
+                ReviewItemCRUD.complete_pending_for_schedule(db, schedule_id)
+        else:
+            schedule = Schedule(
+                id=new_id(),
+                user_id=schedule_data['user_id'],
+                topic=schedule_data['topic'],
+                start_date=start_date,
+                intervals=schedule_data['intervals'],
+                created_at=datetime.utcnow()
+            )
+            db.add(schedule)
+            db.flush()
+            schedule_id = schedule.id
+        
+        ReviewItemCRUD.add_for_schedule_id(db, schedule_id, schedule_data['user_id'], topic_id, due_dates)
+        return schedule_id
+    
+    @staticmethod
+    def upsert_for_topic(
+        db: Session,
+        user_id: str,
+        topic_id: str,
+        topic: str,
+        start_date: datetime,
+        intervals: List[int],
+        update_columns: Sequence[str] = ("start_date",)
+    ) -> Tuple[str, bool]:
+        """
+        A topic's one schedule: created, or `update_columns` overwritten on
+        the existing one. A single INSERT ... ON CONFLICT (user_id, topic_id)
+        DO UPDATE, so concurrent saves can't create a second schedule.
+        
+        Returns (schedule id, created). Core statement - loaded Schedule
+        objects aren't refreshed.
+        """
+        touch(db, user_id)
+        insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        candidate_id = new_id()
+        stmt = insert(Schedule.__table__).values(
+            id=candidate_id,
+            user_id=user_id,
+            topic_id=topic_id,
+            topic=topic,
+            start_date=start_date,
+            intervals=intervals,
+            completed=0,
             created_at=datetime.utcnow()
         )
-        db.add(schedule)
-        db.commit()
-        db.refresh(schedule)
-        return schedule
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "topic_id"],
+            set_={column: stmt.excluded[column] for column in update_columns}
+        ).returning(Schedule.__table__.c.id)
+        schedule_id = db.execute(stmt).scalar_one()
+        # The row keeps its original id on conflict
+        return schedule_id, schedule_id == candidate_id
+
+
+class ReviewItemCRUD:
+    """Database operations for review items (one row per scheduled review)"""
+    
+    @staticmethod
+    def add_for_schedule(db: Session, schedule: Schedule, due_dates: Iterable[date]) -> List[ReviewItem]:
+        return ReviewItemCRUD.add_for_schedule_id(db, schedule.id, schedule.user_id, schedule.topic_id, due_dates)
+    
+    @staticmethod
+    def add_for_schedule_id(
+        db: Session,
+        schedule_id: str,
+        user_id: str,
+        topic_id: Optional[str],
+        due_dates: Iterable[date]
+    ) -> List[ReviewItem]:
+        touch(db, user_id)
+        items = [
+            ReviewItem(
+                id=new_id(),
+                schedule_id=schedule_id,
+                user_id=user_id,
+                topic_id=topic_id,
+                due_at=due if isinstance(due, datetime) else datetime.combine(due, datetime.min.time()),
+                status="pending",
+                created_at=datetime.utcnow()
+            )
+            for due in due_dates
+        ]
+        db.add_all(items)
+        db.flush()
+        return items
+    
+    @staticmethod
+    def get_pending_due(db: Session, user_id: str, until: datetime) -> List[ReviewItem]:
+        """Pending reviews due up to `until` (includes overdue), oldest first"""
+        return db.query(ReviewItem).options(
+            joinedload(ReviewItem.schedule),
+            joinedload(ReviewItem.topic)
+        ).filter(
+            ReviewItem.user_id == user_id,
+            ReviewItem.due_at <= until,
+            ReviewItem.status == "pending"
+        ).order_by(ReviewItem.due_at).all()
+    
+    @staticmethod
+    def get_in_range(db: Session, user_id: str, start: datetime, end: datetime) -> List[ReviewItem]:
+        """Every review (any status) due in [start, end) - for calendar views"""
+        return db.query(ReviewItem).options(joinedload(ReviewItem.schedule)).filter(
+            ReviewItem.user_id == user_id,
+            ReviewItem.due_at >= start,
+            ReviewItem.due_at < end
+        ).order_by(ReviewItem.due_at).all()
+    
+    @staticmethod
+    def complete(db: Session, item_id: str, user_id: str) -> bool:
+        """Mark one pending review done; False if it doesn't exist or isn't pending"""
+        schedule_id = db.execute(
+            update(ReviewItem)
+            .where(ReviewItem.id == item_id, ReviewItem.user_id == user_id, ReviewItem.status == "pending")
+            .values(status="done", completed_at=datetime.utcnow())
+            .returning(ReviewItem.schedule_id)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        if schedule_id is None:
+            return False
+        db.query(Schedule).filter(Schedule.id == schedule_id).update(
+            {"completed": Schedule.completed + 1}, synchronize_session=False
+        )
+        touch(db, user_id)
+        return True
+    
+    @staticmethod
+    def complete_pending_for_schedule(db: Session, schedule_id: str) -> int:
+        """
+        Close every pending review of a schedule (an explain session counts
+        as the review). Callers add the next review too, which touches the user.
+        """
+        done = db.execute(
+            update(ReviewItem)
+            .where(ReviewItem.schedule_id == schedule_id, ReviewItem.status == "pending")
+            .values(status="done", completed_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if done:
+            db.execute(
+                update(Schedule)
+                .where(Schedule.id == schedule_id)
+                .values(completed=Schedule.completed + done)
+                .execution_options(synchronize_session=False)
+            )
+        return done
@@ -0,0 +1,248 @@
+"""
+Change notifications, pushed to browsers over server-sent events.
+
+Write paths call `notify(db, channel, name, **data)` inside their
+transaction. Nothing is sent unless it commits:
+
+    SQLite       the events wait in session.info and are published to
+                 this process's broker by an after_commit hook
+    PostgreSQL   each becomes a pg_notify() in the transaction, which
+                 PostgreSQL delivers at commit to every worker's LISTEN
+                 connection (PgEventListener), so all processes see it
+
+Channels are "user:<id>" for a student's own changes and "feedback" for
+new feedback. Events carry ids, not content: clients refetch what they
+show, through the normal (cached) endpoints.
+
+The broker lives on the event loop. Each subscriber has a bounded queue;
+one that falls behind loses events and is sent a single "resync"
+instead, telling it to refetch everything. Idle subscribers are a
+pending queue read and nothing else - one shared task writes the
+keep-alive comment to all of them.
+"""
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from typing import Dict, Optional, Set
+import asyncio
+import json
+import logging
+import select as _select
+import threading
+
+from app.core.config import settings
+from app.core.metrics import EVENTS_DROPPED, EVENTS_PUBLISHED, _event_brokers
+
+logger = logging.getLogger(__name__)
+
+PG_CHANNEL = "studycore_events"
+PENDING_KEY = "pending_events"
+FEEDBACK_CHANNEL = "feedback"
+
+KEEPALIVE = ": keepalive\n\n"
+RESYNC = "event: resync\ndata: {}\n\n"
+
+
+def user_channel(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def frame(name: str, data: dict) -> str:
+    """One SSE message"""
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+
+
+class Subscription:
+    __slots__ = ("channels", "queue", "overflowed")
+
+    def __init__(self, channels: Set[str], size: int):
+        self.channels = channels
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self.overflowed = False
+
+    async def next_frame(self) -> str:
+        """The next message to send; a resync if events were lost"""
+        message = await self.queue.get()
+        if self.overflowed:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.overflowed = False
+            return RESYNC
+        return message
+
+
+class EventBroker:
+    """Fan-out from channels to this process's subscribers"""
+
+    def __init__(self):
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self._subscribers: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        _event_brokers.append(self)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, channels: Set[str]) -> Subscription:
+        """Called on the event loop, which then receives every publish"""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(channels, settings.SSE_CLIENT_BUFFER)
+        self._subscribers.add(subscription)
+        for channel in channels:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+        for channel in subscription.channels:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[channel]
+
+    def publish(self, channel: str, message: str):
+        """From any thread; dropped early when nobody listens on the channel"""
+        loop = self._loop
+        if loop is None or channel not in self._channels or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(channel, message)
+        else:
+            loop.call_soon_threadsafe(self._deliver, channel, message)
+
+    def broadcast(self, message: str):
+        """To every subscriber (keep-alives, resyncs); event loop only"""
+        for subscription in list(self._subscribers):
+            self._put(subscription, message, keepalive=message is KEEPALIVE)
+
+    def _deliver(self, channel: str, message: str):
+        for subscription in list(self._channels.get(channel, ())):
+            self._put(subscription, message)
+
+    @staticmethod
+    def _put(subscription: Subscription, message: str, keepalive: bool = False):
+        if subscription.queue.full():
+            if not keepalive:  # a backed-up client is already busy - skip its keep-alive
+                subscription.overflowed = True
+                EVENTS_DROPPED.inc()
+            return
+        subscription.queue.put_nowait(message)
+
+
+broker = EventBroker()
+
+
+async def run_keepalive(interval: Optional[float] = None):
+    """Background task: one comment to every subscriber, so proxies keep idle streams open"""
+    interval = interval or settings.SSE_HEARTBEAT_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        broker.broadcast(KEEPALIVE)
+
+
+def _uses_pg_notify(db: Session) -> bool:
+    return settings.EVENTS_PG_NOTIFY and db.get_bind().dialect.name == "postgresql"
+
+
+def notify(db: Session, channel: str, name: str, **data):
+    """Send event `name` to `channel` once `db` commits"""
+    message = frame(name, data)
+    EVENTS_PUBLISHED.inc(name)
+    if _uses_pg_notify(db):
+        db.execute(select(func.pg_notify(PG_CHANNEL, json.dumps([channel, message]))))
+        return
+    # Tagged with the innermost transaction, so a rolled-back savepoint
+    # (one failed job in a group commit) takes its own events with it.
+    # connection() begins one if nothing has run yet, so a rollback is seen.
+    db.connection()
+    transaction = db.get_nested_transaction() or db.get_transaction()
+    db.info.setdefault(PENDING_KEY, []).append((transaction, channel, message))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session):
+    for _, channel, message in session.info.pop(PENDING_KEY, ()):
+        broker.publish(channel, message)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session: Session, previous_transaction):
+    pending = session.info.get(PENDING_KEY)
+    if not pending:
+        return
+    if previous_transaction.parent is None:
+        session.info.pop(PENDING_KEY, None)
+    else:
+        session.info[PENDING_KEY] = [p for p in pending if p[0] is not previous_transaction]
+
+
+class PgEventListener:
+    """
+    LISTENs for pg_notify() events on a dedicated connection and hands
+    them to the broker. After a lost connection it reconnects and tells
+    every subscriber to resync, since events may have been missed.
+    """
+
+    def __init__(self, engine, poll_seconds: float = 1.0):
+        self.engine = engine
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="pg-event-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+        self._thread = None
+
+    def _listen(self):
+        # Outside the pool: this connection is held for as long as the app runs
+        connection = self.engine.raw_connection()
+        connection.detach()
+        dbapi = connection.driver_connection
+        try:
+            dbapi.autocommit = True
+            with dbapi.cursor() as cursor:
+                cursor.execute(f"LISTEN {PG_CHANNEL}")
+            logger.info("Listening for change events")
+            while not self._stop.is_set():
+                if _select.select([dbapi], [], [], self.poll_seconds) == ([], [], []):
+                    continue
+                dbapi.poll()
+                while dbapi.notifies:
+                    notification = dbapi.notifies.pop(0)
+                    try:
+                        channel, message = json.loads(notification.payload)
+                    except ValueError:
+                        continue
+                    broker.publish(channel, message)
+        finally:
+            connection.close()
+
+    def _run(self):
+        delay = 0.0
+        while not self._stop.is_set():
+            try:
+                if delay:
+                    self._resync()
+                self._listen()
+            except Exception as e:
+                delay = min(30.0, delay * 2 or 1.0)
+                logger.warning("Change-event listener failed, reconnecting in %.0f s: %s", delay, e)
+                self._stop.wait(delay)
+
+    @staticmethod
+    def _resync():
+        loop = broker._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(broker.broadcast, RESYNC)
@@ -1,32 +1,41 @@
 from app.db.base import Base
 from app.db.session import engine
-from app.models.user import User
-from app.models.oauth_token import OAuthToken
-from app.models.schedule import Schedule
-from app.models.feedback import Feedback
-from app.models.analytics import UserAnalytics
-from app.models.topic import Topic, ExplainSession  # ADD THIS
-from sqlalchemy import inspect
+from app.db.migrations import SCHEMA_VERSION, get_schema_version, run_migrations, set_schema_version
+import app.models  # noqa: F401 - registers every model on Base.metadata
+import logging
+
+logger = logging.getLogger(__name__)
 
 def init_db():
-    """Create missing tables (doesn't drop existing ones)"""
+    """Bring the schema up to date (doesn't drop existing tables)"""
     
-    inspector = inspect(engine)
-    existing_tables = inspector.get_table_names()
+    current = get_schema_version(engine)
     
-    print(f"📊 Existing tables before init: {existing_tables}")
+    # Fast path: one SELECT on every boot once the schema is current
+    if current == SCHEMA_VERSION:
+        logger.info("Schema is current (v%d)", current)
+        return
     
-    # This only creates tables that don't exist
-    Base.metadata.create_all(bind=engine)
+    if current is not None and current > SCHEMA_VERSION:
+        logger.warning("Database schema v%d is newer than this code (v%d)", current, SCHEMA_VERSION)
+        return
     
-    # Check again after creation
-    existing_tables = inspector.get_table_names()
-    print(f"✅ Tables after init: {existing_tables}")
+    with engine.begin() as conn:
+        if current is None:
+            logger.info("Created new database at schema v%d", SCHEMA_VERSION)
+        else:
+            # Before create_all: new tables' foreign keys must meet the migrated columns
+            logger.info("Migrating schema v%d -> v%d", current, SCHEMA_VERSION)
+            run_migrations(conn, current)
+        
+        # This only creates tables that don't exist
+        Base.metadata.create_all(bind=conn)
+        
+        set_schema_version(conn, SCHEMA_VERSION)
     
-    if len(existing_tables) == 0:
-        print("⚠️ WARNING: No tables exist! Database might not be connected properly.")
-    else:
-        print(f"✅ Database has {len(existing_tables)} tables")
+    logger.info("Database has %d tables", len(Base.metadata.tables))
 
 if __name__ == "__main__":
+    from app.core.logging_config import setup_logging
+    setup_logging()
     init_db()
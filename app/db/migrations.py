@@ -0,0 +1,431 @@
+"""
+Schema versioning.
+
+The database carries a one-row `schema_version` stamp. On startup
+`init_db` reads it with a single query; only when it is behind
+SCHEMA_VERSION does it create tables and run the pending migrations.
+
+To change the schema: update the models, write a migration function
+taking a Connection, register it in MIGRATIONS under the next version
+number and bump SCHEMA_VERSION. Migrations run inside one transaction,
+before create_all: a migration whose work needs a new table creates it
+(create_tables), so its foreign keys meet the columns as they are by
+then - on PostgreSQL, uuid only from version 2.
+"""
+from sqlalchemy import Table, bindparam, func, insert, inspect, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.schema import CreateTable
+from typing import Callable, Dict, List, Optional
+from datetime import date, datetime, timedelta
+import logging
+import uuid
+
+from app.db.base import Base
+
+logger = logging.getLogger(__name__)
+
+# Version 0 is the schema as it existed before stamping was introduced;
+# version 1 is the same schema plus the stamp table;
+# version 2 stores UUID ids as native uuid / 16-byte blobs;
+# version 3 adds review_items, expanded from existing schedules;
+# version 4 adds the full-text search index;
+# version 5 adds per-user indexes for filtering and sorting topics;
+# version 6 stores each topic's memory-strength status;
+# version 7 indexes explain sessions by user;
+# version 8 adds the daily cross-user rollups;
+# version 9 stores each user's active days as a bitmap;
+# version 10 merges duplicate schedules and makes (user, topic) unique;
+# version 11 adds the explain-session archive and per-topic summaries;
+# version 12 merges duplicate user_analytics rows and makes user_id unique
+SCHEMA_VERSION = 12
+
+# Columns that held str(uuid4()) and are GUID from version 2, in copy order
+GUID_COLUMNS = {
+    "topics": ["id"],
+    "explain_sessions": ["id", "topic_id"],
+    "schedules": ["id", "topic_id"],
+    "user_analytics": ["id"],
+    "feedback": ["id"],
+    "oauth_tokens": ["id"],
+}
+TOPIC_FOREIGN_KEYS = [("explain_sessions", "topic_id"), ("schedules", "topic_id")]
+
+
+def _uuid_blob(value):
+    return uuid.UUID(value).bytes if value else None
+
+
+def rebuild_sqlite_table(conn: Connection, table: Table, converted: Dict[str, str]):
+    """
+    Recreate `table` from the current model and copy the rows across.
+
+    SQLite can't change a column's type in place. `converted` maps column
+    names to the SQL function applied to them while copying. Only the
+    indexes the table already had are recreated: the model may carry
+    indexes a later migration adds (uq_schedules_user_topic needs
+    dedupe_schedules to run first), and those migrations create them.
+    """
+    old = f"{table.name}_old"
+    old_columns = {row[1] for row in conn.execute(text(f'PRAGMA table_info("{table.name}")'))}
+    indexes = conn.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t AND sql IS NOT NULL"),
+        {"t": table.name}
+    ).scalars().all()
+    for index in indexes:
+        conn.execute(text(f'DROP INDEX "{index}"'))
+    # Legacy mode keeps other tables' REFERENCES pointing at the name
+    # (the rebuilt table), not at the renamed copy we're about to drop
+    conn.execute(text("PRAGMA legacy_alter_table = ON"))
+    conn.execute(text(f'ALTER TABLE "{table.name}" RENAME TO "{old}"'))
+    conn.execute(text("PRAGMA legacy_alter_table = OFF"))
+    conn.execute(CreateTable(table))
+    for index in table.indexes:
+        if index.name in indexes:
+            index.create(conn)
+
+    columns: List[str] = [c.name for c in table.columns if c.name in old_columns]
+    source = ", ".join(f'{converted[c]}("{c}")' if c in converted else f'"{c}"' for c in columns)
+    target = ", ".join(f'"{c}"' for c in columns)
+    conn.execute(text(f'INSERT INTO "{table.name}" ({target}) SELECT {source} FROM "{old}"'))
+    conn.execute(text(f'DROP TABLE "{old}"'))
+
+
+def migrate_guid_ids(conn: Connection):
+    """Convert UUID string ids and topic foreign keys to compact GUID storage"""
+    if conn.dialect.name == "postgresql":
+        for table, column in TOPIC_FOREIGN_KEYS:
+            conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_{column}_fkey"))
+        for table, columns in GUID_COLUMNS.items():
+            for column in columns:
+                conn.execute(text(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE uuid USING NULLIF({column}, '')::uuid"))
+        for table, column in TOPIC_FOREIGN_KEYS:
+            conn.execute(text(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey FOREIGN KEY ({column}) REFERENCES topics (id)"))
+        return
+
+    conn.connection.dbapi_connection.create_function("uuid_blob", 1, _uuid_blob, deterministic=True)
+    for name, columns in GUID_COLUMNS.items():
+        rebuild_sqlite_table(conn, Base.metadata.tables[name], {column: "uuid_blob" for column in columns})
+
+
+def expand_review_items(conn: Connection):
+    """Create review_items rows for every existing schedule"""
+    from app.db.types import new_id
+    from app.models import ReviewItem, Schedule
+
+    create_tables(conn, ReviewItem.__table__)
+    schedules = Schedule.__table__
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    now = datetime.utcnow()
+    rows = []
+    result = conn.execute(select(
+        schedules.c.id, schedules.c.user_id, schedules.c.topic_id,
+        schedules.c.topic, schedules.c.start_date, schedules.c.intervals
+    ))
+    for schedule in result:
+        if schedule.topic_id is not None:
+            # Explain-driven schedule: start_date *is* the next review
+            due = [(schedule.start_date, "pending")]
+        else:
+            # Manual schedule: one review per interval; ones already in the
+            # past were never surfaced, so don't flood the dashboard with them
+            due = [
+                (schedule.start_date + timedelta(days=int(days)),
+                 "pending" if schedule.start_date + timedelta(days=int(days)) >= today else "skipped")
+                for days in (schedule.intervals or [])
+            ]
+        for due_at, status in due:
+            rows.append({
+                "id": new_id(), "schedule_id": schedule.id, "user_id": schedule.user_id,
+                "topic_id": schedule.topic_id, "due_at": due_at, "status": status, "created_at": now
+            })
+        if len(rows) >= 5000:
+            conn.execute(insert(ReviewItem.__table__), rows)
+            rows = []
+    if rows:
+        conn.execute(insert(ReviewItem.__table__), rows)
+
+
+def backfill_search_index(conn: Connection):
+    """Index existing topics and explain sessions for full-text search"""
+    from app.db.search_index import create_search_index, rebuild_search_index
+    create_search_index(Base.metadata, conn)
+    rebuild_search_index(conn)
+
+
+def create_tables(conn: Connection, *tables: Table):
+    for table in tables:
+        table.create(conn, checkfirst=True)
+
+
+def create_indexes(conn: Connection, table: Table, names):
+    for index in table.indexes:
+        if index.name in names:
+            index.create(conn, checkfirst=True)
+
+
+def add_topic_list_indexes(conn: Connection):
+    """Indexes behind the topic list's filters and sort keys"""
+    from app.models import Topic
+    create_indexes(conn, Topic.__table__, {
+        "ix_topics_user_created", "ix_topics_user_subject",
+        "ix_topics_user_last_explained", "ix_topics_user_confidence",
+    })
+
+
+def store_memory_status(conn: Connection):
+    """Add memory_status / status_changes_at to topics and compute them"""
+    from app.models import Topic
+    from app.services.memory_service import MemoryStrengthService
+
+    topics = Topic.__table__
+    columns = {column["name"] for column in inspect(conn).get_columns("topics")}
+    if "memory_status" not in columns:
+        conn.execute(text("ALTER TABLE topics ADD COLUMN memory_status VARCHAR NOT NULL DEFAULT 'CRITICAL'"))
+    if "status_changes_at" not in columns:
+        column_type = topics.c.status_changes_at.type.compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE topics ADD COLUMN status_changes_at {column_type}"))
+
+    # Never-explained topics are already right (CRITICAL, no change due)
+    now = datetime.utcnow()
+    store = update(topics).where(topics.c.id == bindparam("topic_id")).values(
+        memory_status=bindparam("status"), status_changes_at=bindparam("changes_at"))
+    rows = []
+    result = conn.execute(select(
+        topics.c.id, topics.c.total_explains, topics.c.avg_confidence, topics.c.last_explained
+    ).where(topics.c.total_explains > 0))
+    for topic in result.all():
+        status, changes_at = MemoryStrengthService.transition(
+            topic.total_explains, topic.avg_confidence, topic.last_explained, now)
+        rows.append({"topic_id": topic.id, "status": status, "changes_at": changes_at})
+        if len(rows) >= 5000:
+            conn.execute(store, rows)
+            rows = []
+    if rows:
+        conn.execute(store, rows)
+
+    create_indexes(conn, topics, {"ix_topics_status", "ix_topics_status_changes_at"})
+
+
+def add_session_history_index(conn: Connection):
+    """Index explain sessions by (user, topic, time), covering confidence, for per-user history reads"""
+    from app.models import ExplainSession
+    create_indexes(conn, ExplainSession.__table__, {"ix_explain_sessions_user_topic"})
+
+
+def add_daily_rollups(conn: Connection):
+    """
+    The rollup tables, and the created_at indexes the rollup job reads new
+    rows through. The job backfills the rollups on its first run.
+    """
+    from app.models import DailyActiveStudent, DailyRollup, ExplainSession, RollupState, Topic, User
+    create_tables(conn, DailyRollup.__table__, DailyActiveStudent.__table__, RollupState.__table__)
+    create_indexes(conn, ExplainSession.__table__, {"ix_explain_sessions_created_at"})
+    create_indexes(conn, Topic.__table__, {"ix_topics_created_at"})
+    create_indexes(conn, User.__table__, {"ix_users_created_at"})
+
+
+def store_activity_bitmap(conn: Connection):
+    """
+    Add activity / activity_origin to user_analytics and fill them from
+    the days each user explained something, plus the days covered by
+    their stored current streak (logins leave no other trace).
+    """
+    from app.db.bitmap import day_number, from_days
+    from app.models import ExplainSession, UserAnalytics
+
+    analytics = UserAnalytics.__table__
+    columns = {column["name"] for column in inspect(conn).get_columns("user_analytics")}
+    for name in ("activity", "activity_origin"):
+        if name not in columns:
+            column_type = analytics.c[name].type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE user_analytics ADD COLUMN {name} {column_type}"))
+
+    sessions = ExplainSession.__table__
+    active: Dict[str, set] = {}
+    day = func.date(sessions.c.created_at)
+    for user_id, session_day in conn.execute(select(sessions.c.user_id, day).distinct()):
+        if isinstance(session_day, str):
+            session_day = date.fromisoformat(session_day)
+        active.setdefault(user_id, set()).add(day_number(session_day))
+
+    store = update(analytics).where(analytics.c.id == bindparam("row_id")).values(
+        activity=bindparam("bitmap"), activity_origin=bindparam("origin"))
+    rows = []
+    result = conn.execute(select(
+        analytics.c.id, analytics.c.user_id, analytics.c.last_active, analytics.c.current_streak))
+    for row in result.all():
+        days = set(active.get(row.user_id, ()))
+        if row.last_active and row.current_streak:
+            last = day_number(row.last_active.date())
+            days.update(range(last - row.current_streak + 1, last + 1))
+        origin, bitmap = from_days(days)
+        if bitmap is not None:
+            rows.append({"row_id": row.id, "bitmap": bitmap, "origin": origin})
+        if len(rows) >= 5000:
+            conn.execute(store, rows)
+            rows = []
+    if rows:
+        conn.execute(store, rows)
+
+
+def dedupe_schedules(conn: Connection):
+    """
+    Merge schedules that share (user_id, topic_id) - left by concurrent
+    explains before the upsert - then add the unique index.
+
+    The schedule explained most recently (latest start_date) is kept. The
+    others' review history moves to it, their pending reviews are marked
+    skipped (superseded by the keeper's own), their completed counts are
+    added to it, and they are deleted.
+    """
+    from app.models import ReviewItem, Schedule
+
+    schedules, items = Schedule.__table__, ReviewItem.__table__
+    duplicated = select(schedules.c.user_id, schedules.c.topic_id).where(
+        schedules.c.topic_id.isnot(None)
+    ).group_by(schedules.c.user_id, schedules.c.topic_id).having(func.count() > 1).subquery()
+    rows = conn.execute(
+        select(schedules.c.id, schedules.c.user_id, schedules.c.topic_id, schedules.c.completed)
+        .join(duplicated, (schedules.c.user_id == duplicated.c.user_id)
+              & (schedules.c.topic_id == duplicated.c.topic_id))
+        .order_by(schedules.c.user_id, schedules.c.topic_id,
+                  schedules.c.start_date.desc(), schedules.c.created_at.desc())
+    ).all()
+
+    groups: Dict[tuple, list] = {}
+    for row in rows:
+        groups.setdefault((row.user_id, row.topic_id), []).append(row)
+    merged = 0
+    for keeper, *others in groups.values():
+        other_ids = [other.id for other in others]
+        conn.execute(update(items).where(
+            items.c.schedule_id.in_(other_ids), items.c.status == "pending"
+        ).values(status="skipped"))
+        conn.execute(update(items).where(items.c.schedule_id.in_(other_ids)).values(schedule_id=keeper.id))
+        conn.execute(update(schedules).where(schedules.c.id == keeper.id).values(
+            completed=(keeper.completed or 0) + sum(other.completed or 0 for other in others)))
+        conn.execute(schedules.delete().where(schedules.c.id.in_(other_ids)))
+        merged += len(others)
+    if merged:
+        logger.info("Merged %d duplicate schedules into %d", merged, len(groups))
+
+    create_indexes(conn, schedules, {"uq_schedules_user_topic"})
+
+
+def add_session_archive(conn: Connection):
+    """
+    The archive and summary tables with their indexes. Nothing moves
+    here: the archive job does that.
+    """
+    from app.models import ArchivedExplainSession, TopicSessionSummary
+    create_tables(conn, ArchivedExplainSession.__table__, TopicSessionSummary.__table__)
+    create_indexes(conn, ArchivedExplainSession.__table__, {"ix_explain_sessions_archive_user_topic"})
+    create_indexes(conn, TopicSessionSummary.__table__, {"ix_topic_session_summaries_user"})
+
+
+def dedupe_user_analytics(conn: Connection):
+    """
+    Merge user_analytics rows that share a user_id - left by concurrent
+    first activities before the upsert - then make user_id unique.
+
+    The oldest row is kept. Counters are summed, activity bitmaps OR'd
+    (on the earliest origin), and the latest activity and the longest
+    stored streaks are kept.
+    """
+    from app.db.bitmap import from_int, to_int
+    from app.models import UserAnalytics
+
+    analytics = UserAnalytics.__table__
+    duplicated = select(analytics.c.user_id).group_by(analytics.c.user_id).having(func.count() > 1).subquery()
+    rows = conn.execute(
+        select(analytics).where(analytics.c.user_id.in_(select(duplicated.c.user_id)))
+        .order_by(analytics.c.user_id, analytics.c.created_at, analytics.c.id)
+    ).all()
+
+    groups: Dict[str, list] = {}
+    for row in rows:
+        groups.setdefault(row.user_id, []).append(row)
+    merged = 0
+    for keeper, *others in groups.values():
+        group = [keeper, *others]
+        origins = [row.activity_origin for row in group if row.activity and row.activity_origin is not None]
+        origin, bits = (min(origins), 0) if origins else (None, 0)
+        for row in group:
+            if row.activity and row.activity_origin is not None:
+                bits |= to_int(row.activity) << (row.activity_origin - origin)
+        total = lambda column: sum(getattr(row, column) or 0 for row in group)  # noqa: E731
+        conn.execute(update(analytics).where(analytics.c.id == keeper.id).values(
+            total_sessions=total("total_sessions"),
+            total_schedules_created=total("total_schedules_created"),
+            total_events_created=total("total_events_created"),
+            last_active=max((row.last_active for row in group if row.last_active), default=None),
+            current_streak=max(row.current_streak or 0 for row in group),
+            longest_streak=max(row.longest_streak or 0 for row in group),
+            activity=from_int(bits) if origins else None,
+            activity_origin=origin,
+        ))
+        conn.execute(analytics.delete().where(analytics.c.id.in_([row.id for row in others])))
+        merged += len(others)
+    if merged:
+        logger.info("Merged %d duplicate user_analytics rows into %d", merged, len(groups))
+
+    # Replaced by the unique index
+    conn.execute(text("DROP INDEX IF EXISTS ix_user_analytics_user_id"))
+    create_indexes(conn, analytics, {"uq_user_analytics_user"})
+
+
+MIGRATIONS: Dict[int, Callable[[Connection], None]] = {
+    2: migrate_guid_ids,
+    3: expand_review_items,
+    4: backfill_search_index,
+    5: add_topic_list_indexes,
+    6: store_memory_status,
+    7: add_session_history_index,
+    8: add_daily_rollups,
+    9: store_activity_bitmap,
+    10: dedupe_schedules,
+    11: add_session_archive,
+    12: dedupe_user_analytics,
+}
+
+
+def get_schema_version(engine: Engine) -> Optional[int]:
+    """
+    Read the stamp. Returns None for an empty database and 0 for a
+    database created before stamping existed.
+    """
+    with engine.connect() as conn:
+        try:
+            return conn.execute(text("SELECT version FROM schema_version WHERE id = 1")).scalar()
+        except (OperationalError, ProgrammingError):
+            conn.rollback()
+        # No stamp table - legacy database if the original tables are there
+        try:
+            conn.execute(text("SELECT 1 FROM users WHERE 1 = 0"))
+            return 0
+        except (OperationalError, ProgrammingError):
+            return None
+
+
+def set_schema_version(conn: Connection, version: int):
+    updated = conn.execute(
+        text("UPDATE schema_version SET version = :v, applied_at = :t WHERE id = 1"),
+        {"v": version, "t": datetime.utcnow()}
+    ).rowcount
+    if not updated:
+        conn.execute(
+            text("INSERT INTO schema_version (id, version, applied_at) VALUES (1, :v, :t)"),
+            {"v": version, "t": datetime.utcnow()}
+        )
+
+
+def run_migrations(conn: Connection, current: int):
+    """Apply every registered migration newer than `current`"""
+    for version in range(current + 1, SCHEMA_VERSION + 1):
+        migration = MIGRATIONS.get(version)
+        if migration is not None:
+            logger.info("Applying migration %d: %s", version, migration.__doc__ or migration.__name__)
+            migration(conn)
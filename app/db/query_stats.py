@@ -0,0 +1,161 @@
+"""
+Per-request SQL accounting.
+
+Engine event hooks count statements, round trips, commits and rows for
+whatever request (or `track_queries()` block) is currently active. Slow
+SELECTs are logged together with their query plan.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+import logging
+import time
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.base import Base
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """SQL counters for one request"""
+
+    __slots__ = ("statements", "round_trips", "commits", "rows", "db_time", "captured")
+
+    def __init__(self, capture: bool = False):
+        self.statements = 0
+        self.round_trips = 0
+        self.commits = 0
+        self.rows = 0
+        self.db_time = 0.0
+        self.captured: Optional[List[str]] = [] if capture else None
+
+    def as_headers(self) -> list:
+        return [
+            (b"x-db-statements", str(self.statements).encode()),
+            (b"x-db-round-trips", str(self.round_trips).encode()),
+            (b"x-db-commits", str(self.commits).encode()),
+            (b"x-db-rows", str(self.rows).encode()),
+            (b"x-db-time-ms", f"{self.db_time * 1000:.2f}".encode()),
+        ]
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+@contextmanager
+def track_queries(capture: bool = False):
+    """Collect SQL counters for everything executed inside the block"""
+    stats = RequestStats(capture=capture)
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """
+    Fail if the block runs more than `limit` SQL statements.
+
+    Usage:
+        with assert_max_queries(3):
+            TopicCRUD.get_user_topics(db, user_id)
+    """
+    with track_queries(capture=True) as stats:
+        yield stats
+    if stats.statements > limit:
+        listing = "\n".join(f"  {i + 1}. {sql}" for i, sql in enumerate(stats.captured))
+        raise AssertionError(f"Expected at most {limit} SQL statements, got {stats.statements}:\n{listing}")
+
+
+def assert_response_queries(response, limit: int):
+    """Fail if a response (with SQL_DEBUG_HEADERS on) reports more than `limit` statements"""
+    count = int(response.headers["x-db-statements"])
+    if count > limit:
+        raise AssertionError(f"{response.request.method} {response.request.url.path}: "
+                             f"expected at most {limit} SQL statements, got {count}")
+
+
+def explain_statement(conn, statement: str, parameters) -> List[str]:
+    """Fetch the query plan on the same DBAPI connection (bypasses engine events)"""
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+_orm_instrumented = False
+
+# Explicit transaction control (SQLite profile emits its own BEGIN, the
+# writer uses SAVEPOINTs) costs a round trip but isn't a query
+_TRANSACTION_CONTROL = ("BEGIN", "SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+# Statements a slow query gets logged with the plan of: reads, CTEs
+# included. EXPLAIN without ANALYZE doesn't run the statement, so a
+# WITH ... INSERT is safe to explain too.
+_EXPLAINABLE = ("SELECT", "WITH")
+
+
+def instrument_engine(engine):
+    """Attach per-request SQL accounting to a SQLAlchemy engine"""
+    global _orm_instrumented
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.round_trips += 1
+            stats.db_time += elapsed
+            if statement.startswith(_TRANSACTION_CONTROL):
+                return
+            stats.statements += len(parameters) if executemany else 1
+            if (context.isinsert or context.isupdate or context.isdelete) and cursor.rowcount > 0:
+                stats.rows += cursor.rowcount
+            if stats.captured is not None:
+                stats.captured.append(statement)
+
+        if elapsed * 1000 >= settings.SLOW_QUERY_MS and statement.lstrip().upper().startswith(_EXPLAINABLE):
+            try:
+                plan = explain_statement(conn, statement, parameters)
+            except Exception as e:
+                plan = [f"(EXPLAIN failed: {e})"]
+            logger.warning("Slow query (%.1f ms): %s\n  plan: %s", elapsed * 1000, statement, "\n        ".join(plan))
+
+    @event.listens_for(engine, "commit")
+    def _commit(conn):
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.commits += 1
+            stats.round_trips += 1
+
+    @event.listens_for(engine, "rollback")
+    def _rollback(conn):
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.round_trips += 1
+
+    if not _orm_instrumented:
+        # SELECT rowcount isn't reliable across drivers, so count loaded ORM rows
+        @event.listens_for(Base, "load", propagate=True)
+        def _load(target, context):
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.rows += 1
+
+        _orm_instrumented = True
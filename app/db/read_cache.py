@@ -0,0 +1,150 @@
+"""
+Per-user cache of computed read models (topic list, memory stats,
+due-today, analytics stats, recall estimates).
+
+Each user has a version. Write paths call `touch(db, user_id)`, which
+only marks the session; when the session commits, the version moves on,
+so every entry computed before the write is ignored from then on. The
+bump happens after the commit: a read that sees the new version also
+sees the new rows, and one that started earlier caches under the old
+version, which is already dead. A rolled-back session bumps nothing.
+
+Concurrent misses for the same key wait on the first one's computation
+instead of repeating it (single flight). The computation runs in a
+worker thread, on a session of its own (the request's may be closed
+under it if the client goes away), so the event loop keeps serving
+while it does.
+
+Entries are kept per read target: a read from a lagging replica never
+answers a request pinned to the primary (read-your-writes). Replica
+reads within the replica's allowed lag of the user's last write aren't
+kept at all - they may predate it, and would outlive the lag.
+
+The cache lives in one process: other processes learn of a write only
+when their entry expires (READ_CACHE_TTL_SECONDS), which also bounds
+how stale time-dependent values (days since, due today) can get.
+"""
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, Hashable, Tuple
+import asyncio
+import itertools
+import time
+
+from app.core.config import settings
+from app.core.metrics import READ_CACHE_REQUESTS, _read_caches
+from app.db.session import READ_TARGET_KEY, read_session_factory
+
+TOUCHED_KEY = "read_cache_users"
+
+
+class ReadModelCache:
+    """Bounded LRU of per-user read models, invalidated by version"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (version, expires at, value); only touched from the event loop
+        self._entries: "OrderedDict[Tuple, Tuple[int, float, Any]]" = OrderedDict()
+        self._flights: Dict[Tuple, asyncio.Future] = {}
+        # user -> version. Bumped from any thread; values come from one global
+        # counter, so two concurrent bumps can't both produce the same version.
+        self._versions: Dict[str, int] = {}
+        self._written_at: Dict[str, float] = {}  # user -> monotonic time of the last bump
+        self._clock = itertools.count(1)
+        _read_caches.append(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self, user_id: str):
+        self._written_at[user_id] = time.monotonic()
+        self._versions[user_id] = next(self._clock)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get(self, db: Session, user_id: str, model: str, params: Hashable,
+                  compute: Callable[[Session], Any]) -> Any:
+        """
+        The `model` read model of `user_id` for `params`, read from the
+        database `db` (a get_read_db session) reads: cached, or computed
+        once by `compute(session)` in a worker thread, with a new session
+        on the same database. Callers must not mutate the value - it is
+        shared.
+        """
+        if not settings.READ_CACHE_ENABLED:
+            return compute(db)
+
+        target = db.info.get(READ_TARGET_KEY, "primary")
+        key = (user_id, model, params, target)
+        version = self._versions.get(user_id, 0)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version and entry[1] > time.monotonic():
+            self._entries.move_to_end(key)
+            READ_CACHE_REQUESTS.inc(model, "hit")
+            return entry[2]
+
+        flight = self._flights.get((key, version))
+        if flight is None:
+            READ_CACHE_REQUESTS.inc(model, "miss")
+            # A task of its own: a requester that goes away doesn't cancel it for the others
+            flight = asyncio.ensure_future(asyncio.to_thread(self._compute, read_session_factory(target), compute))
+            self._flights[(key, version)] = flight
+            flight.add_done_callback(lambda done: self._landed(key, version, done))
+        else:
+            READ_CACHE_REQUESTS.inc(model, "coalesced")
+        return await asyncio.shield(flight)
+
+    @staticmethod
+    def _compute(session_factory, compute: Callable[[Session], Any]) -> Any:
+        db = session_factory()
+        try:
+            return compute(db)
+        finally:
+            db.close()
+
+    def _landed(self, key: Tuple, version: int, flight: asyncio.Future):
+        del self._flights[(key, version)]
+        if flight.cancelled() or flight.exception() is not None:
+            return
+        # A write committed meanwhile: the value may predate it, so it went
+        # to the requests already waiting but isn't kept
+        if self._versions.get(key[0], 0) != version:
+            return
+        if key[3] == "replica" and self._in_replica_lag(key[0]):
+            return
+        self._entries[key] = (version, time.monotonic() + self.ttl, flight.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _in_replica_lag(self, user_id: str) -> bool:
+        """Whether the replica may not have `user_id`'s last write yet (lag is checked periodically)"""
+        written_at = self._written_at.get(user_id)
+        window = settings.REPLICA_MAX_LAG_SECONDS + settings.REPLICA_LAG_CHECK_SECONDS
+        return written_at is not None and time.monotonic() - written_at < window
+
+
+read_cache = ReadModelCache(settings.READ_CACHE_MAX_ENTRIES, settings.READ_CACHE_TTL_SECONDS)
+
+
+def touch(db: Session, user_id: str):
+    """Mark `user_id`'s read models stale once `db` commits"""
+    if user_id:
+        db.info.setdefault(TOUCHED_KEY, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_touched(session: Session):
+    for user_id in session.info.pop(TOUCHED_KEY, ()):
+        read_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_touched(session: Session, previous_transaction):
+    # Only the outermost rollback discards the writes; a savepoint rollback
+    # (one failed job in a group commit) leaves the others' marks in place
+    if previous_transaction.parent is None:
+        session.info.pop(TOUCHED_KEY, None)
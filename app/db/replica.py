@@ -0,0 +1,135 @@
+"""
+Read replica support.
+
+ReplicaMonitor keeps a cached estimate of how far the replica is behind
+the primary; get_read_db only sends reads there while that lag is within
+REPLICA_MAX_LAG_SECONDS. After a write the client gets a short-lived
+cookie that pins its reads to the primary (read-your-writes).
+
+SqliteReplicator fakes replication between two SQLite files for local
+testing: it snapshots the primary and applies the snapshot to the
+replica file `delay` seconds later, over and over.
+"""
+from sqlalchemy import text
+from typing import Optional
+import logging
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+_PG_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+def sqlite_path(url: str) -> str:
+    return url.split(":///", 1)[1]
+
+
+class SqliteReplicator:
+    """Copies a SQLite primary into a replica file with an artificial delay"""
+
+    def __init__(self, primary_path: str, replica_path: str, delay: float, interval: float = 0.2):
+        self.primary_path = primary_path
+        self.replica_path = replica_path
+        self.delay = delay
+        self.interval = interval
+        self.applied_at: Optional[float] = None  # when the snapshot now on the replica was taken
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sqlite-replicator", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+        self._thread = None
+
+    def lag(self) -> Optional[float]:
+        return None if self.applied_at is None else time.time() - self.applied_at
+
+    def sync_once(self, delay: float = 0.0):
+        taken = time.time()
+        snapshot = sqlite3.connect(":memory:")
+        try:
+            source = sqlite3.connect(self.primary_path)
+            try:
+                source.backup(snapshot)
+            finally:
+                source.close()
+            if self._stop.wait(max(0.0, taken + delay - time.time())):
+                return
+            target = sqlite3.connect(self.replica_path, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+            try:
+                snapshot.backup(target)
+            finally:
+                target.close()
+        finally:
+            snapshot.close()
+        self.applied_at = taken
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync_once(self.delay)
+            except Exception as e:
+                logger.warning("Simulated replication failed: %s", e)
+            self._stop.wait(self.interval)
+
+
+class ReplicaMonitor:
+    """Cached replica lag; None means the replica can't be used right now"""
+
+    def __init__(self, engine, replicator: Optional[SqliteReplicator] = None):
+        self.engine = engine
+        self.replicator = replicator
+        self._lag: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _probe(self) -> Optional[float]:
+        with self.engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                lag = conn.execute(_PG_LAG_SQL).scalar()
+                return float(lag) if lag is not None else None
+            conn.execute(text("SELECT 1"))
+        return self.replicator.lag() if self.replicator is not None else 0.0
+
+    def lag(self) -> Optional[float]:
+        now = time.monotonic()
+        fresh = self._checked_at is not None and now - self._checked_at < settings.REPLICA_LAG_CHECK_SECONDS
+        # Only one request refreshes; the rest use the last value
+        if not fresh and self._lock.acquire(blocking=False):
+            try:
+                try:
+                    self._lag = self._probe()
+                except Exception as e:
+                    logger.warning("Replica lag check failed: %s", e)
+                    self._lag = None
+                self._checked_at = time.monotonic()
+            finally:
+                self._lock.release()
+        return self._lag
+
+    def usable(self) -> tuple:
+        """(usable, reason) for routing a read to the replica"""
+        lag = self.lag()
+        if lag is None:
+            return False, "unavailable"
+        if lag > settings.REPLICA_MAX_LAG_SECONDS:
+            return False, "lagging"
+        return True, "ok"
@@ -6,26 +6,35 @@ from app.models.schedule import Schedule
 from app.models.feedback import Feedback
 from app.models.analytics import UserAnalytics
 from app.models.topic import Topic, ExplainSession
+from app.models.schema_version import SchemaVersion
+from app.db.migrations import SCHEMA_VERSION, set_schema_version
 from sqlalchemy import inspect, text
+import logging
+
+logger = logging.getLogger(__name__)
 
 def reset_db():
     """Drop all tables and recreate them"""
     
-    print("🗑️  Dropping all existing tables...")
+    logger.info("Dropping all existing tables...")
     
     # Drop all tables
     Base.metadata.drop_all(bind=engine)
     
-    print("✅ All tables dropped")
+    logger.info("All tables dropped")
     
     # Recreate all tables
-    print("🔨 Creating new tables with updated schema...")
+    logger.info("Creating new tables with updated schema...")
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        set_schema_version(conn, SCHEMA_VERSION)
     
     # Verify
     inspector = inspect(engine)
     tables = inspector.get_table_names()
-    print(f"✅ Created {len(tables)} tables: {tables}")
+    logger.info("Created %d tables: %s", len(tables), tables)
 
 if __name__ == "__main__":
+    from app.core.logging_config import setup_logging
+    setup_logging()
     reset_db()
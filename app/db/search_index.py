@@ -0,0 +1,201 @@
+"""
+Full-text index over topics and explain-session reflections.
+
+SQLite: an FTS5 table `search_index`. Each row's rowid is derived from
+the document id, so updates and deletes are rowid lookups. The owner is
+indexed as a single hashed token (`user_key`), so the per-user filter
+is part of the MATCH rather than a scan over everyone's hits. Prefix
+indexes of 2-6 characters keep search-as-you-type queries from merging
+every matching term's doclist across the whole corpus.
+
+PostgreSQL: a `search_documents` table with a generated, weighted
+`tsvector` column under a GIN index.
+
+The index is kept current by mapper events. The documents are written
+in the same flush, and so the same transaction, as the rows they
+describe. Bulk inserts that bypass the ORM (the benchmark dataset
+generator) must call rebuild_search_index() afterwards.
+"""
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection
+import hashlib
+import uuid
+
+from app.db.base import Base
+from app.models.topic import Topic, ExplainSession
+
+PREFIX_MAX = 6  # longest prefix index; longer prefixes are truncated to it
+TOPIC_FIELDS = ("title", "subject", "description")
+SESSION_FIELDS = ("struggles", "forgot", "unclear")
+# Archived sessions keep their documents (see app/services/archive_service.py)
+SESSION_TABLES = ("explain_sessions", "explain_sessions_archive")
+
+_SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        user_key, title, body,
+        doc_type UNINDEXED, doc_id UNINDEXED, topic_id UNINDEXED,
+        tokenize = 'porter unicode61', prefix = '2 3 4 5 6'
+    )""",
+]
+
+_POSTGRES_DDL = [
+    """CREATE TABLE IF NOT EXISTS search_documents (
+        doc_id uuid PRIMARY KEY,
+        doc_type text NOT NULL,
+        user_id text NOT NULL,
+        topic_id uuid,
+        title text NOT NULL DEFAULT '',
+        body text NOT NULL DEFAULT '',
+        tsv tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')
+        ) STORED
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_tsv ON search_documents USING GIN (tsv)",
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_user ON search_documents (user_id)",
+]
+
+
+def user_key(user_id: str) -> str:
+    """One FTS token per user (raw ids would be split into several tokens)"""
+    return "u" + hashlib.sha1(user_id.encode()).hexdigest()[:16]
+
+
+def search_rowid(doc_id: str) -> int:
+    """Stable signed 64-bit rowid from the random half of a UUID"""
+    return int.from_bytes(uuid.UUID(str(doc_id)).bytes[8:], "big", signed=True)
+
+
+def _join(*parts) -> str:
+    return "\n".join(p for p in parts if p)
+
+
+def _upsert(conn: Connection, doc_type: str, doc_id: str, user_id: str, topic_id, title: str, body: str):
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("""
+            INSERT INTO search_documents (doc_id, doc_type, user_id, topic_id, title, body)
+            VALUES (CAST(:doc_id AS uuid), :doc_type, :user_id, CAST(:topic_id AS uuid), :title, :body)
+            ON CONFLICT (doc_id) DO UPDATE SET title = EXCLUDED.title, body = EXCLUDED.body
+        """), {"doc_id": doc_id, "doc_type": doc_type, "user_id": user_id,
+               "topic_id": topic_id, "title": title, "body": body})
+    else:
+        conn.execute(text("""
+            REPLACE INTO search_index (rowid, user_key, title, body, doc_type, doc_id, topic_id)
+            VALUES (:rowid, :user_key, :title, :body, :doc_type, :doc_id, :topic_id)
+        """), {"rowid": search_rowid(doc_id), "user_key": user_key(user_id), "title": title, "body": body,
+               "doc_type": doc_type, "doc_id": str(doc_id), "topic_id": str(topic_id) if topic_id else None})
+
+
+def _delete(conn: Connection, doc_id: str):
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("DELETE FROM search_documents WHERE doc_id = CAST(:doc_id AS uuid)"), {"doc_id": doc_id})
+    else:
+        conn.execute(text("DELETE FROM search_index WHERE rowid = :rowid"), {"rowid": search_rowid(doc_id)})
+
+
+def delete_documents(conn: Connection, doc_ids):
+    """Drop the documents of rows removed without the ORM (mapper events don't see Core deletes)"""
+    for doc_id in doc_ids:
+        _delete(conn, doc_id)
+
+
+def _index_topic(conn: Connection, topic: Topic):
+    _upsert(conn, "topic", topic.id, topic.user_id, topic.id, topic.title or "",
+            _join(topic.subject, topic.description))
+
+
+def _index_session(conn: Connection, session: ExplainSession):
+    body = _join(session.struggles, session.forgot, session.unclear)
+    if body:
+        _upsert(conn, "session", session.id, session.user_id, session.topic_id, "", body)
+
+
+# -- keep the index in step with ORM writes ---------------------------------
+
+@event.listens_for(Topic, "after_insert")
+def _topic_inserted(mapper, connection, target):
+    _index_topic(connection, target)
+
+
+@event.listens_for(Topic, "after_update")
+def _topic_updated(mapper, connection, target):
+    # update_after_explain touches every topic on every explain; only
+    # reindex when searchable text actually changed
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in TOPIC_FIELDS):
+        _index_topic(connection, target)
+
+
+@event.listens_for(Topic, "after_delete")
+@event.listens_for(ExplainSession, "after_delete")
+def _document_deleted(mapper, connection, target):
+    _delete(connection, target.id)
+
+
+@event.listens_for(ExplainSession, "after_insert")
+def _session_inserted(mapper, connection, target):
+    _index_session(connection, target)
+
+
+@event.listens_for(ExplainSession, "after_update")
+def _session_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in SESSION_FIELDS):
+        _delete(connection, target.id)
+        _index_session(connection, target)
+
+
+# -- DDL ---------------------------------------------------------------------
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_index(target, connection, **kw):
+    """Runs with every create_all; the DDL is idempotent"""
+    for ddl in _POSTGRES_DDL if connection.dialect.name == "postgresql" else _SQLITE_DDL:
+        connection.execute(text(ddl))
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def drop_search_index(target, connection, **kw):
+    table = "search_documents" if connection.dialect.name == "postgresql" else "search_index"
+    connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+
+def rebuild_search_index(conn: Connection):
+    """Re-index every topic and session from scratch, in SQL"""
+    # A database migrated from before the archive doesn't have it yet
+    tables = [table for table in SESSION_TABLES if inspect(conn).has_table(table)]
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("TRUNCATE search_documents"))
+        conn.execute(text("""
+            INSERT INTO search_documents (doc_id, doc_type, user_id, topic_id, title, body)
+            SELECT id, 'topic', user_id, id, COALESCE(title, ''), CONCAT_WS(E'\\n', subject, description)
+            FROM topics
+        """))
+        for table in tables:
+            conn.execute(text(f"""
+                INSERT INTO search_documents (doc_id, doc_type, user_id, topic_id, title, body)
+                SELECT id, 'session', user_id, topic_id, '', CONCAT_WS(E'\\n', struggles, forgot, unclear)
+                FROM {table}
+                WHERE COALESCE(struggles, forgot, unclear) IS NOT NULL
+            """))
+        return
+
+    dbapi = conn.connection.dbapi_connection
+    dbapi.create_function("search_rowid", 1, lambda b: int.from_bytes(b[8:], "big", signed=True), deterministic=True)
+    dbapi.create_function("search_user_key", 1, user_key, deterministic=True)
+    dbapi.create_function("uuid_text", 1, lambda b: str(uuid.UUID(bytes=b)) if b else None, deterministic=True)
+    conn.execute(text("DELETE FROM search_index"))
+    conn.execute(text("""
+        INSERT INTO search_index (rowid, user_key, title, body, doc_type, doc_id, topic_id)
+        SELECT search_rowid(id), search_user_key(user_id), COALESCE(title, ''),
+               COALESCE(subject, '') || char(10) || COALESCE(description, ''), 'topic', uuid_text(id), uuid_text(id)
+        FROM topics
+    """))
+    for table in tables:
+        conn.execute(text(f"""
+            INSERT INTO search_index (rowid, user_key, title, body, doc_type, doc_id, topic_id)
+            SELECT search_rowid(id), search_user_key(user_id), '',
+                   COALESCE(struggles, '') || char(10) || COALESCE(forgot, '') || char(10) || COALESCE(unclear, ''),
+                   'session', uuid_text(id), uuid_text(topic_id)
+            FROM {table}
+            WHERE COALESCE(struggles, forgot, unclear) IS NOT NULL
+        """))
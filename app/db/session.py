@@ -1,13 +1,95 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import DB_READ_ROUTING, instrument_engine
+from app.db import query_stats
+from app.db.bitmap import register_sqlite_functions
+from app.db.replica import READ_PRIMARY_COOKIE, ReplicaMonitor, SqliteReplicator, sqlite_path
+import time
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+READ_TARGET_KEY = "read_target"
+# Execution option: open transactions with BEGIN IMMEDIATE (the SQLite writer)
+BEGIN_IMMEDIATE = "begin_immediate"
+
+IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+IS_SQLITE_FILE = IS_SQLITE and ":memory:" not in settings.DATABASE_URL and settings.DATABASE_URL != "sqlite://"
+
+def _apply_sqlite_profile(engine, read_only: bool = False):
+    """
+    WAL + tuned pragmas on every new SQLite connection.
+
+    WAL lets readers run alongside the single writer, synchronous=NORMAL
+    skips the fsync on each commit (only the WAL checkpoint syncs), and
+    busy_timeout makes a blocked writer wait instead of failing with
+    "database is locked".
+    """
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work on pysqlite
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        if settings.SQLITE_WAL:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_KB)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+        register_sqlite_functions(dbapi_connection)
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        # A deferred transaction that has read and then writes fails at once
+        # with "database is locked" (busy_timeout can't help) if another
+        # connection committed since its snapshot. The writer takes the
+        # write lock up front instead, waiting on busy_timeout for it.
+        immediate = conn.get_execution_options().get(BEGIN_IMMEDIATE)
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if immediate else "BEGIN")
+
+def _create_engine(url: str, pool: str, read_only: bool = False):
+    sqlite = url.startswith("sqlite")
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if sqlite else {}
+    )
+    if sqlite:
+        _apply_sqlite_profile(engine, read_only=read_only)
+    instrument_engine(engine, pool)
+    query_stats.instrument_engine(engine)
+    return engine
+
+engine = _create_engine(settings.DATABASE_URL, "primary")
+
+# SQLite: reads get their own pool of query_only connections so they
+# never queue behind the writer. Other databases share one engine.
+read_engine = _create_engine(settings.DATABASE_URL, "read", read_only=True) if IS_SQLITE_FILE else engine
+
+# Optional read replica. With REPLICA_SIMULATED_DELAY_SECONDS two SQLite
+# files stand in for primary and replica (see SqliteReplicator).
+replica_engine = None
+replicator = None
+replica_monitor = None
+if settings.READ_DATABASE_URL:
+    replica_engine = _create_engine(settings.READ_DATABASE_URL, "replica", read_only=True)
+    if settings.REPLICA_SIMULATED_DELAY_SECONDS > 0 and IS_SQLITE_FILE and settings.READ_DATABASE_URL.startswith("sqlite"):
+        replicator = SqliteReplicator(
+            sqlite_path(settings.DATABASE_URL),
+            sqlite_path(settings.READ_DATABASE_URL),
+            delay=settings.REPLICA_SIMULATED_DELAY_SECONDS
+        )
+    replica_monitor = ReplicaMonitor(replica_engine, replicator)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# The write queue's sessions (app.db.writer): same pool, BEGIN IMMEDIATE on SQLite
+WriterSessionLocal = sessionmaker(autocommit=False, autoflush=False,
+                                  bind=engine.execution_options(**{BEGIN_IMMEDIATE: True}))
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine) if replica_engine else None
 
 def get_db():
     """Dependency for FastAPI routes"""
@@ -16,3 +98,35 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def choose_read_target(request: Request) -> tuple:
+    """("replica" | "primary", reason) for a read-only request"""
+    if replica_monitor is None:
+        return "primary", "no_replica"
+    try:
+        pinned_until = float(request.cookies.get(READ_PRIMARY_COOKIE, 0))
+    except ValueError:
+        pinned_until = 0
+    if pinned_until > time.time():
+        return "primary", "read_your_writes"
+    usable, reason = replica_monitor.usable()
+    return ("replica" if usable else "primary"), reason
+
+def read_session_factory(target: str):
+    """Session factory for a read target chosen by choose_read_target"""
+    return ReplicaSessionLocal if target == "replica" else ReadSessionLocal
+
+def get_read_db(request: Request):
+    """
+    Dependency for routes that only read (served by the replica when it's
+    safe). The session's info["read_target"] says which database it reads.
+    """
+    target, reason = choose_read_target(request)
+    if settings.METRICS_ENABLED:
+        DB_READ_ROUTING.inc(target, reason)
+    db = read_session_factory(target)()
+    db.info[READ_TARGET_KEY] = target
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,9 +1,18 @@
-from sqlalchemy.orm import Session
-from app.models.topic import Topic, ExplainSession
-from typing import Optional, List
-import uuid
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, defer
+from app.models.topic import Topic, ExplainSession, ArchivedExplainSession, TopicSessionSummary
+from app.models.review_item import ReviewItem
+from app.db.read_cache import touch
+from app.db.search_index import delete_documents
+from app.db.types import new_id
+from app.services.memory_service import MemoryStrengthService
+from typing import Optional, List, Tuple
 from datetime import datetime
 
+# CRUD methods flush but never commit: the caller owns the transaction
+# and commits once when the whole unit of work is done. Writes touch()
+# the topic's owner, dropping their cached read models on commit.
+
 class TopicCRUD:
     """Database operations for Topics"""
     
@@ -11,7 +20,7 @@ class TopicCRUD:
     def create(db: Session, user_id: str, title: str, subject: str = None, description: str = None) -> Topic:
         """Create a new topic"""
         topic = Topic(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             user_id=user_id,
             title=title,
             subject=subject,
@@ -19,8 +28,8 @@ class TopicCRUD:
             created_at=datetime.utcnow()
         )
         db.add(topic)
-        db.commit()
-        db.refresh(topic)
+        db.flush()
+        touch(db, user_id)
         return topic
     
     @staticmethod
@@ -33,6 +42,58 @@ class TopicCRUD:
         """Get all topics for a user"""
         return db.query(Topic).filter(Topic.user_id == user_id).order_by(Topic.created_at.desc()).all()
     
+    @staticmethod
+    def list_for_user(
+        db: Session,
+        user_id: str,
+        subject: Optional[str] = None,
+        status: Optional[str] = None,
+        due_before: Optional[datetime] = None,
+        sort: str = "created",
+        descending: bool = True,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> Tuple[List[Tuple[Topic, Optional[datetime]]], int]:
+        """
+        One page of a user's topics with their next pending review, filtered
+        and sorted in SQL. Returns ([(topic, next_review)], total matches);
+        without a limit every match is returned and no count is run.
+        """
+        next_review = select(
+            ReviewItem.topic_id, func.min(ReviewItem.due_at).label("next_review")
+        ).where(
+            ReviewItem.user_id == user_id,
+            ReviewItem.status == "pending"
+        ).group_by(ReviewItem.topic_id).subquery()
+        
+        query = db.query(Topic, next_review.c.next_review).outerjoin(
+            next_review, next_review.c.topic_id == Topic.id
+        ).filter(Topic.user_id == user_id)
+        if subject is not None:
+            query = query.filter(Topic.subject == subject)
+        if status is not None:
+            query = query.filter(Topic.memory_status == status)
+        if due_before is not None:
+            query = query.filter(next_review.c.next_review < due_before)
+        
+        column = {
+            "created": Topic.created_at,
+            "last_explained": Topic.last_explained,
+            "confidence": Topic.avg_confidence,
+            "next_review": next_review.c.next_review,
+            "title": Topic.title,
+        }[sort]
+        # Topics never explained / never scheduled go last either way;
+        # id breaks ties so pages don't overlap
+        ordering = column.desc() if descending else column.asc()
+        query = query.order_by(ordering.nulls_last(), Topic.id.desc() if descending else Topic.id.asc())
+        
+        if limit is None:
+            rows = query.all()
+            return rows, len(rows)
+        total = query.order_by(None).count()
+        return query.limit(limit).offset(offset).all(), total
+    
     @staticmethod
     def update_after_explain(db: Session, topic_id: str):
         """Update topic stats after an explain session"""
@@ -41,25 +102,36 @@ class TopicCRUD:
             topic.total_explains += 1
             topic.last_explained = datetime.utcnow()
             
-            # Calculate average confidence from all sessions
-            sessions = db.query(ExplainSession).filter(ExplainSession.topic_id == topic_id).all()
-            confidences = [s.confidence for s in sessions if s.confidence]
-            if confidences:
-                topic.avg_confidence = int(sum(confidences) / len(confidences))
+            # Average confidence over all sessions, computed in SQL
+            average = ExplainSessionCRUD.average_confidence(db, topic.user_id, topic_id)
+            if average is not None:
+                topic.avg_confidence = int(average)
             
-            db.commit()
+            MemoryStrengthService.refresh(topic)
+            touch(db, topic.user_id)
     
     @staticmethod
     def delete(db: Session, topic_id: str) -> bool:
         """Delete a topic"""
         topic = TopicCRUD.get_by_id(db, topic_id)
         if topic:
+            # Archived sessions and their summary go first (the ORM cascade only knows hot sessions)
+            archive = ArchivedExplainSession.__table__
+            archived_ids = db.execute(select(archive.c.id).where(archive.c.topic_id == topic_id)).scalars().all()
+            if archived_ids:
+                db.execute(archive.delete().where(archive.c.topic_id == topic_id))
+                delete_documents(db.connection(), archived_ids)
+            db.execute(TopicSessionSummary.__table__.delete().where(TopicSessionSummary.topic_id == topic_id))
             db.delete(topic)
-            db.commit()
+            touch(db, topic.user_id)
             return True
         return False
 
 
+# Unbounded text; only the sessions-detail view shows them
+REFLECTION_COLUMNS = (ExplainSession.struggles, ExplainSession.forgot, ExplainSession.unclear)
+
+
 class ExplainSessionCRUD:
     """Database operations for Explain Sessions"""
     
@@ -67,7 +139,7 @@ class ExplainSessionCRUD:
     def create(db: Session, session_data: dict) -> ExplainSession:
         """Create a new explain session"""
         session = ExplainSession(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             topic_id=session_data['topic_id'],
             user_id=session_data['user_id'],
             duration_seconds=session_data.get('duration_seconds'),
@@ -78,8 +150,8 @@ class ExplainSessionCRUD:
             created_at=datetime.utcnow()
         )
         db.add(session)
-        db.commit()
-        db.refresh(session)
+        db.flush()  # so the stats query below sees this session
+        touch(db, session_data['user_id'])
         
         # Update topic stats
         TopicCRUD.update_after_explain(db, session_data['topic_id'])
@@ -87,8 +159,60 @@ class ExplainSessionCRUD:
         return session
     
     @staticmethod
-    def get_topic_sessions(db: Session, topic_id: str) -> List[ExplainSession]:
-        """Get all sessions for a topic"""
-        return db.query(ExplainSession).filter(
-            ExplainSession.topic_id == topic_id
-        ).order_by(ExplainSession.created_at.desc()).all()
+    def get_topic_sessions(
+        db: Session,
+        user_id: str,
+        topic_id: str,
+        limit: Optional[int] = None,
+        reflections: bool = False
+    ) -> List[ExplainSession]:
+        """
+        A topic's sessions, newest first, read in index order so `limit`
+        stops the scan early. The free-text reflections are only loaded
+        with reflections=True; otherwise touching them raises instead of
+        issuing a query per session.
+        
+        History older than the hot table holds continues from the archive
+        (ArchivedExplainSession rows, same attributes), which is only read
+        when the hot sessions don't fill `limit`.
+        """
+        sessions = []
+        for model in (ExplainSession, ArchivedExplainSession):
+            query = db.query(model).filter(
+                model.user_id == user_id,
+                model.topic_id == topic_id
+            ).order_by(model.created_at.desc())
+            if sessions:  # a session archived between the two queries is not returned twice
+                query = query.filter(model.created_at < sessions[-1].created_at)
+            if not reflections:
+                query = query.options(*(defer(getattr(model, column.key), raiseload=True)
+                                        for column in REFLECTION_COLUMNS))
+            if limit is not None:
+                query = query.limit(limit - len(sessions))
+            sessions += query.all()
+            if limit is not None and len(sessions) >= limit:
+                break
+        return sessions
+    
+    @staticmethod
+    def average_confidence(db: Session, user_id: str, topic_id: str) -> Optional[float]:
+        """
+        Mean confidence of a topic's rated sessions (None if there are
+        none): hot sessions from the index alone, archived ones from the
+        topic's summary, in one statement.
+        """
+        def archived(column):
+            return func.coalesce(select(column).where(
+                TopicSessionSummary.topic_id == topic_id,
+                TopicSessionSummary.user_id == user_id
+            ).scalar_subquery(), 0)
+        
+        total, count = db.execute(select(
+            func.coalesce(func.sum(ExplainSession.confidence), 0) + archived(TopicSessionSummary.confidence_sum),
+            func.count() + archived(TopicSessionSummary.rated_sessions)
+        ).where(
+            ExplainSession.user_id == user_id,
+            ExplainSession.topic_id == topic_id,
+            ExplainSession.confidence != 0
+        )).one()
+        return total / count if count else None
@@ -0,0 +1,59 @@
+"""
+Column types shared by the models.
+
+GUID stores ids compactly - native `uuid` on PostgreSQL, a 16-byte BLOB
+elsewhere - while Python code and the API keep seeing the usual
+36-character string. New ids come from `new_id()`, a UUIDv7: the
+leading 48 bits are a millisecond timestamp, so inserts land at the
+right-hand edge of the primary key index instead of at random pages.
+"""
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import LargeBinary, TypeDecorator
+import os
+import time
+import uuid
+
+
+class InvalidId(ValueError):
+    """An id that isn't a UUID was used in a query (e.g. a mangled URL)"""
+
+
+def uuid7() -> uuid.UUID:
+    """RFC 9562 UUIDv7: 48-bit unix ms timestamp, version/variant bits, 74 random bits"""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | (0x7 << 76)  # version 7
+    value = value & ~(0x3 << 62) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
+def new_id() -> str:
+    return str(uuid7())
+
+
+class GUID(TypeDecorator):
+    """UUID column that reads and writes canonical strings"""
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            try:
+                value = uuid.UUID(str(value))
+            except ValueError:
+                raise InvalidId(f"Not a valid id: {value!r}") from None
+        return value if dialect.name == "postgresql" else value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(bytes=bytes(value)))
@@ -0,0 +1,166 @@
+"""
+Single-writer executor with group commit.
+
+SQLite allows one writer at a time. Instead of letting request threads
+fight over the write lock (and fsync once each), write jobs are queued
+to one thread which runs everything waiting in the queue inside a single
+transaction, each job in its own SAVEPOINT, then commits once. That
+transaction opens with BEGIN IMMEDIATE, so it holds the write lock
+before its jobs read anything.
+
+Jobs run in the context of the request that submitted them, so their
+SQL shows up in that request's stats and log lines keep its request id.
+
+A job is a plain function taking a Session. It must return plain data
+(dicts, ids) rather than ORM objects, since the session is closed after
+the batch commits. A job that raises is rolled back on its own; the rest
+of the batch still commits.
+"""
+from concurrent.futures import Future
+from contextvars import copy_context
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Optional
+import asyncio
+import logging
+import queue
+import threading
+import time
+
+from app.core.config import settings
+from app.core.metrics import DB_WRITE_BATCH_SIZE
+from app.db.query_stats import current_request_stats
+from app.db.session import IS_SQLITE_FILE, WriterSessionLocal
+
+logger = logging.getLogger(__name__)
+
+WriteJob = Callable[[Session], Any]
+
+
+class WriteQueue:
+    """Runs write jobs on one thread, group-committing whatever is queued"""
+
+    def __init__(self, session_factory=WriterSessionLocal, max_batch: int = 64, max_wait: float = 0.002):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, fn: WriteJob) -> Future:
+        if self._thread is None:
+            self.start()
+        future: Future = Future()
+        self._queue.put((fn, future, copy_context()))
+        return future
+
+    async def run(self, fn: WriteJob) -> Any:
+        """Queue a job and await its result"""
+        return await asyncio.wrap_future(self.submit(fn))
+
+    def _collect(self, first) -> list:
+        """Take the first job plus whatever arrives within max_wait"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                self._queue.put(None)  # handle shutdown after this batch
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            self._execute(self._collect(first))
+
+    @staticmethod
+    def _run_job(db: Session, fn: WriteJob):
+        savepoint = db.begin_nested()
+        try:
+            result = fn(db)
+        except BaseException:
+            savepoint.rollback()
+            raise
+        savepoint.commit()
+        return result, current_request_stats()
+
+    def _execute(self, batch: list):
+        db = self.session_factory()
+        done = []
+        try:
+            for fn, future, context in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result, stats = context.run(self._run_job, db, fn)
+                except BaseException as e:
+                    future.set_exception(e)
+                    continue
+                done.append((future, result))
+                if stats is not None:
+                    stats.commits += 1
+            db.commit()
+        except Exception as e:
+            logger.exception("Group commit of %d jobs failed", len(batch))
+            db.rollback()
+            for future, _ in done:
+                future.set_exception(e)
+            done = []
+        finally:
+            db.close()
+
+        for future, result in done:
+            future.set_result(result)
+        self.batches += 1
+        self.jobs += len(batch)
+        DB_WRITE_BATCH_SIZE.observe(len(batch))
+
+
+write_queue = WriteQueue(
+    max_batch=settings.WRITER_MAX_BATCH,
+    max_wait=settings.WRITER_MAX_WAIT_MS / 1000
+)
+
+
+def use_write_queue() -> bool:
+    return IS_SQLITE_FILE and settings.SQLITE_SINGLE_WRITER
+
+
+async def run_write(db: Session, fn: WriteJob) -> Any:
+    """
+    Run a write job and commit it.
+
+    With the SQLite single-writer profile the job goes through the
+    group-commit queue; otherwise it runs on the request's session and
+    is committed directly.
+    """
+    if use_write_queue():
+        # End the request session's read transaction first so its pooled
+        # connection isn't held while the job waits in the queue
+        db.rollback()
+        return await write_queue.run(fn)
+    result = fn(db)
+    db.commit()
+    return result
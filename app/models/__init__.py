@@ -7,16 +7,29 @@ from app.models.user import User
 from app.models.oauth_token import OAuthToken
 from app.models.feedback import Feedback
 from app.models.analytics import UserAnalytics
-from app.models.topic import Topic, ExplainSession
+from app.models.rollup import DailyRollup, DailyActiveStudent, RollupState
+from app.models.topic import Topic, ExplainSession, ArchivedExplainSession, TopicSessionSummary
 from app.models.schedule import Schedule
+from app.models.review_item import ReviewItem
+from app.models.schema_version import SchemaVersion
+
+# Mapper events that keep the full-text index in sync with topics/sessions
+from app.db import search_index  # noqa: F401
 
 __all__ = [
     "Base",
     "User",
     "OAuthToken", 
     "Schedule",
+    "ReviewItem",
     "Feedback",
     "UserAnalytics",
+    "DailyRollup",
+    "DailyActiveStudent",
+    "RollupState",
     "Topic",
-    "ExplainSession"
+    "ExplainSession",
+    "ArchivedExplainSession",
+    "TopicSessionSummary",
+    "SchemaVersion"
 ]
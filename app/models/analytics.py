@@ -1,13 +1,14 @@
-from sqlalchemy import Column, String, DateTime, Integer, Boolean
+from sqlalchemy import Column, String, DateTime, Integer, Boolean, LargeBinary, Index
 from datetime import datetime
 from app.db.base import Base
+from app.db.types import GUID
 
 class UserAnalytics(Base):
     """Track user engagement and learning metrics"""
     __tablename__ = "user_analytics"
     
-    id = Column(String, primary_key=True)
-    user_id = Column(String, nullable=False, index=True)
+    id = Column(GUID, primary_key=True)
+    user_id = Column(String, nullable=False)
     
     # Session tracking
     total_sessions = Column(Integer, default=0)
@@ -17,10 +18,21 @@ class UserAnalytics(Base):
     total_schedules_created = Column(Integer, default=0)
     total_events_created = Column(Integer, default=0)
     
-    # Engagement
-    current_streak = Column(Integer, default=0)  # Days using app consecutively
+    # Engagement: one bit per active day, bit 0 = day number `activity_origin`
+    # (days since 1970-01-01 UTC) - see app/db/bitmap.py
+    activity = Column(LargeBinary, nullable=True)
+    activity_origin = Column(Integer, nullable=True)
+    
+    # Superseded by `activity` (streaks are computed from it); no longer written.
+    # longest_streak still floors the reported longest streak for migrated rows.
+    current_streak = Column(Integer, default=0)
     longest_streak = Column(Integer, default=0)
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        # One row per user: the target of record_activity's ON CONFLICT
+        Index("uq_user_analytics_user", "user_id", unique=True),
+    )
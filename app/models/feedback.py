@@ -1,11 +1,12 @@
 from sqlalchemy import Column, String, DateTime, Text
 from datetime import datetime
 from app.db.base import Base
+from app.db.types import GUID
 
 class Feedback(Base):
     __tablename__ = "feedback"
     
-    id = Column(String, primary_key=True)
+    id = Column(GUID, primary_key=True)
     name = Column(String)
     email = Column(String)
     type = Column(String)  # feature, bug, improvement, automation, other
@@ -2,11 +2,12 @@ from sqlalchemy import Column, String, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
+from app.db.types import GUID
 
 class OAuthToken(Base):
     __tablename__ = "oauth_tokens"
     
-    id = Column(String, primary_key=True)
+    id = Column(GUID, primary_key=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     
     # Token data (encrypted in production)
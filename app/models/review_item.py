@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.base import Base
+from app.db.types import GUID
+
+class ReviewItem(Base):
+    """One scheduled review of a schedule (a schedule expands into several)"""
+    __tablename__ = "review_items"
+    
+    id = Column(GUID, primary_key=True)
+    schedule_id = Column(GUID, ForeignKey("schedules.id"), nullable=False, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    topic_id = Column(GUID, ForeignKey("topics.id"), nullable=True)
+    
+    due_at = Column(DateTime, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending, done, skipped
+    completed_at = Column(DateTime, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    schedule = relationship("Schedule", back_populates="review_items")
+    topic = relationship("Topic")
+    
+    __table_args__ = (
+        # Due / overdue / calendar queries are range scans on this
+        Index("ix_review_items_user_due", "user_id", "due_at"),
+    )
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, String, DateTime, Date, Integer
+from datetime import datetime
+from app.db.base import Base
+
+class DailyRollup(Base):
+    """Cross-user activity totals for one UTC day, kept current by RollupService"""
+    __tablename__ = "daily_rollups"
+
+    day = Column(Date, primary_key=True)
+
+    # Students
+    active_students = Column(Integer, nullable=False, default=0)  # explained at least one topic
+    new_students = Column(Integer, nullable=False, default=0)
+
+    # Explains
+    explains = Column(Integer, nullable=False, default=0)
+    explain_seconds = Column(Integer, nullable=False, default=0)
+    confidence_1 = Column(Integer, nullable=False, default=0)
+    confidence_2 = Column(Integer, nullable=False, default=0)
+    confidence_3 = Column(Integer, nullable=False, default=0)
+    confidence_4 = Column(Integer, nullable=False, default=0)
+    confidence_5 = Column(Integer, nullable=False, default=0)
+
+    # Topics
+    topics_created = Column(Integer, nullable=False, default=0)
+
+class DailyActiveStudent(Base):
+    """A (day, student) pair already counted in DailyRollup.active_students"""
+    __tablename__ = "daily_active_students"
+
+    day = Column(Date, primary_key=True)
+    user_id = Column(String, primary_key=True)
+
+class RollupState(Base):
+    """High-water mark of a rollup: source rows created up to here are folded in"""
+    __tablename__ = "rollup_state"
+
+    name = Column(String, primary_key=True)
+    high_water = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,14 +1,15 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Integer, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
+from app.db.types import GUID
 
 class Schedule(Base):
     __tablename__ = "schedules"
     
-    id = Column(String, primary_key=True)
+    id = Column(GUID, primary_key=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
-    topic_id = Column(String, ForeignKey("topics.id"), nullable=True)
+    topic_id = Column(GUID, ForeignKey("topics.id"), nullable=True)
     
     # Schedule details
     topic = Column(String, nullable=False)
@@ -22,3 +23,10 @@ class Schedule(Base):
     # Relationships
     user = relationship("User", back_populates="schedules")
     topic_relation = relationship("Topic", back_populates="schedules")
+    review_items = relationship("ReviewItem", back_populates="schedule", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # One schedule per topic: the target of the explain upsert's ON CONFLICT
+        # (manual schedules without a topic have topic_id NULL, which never conflicts)
+        Index("uq_schedules_user_topic", "user_id", "topic_id", unique=True),
+    )
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, DateTime
+from datetime import datetime
+from app.db.base import Base
+
+class SchemaVersion(Base):
+    """Single-row stamp of the schema version the database was migrated to"""
+    __tablename__ = "schema_version"
+    
+    id = Column(Integer, primary_key=True, default=1)
+    version = Column(Integer, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
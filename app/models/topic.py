@@ -1,13 +1,14 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Float, Integer, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
+from app.db.types import GUID
 
 class Topic(Base):
     """Topics students are studying"""
     __tablename__ = "topics"
     
-    id = Column(String, primary_key=True)
+    id = Column(GUID, primary_key=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     
     # Topic info
@@ -20,6 +21,10 @@ class Topic(Base):
     avg_confidence = Column(Integer, default=0)  # 1-5 scale
     last_explained = Column(DateTime, nullable=True)
     
+    # Memory strength (see app/services/memory_service.py)
+    memory_status = Column(String, nullable=False, default="CRITICAL", server_default="CRITICAL")
+    status_changes_at = Column(DateTime, nullable=True)  # next time the status changes by itself
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -27,14 +32,28 @@ class Topic(Base):
     # Relationships
     explain_sessions = relationship("ExplainSession", back_populates="topic", cascade="all, delete-orphan")
     schedules = relationship("Schedule", back_populates="topic_relation", cascade="all, delete-orphan")  # ✅ FIXED
+    
+    # The topic list filters and sorts within one user's topics
+    __table_args__ = (
+        Index("ix_topics_user_created", "user_id", "created_at"),
+        Index("ix_topics_user_subject", "user_id", "subject"),
+        Index("ix_topics_user_last_explained", "user_id", "last_explained"),
+        Index("ix_topics_user_confidence", "user_id", "avg_confidence"),
+        # Status counts across users, and per-user status filters
+        Index("ix_topics_status", "memory_status", "user_id"),
+        # The sweeper's work queue
+        Index("ix_topics_status_changes_at", "status_changes_at"),
+        # Daily rollups read new topics by creation time
+        Index("ix_topics_created_at", "created_at"),
+    )
 
 
 class ExplainSession(Base):
     """Record of explain mode sessions"""
     __tablename__ = "explain_sessions"
     
-    id = Column(String, primary_key=True)
-    topic_id = Column(String, ForeignKey("topics.id"), nullable=False)
+    id = Column(GUID, primary_key=True)
+    topic_id = Column(GUID, ForeignKey("topics.id"), nullable=False)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     
     # Session data
@@ -52,3 +71,57 @@ class ExplainSession(Base):
     
     # Relationships
     topic = relationship("Topic", back_populates="explain_sessions")
+    
+    # A user's history, grouped by topic in time order; covers the recall fit
+    __table_args__ = (
+        Index("ix_explain_sessions_user_topic", "user_id", "topic_id", "created_at", "confidence"),
+        # Daily rollups read new sessions by creation time
+        Index("ix_explain_sessions_created_at", "created_at"),
+    )
+
+
+class ArchivedExplainSession(Base):
+    """An explain session moved out of explain_sessions by ArchiveService (same columns)"""
+    __tablename__ = "explain_sessions_archive"
+    
+    id = Column(GUID, primary_key=True)
+    topic_id = Column(GUID, ForeignKey("topics.id"), nullable=False)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    duration_seconds = Column(Integer)
+    struggles = Column(Text, nullable=True)
+    forgot = Column(Text, nullable=True)
+    unclear = Column(Text, nullable=True)
+    confidence = Column(Integer, nullable=True)
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Full-history reads continue a topic's sessions here, newest first
+    __table_args__ = (
+        Index("ix_explain_sessions_archive_user_topic", "user_id", "topic_id", "created_at"),
+    )
+
+
+class TopicSessionSummary(Base):
+    """
+    What the hot tables still need to know about a topic's archived
+    sessions: totals for averages, and the recall fit's sums over them
+    (see ArchiveService and RecallService).
+    """
+    __tablename__ = "topic_session_summaries"
+    
+    topic_id = Column(GUID, ForeignKey("topics.id"), primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    
+    sessions = Column(Integer, nullable=False, default=0)
+    rated_sessions = Column(Integer, nullable=False, default=0)  # with a confidence
+    confidence_sum = Column(Integer, nullable=False, default=0)
+    duration_seconds = Column(Integer, nullable=False, default=0)
+    first_session_at = Column(DateTime, nullable=True)
+    last_session_at = Column(DateTime, nullable=True)
+    last_confidence = Column(Integer, nullable=False, default=0)
+    fit_numerator = Column(Float, nullable=False, default=0.0)
+    fit_denominator = Column(Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        Index("ix_topic_session_summaries_user", "user_id"),
+    )
@@ -16,7 +16,7 @@ class User(Base):
     is_premium = Column(Boolean, default=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)  # daily rollups read by range
     last_login = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -1,12 +1,26 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import Optional, Tuple
 from app.models.analytics import UserAnalytics
 from app.models.schedule import Schedule
-from datetime import datetime, timedelta
-import uuid
+from app.db.read_cache import touch
+from app.db.bitmap import bitmap_set, day_number, longest_run, run_ending_at, set_bit, to_int, window
+from app.db.types import new_id
+from datetime import date, datetime, timedelta
 
 class AnalyticsService:
-    """Calculate user analytics and insights"""
+    """
+    Calculate user analytics and insights.
+    
+    Like the CRUD classes, methods never commit - the caller owns the transaction.
+    """
+    
+    @staticmethod
+    def _insert(db: Session):
+        """INSERT for user_analytics with the dialect's ON CONFLICT support"""
+        insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        return insert(UserAnalytics.__table__)
     
     @staticmethod
     def get_or_create_analytics(db: Session, user_id: str) -> UserAnalytics:
@@ -16,49 +30,59 @@ class AnalyticsService:
         ).first()
         
         if not analytics:
-            analytics = UserAnalytics(
-                id=str(uuid.uuid4()),
-                user_id=user_id
-            )
-            db.add(analytics)
-            db.commit()
-            db.refresh(analytics)
+            # ON CONFLICT DO NOTHING: a concurrent first activity may have just created it
+            db.execute(AnalyticsService._insert(db).values(
+                id=new_id(), user_id=user_id
+            ).on_conflict_do_nothing(index_elements=["user_id"]))
+            analytics = db.query(UserAnalytics).filter(
+                UserAnalytics.user_id == user_id
+            ).one()
         
         return analytics
     
+    @staticmethod
+    def record_activity(db: Session, user_id: str, now: Optional[datetime] = None):
+        """
+        Count a session and mark today in the activity bitmap.
+        
+        A single INSERT ... ON CONFLICT (user_id) DO UPDATE does both, so
+        concurrent logins/explains can't lose each other's changes or
+        create a second row. Core statement - loaded UserAnalytics
+        objects are expired rather than refreshed.
+        """
+        now = now or datetime.utcnow()
+        today = day_number(now.date())
+        touch(db, user_id)
+        analytics = UserAnalytics.__table__
+        origin = func.coalesce(analytics.c.activity_origin, today)
+        stmt = AnalyticsService._insert(db).values(
+            id=new_id(),
+            user_id=user_id,
+            total_sessions=1,
+            last_active=now,
+            activity_origin=today,
+            activity=set_bit(None, 0),
+            created_at=now,
+            updated_at=now
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                "total_sessions": func.coalesce(analytics.c.total_sessions, 0) + 1,
+                "last_active": now,
+                "activity_origin": origin,
+                "activity": bitmap_set(analytics.c.activity, today - origin),
+                "updated_at": now,
+            }
+        ))
+        for obj in list(db.identity_map.values()):
+            if isinstance(obj, UserAnalytics) and obj.user_id == user_id:
+                db.expire(obj)
+    
     @staticmethod
     def update_session(db: Session, user_id: str):
-        """Update user session tracking"""
-        analytics = AnalyticsService.get_or_create_analytics(db, user_id)
-        
-        # Update session count
-        analytics.total_sessions += 1
-        
-        # Calculate streak
-        last_active = analytics.last_active
-        now = datetime.utcnow()
-        
-        if last_active:
-            days_diff = (now.date() - last_active.date()).days
-            
-            if days_diff == 0:
-                # Same day, no change to streak
-                pass
-            elif days_diff == 1:
-                # Consecutive day, increment streak
-                analytics.current_streak += 1
-                if analytics.current_streak > analytics.longest_streak:
-                    analytics.longest_streak = analytics.current_streak
-            else:
-                # Streak broken, reset
-                analytics.current_streak = 1
-        else:
-            # First session
-            analytics.current_streak = 1
-            analytics.longest_streak = 1
-        
-        analytics.last_active = now
-        db.commit()
+        """Update user session tracking (login)"""
+        AnalyticsService.record_activity(db, user_id)
     
     @staticmethod
     def update_schedule_created(db: Session, user_id: str, review_count: int):
@@ -66,45 +90,87 @@ class AnalyticsService:
         analytics = AnalyticsService.get_or_create_analytics(db, user_id)
         
         analytics.total_schedules_created += 1
+        touch(db, user_id)
         # Note: No longer tracking calendar events, just review count
-        
-        db.commit()
     
     @staticmethod
     def update_explain_completed(db: Session, user_id: str):
         """Update analytics when user completes explain session"""
-        analytics = AnalyticsService.get_or_create_analytics(db, user_id)
-        
-        analytics.total_sessions += 1
-        analytics.last_active = datetime.utcnow()
-        
-        db.commit()
+        AnalyticsService.record_activity(db, user_id)
+    
+    @staticmethod
+    def streaks(analytics: UserAnalytics, today: Optional[date] = None) -> Tuple[int, int]:
+        """
+        (current, longest) streak of consecutive active days. The current
+        streak is still alive today if it reached yesterday.
+        
+        The longest is never below the stored longest_streak: rows migrated
+        to the bitmap (version 9) only have the days of their explains and
+        current streak in it, not the logins behind an older, longer streak.
+        """
+        stored = analytics.longest_streak or 0
+        if not analytics.activity or analytics.activity_origin is None:
+            return 0, stored
+        bits = to_int(analytics.activity)
+        index = day_number(today or datetime.utcnow().date()) - analytics.activity_origin
+        current = run_ending_at(bits, index) or run_ending_at(bits, index - 1)
+        return current, max(longest_run(bits), stored)
+    
+    @staticmethod
+    def activity_heatmap(db: Session, user_id: str, start: date, end: date) -> dict:
+        """Active (1) / inactive (0) per day from start to end inclusive, plus streaks"""
+        analytics = db.query(UserAnalytics).filter(UserAnalytics.user_id == user_id).first()
+        length = (end - start).days + 1
+        days = 0
+        current = longest = 0
+        if analytics is not None:
+            current, longest = AnalyticsService.streaks(analytics)
+        if analytics is not None and analytics.activity and analytics.activity_origin is not None:
+            bits = to_int(analytics.activity)
+            days = window(bits, day_number(start) - analytics.activity_origin, length)
+        return {
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "days": [(days >> i) & 1 for i in range(length)],
+            "active_days": days.bit_count(),
+            "current_streak": current,
+            "longest_streak": longest,
+        }
     
     @staticmethod
     def get_user_stats(db: Session, user_id: str) -> dict:
-        """Get comprehensive user statistics"""
-        analytics = AnalyticsService.get_or_create_analytics(db, user_id)
+        """Get comprehensive user statistics (read-only, safe on a replica)"""
+        analytics = db.query(UserAnalytics).filter(
+            UserAnalytics.user_id == user_id
+        ).first()
+        if not analytics:
+            # Not stored - every login creates the row, so this is only
+            # a replica that hasn't caught up yet
+            now = datetime.utcnow()
+            analytics = UserAnalytics(user_id=user_id, total_sessions=0, current_streak=0,
+                                      longest_streak=0, created_at=now)
         
         # Import here to avoid circular imports
-        from app.models.topic import Topic, ExplainSession
+        from app.models.topic import Topic, ExplainSession, TopicSessionSummary
         
         # Get all user data
         schedules = db.query(Schedule).filter(Schedule.user_id == user_id).all()
         topics = db.query(Topic).filter(Topic.user_id == user_id).all()
-        explain_sessions = db.query(ExplainSession).filter(
-            ExplainSession.user_id == user_id
-        ).all()
-        
-        # Update analytics record with fresh counts
-        analytics.total_schedules_created = len(schedules)
-        db.commit()
-        
-        # Calculate explain stats
-        total_explains = len(explain_sessions)
-        avg_session_confidence = 0
-        if explain_sessions:
-            confidences = [s.confidence for s in explain_sessions if s.confidence]
-            avg_session_confidence = sum(confidences) / len(confidences) if confidences else 0
+        # Explain stats, counted in SQL (unrated sessions don't count toward the average);
+        # archived sessions are counted from their topics' summaries
+        def archived(column):
+            return func.coalesce(select(func.sum(column)).where(
+                TopicSessionSummary.user_id == user_id
+            ).scalar_subquery(), 0)
+        
+        rated = ExplainSession.confidence != 0
+        total_explains, confidence_sum, rated_explains = db.query(
+            func.count() + archived(TopicSessionSummary.sessions),
+            func.coalesce(func.sum(case((rated, ExplainSession.confidence))), 0)
+            + archived(TopicSessionSummary.confidence_sum),
+            func.count(case((rated, 1))) + archived(TopicSessionSummary.rated_sessions)
+        ).filter(ExplainSession.user_id == user_id).one()
+        avg_session_confidence = float(confidence_sum / rated_explains if rated_explains else 0)
         
         # Calculate schedule stats
         total_schedules = len(schedules)
@@ -121,11 +187,13 @@ class AnalyticsService:
         # Recent topics with explain counts
         recent_topics = sorted(topics, key=lambda x: x.created_at, reverse=True)[:5]
         
-        return {
-            'total_schedules': analytics.total_schedules_created,
+        current_streak, longest_streak = AnalyticsService.streaks(analytics)
+        
+        stats = {
+            'total_schedules': len(schedules),
             'total_events': len(schedules),  # ✅ Changed: count schedules, not calendar events
-            'current_streak': analytics.current_streak,
-            'longest_streak': analytics.longest_streak,
+            'current_streak': current_streak,
+            'longest_streak': longest_streak,
             'total_sessions': analytics.total_sessions,
             'member_since': analytics.created_at.strftime('%B %d, %Y'),
             'last_active': analytics.last_active.strftime('%B %d, %Y at %I:%M %p') if analytics.last_active else 'Never',
@@ -155,3 +223,5 @@ class AnalyticsService:
                 for t in recent_topics
             ]
         }
+        
+        return stats
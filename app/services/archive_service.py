@@ -0,0 +1,191 @@
+"""
+Hot/cold tiering of explain sessions.
+
+Sessions older than ARCHIVE_AFTER_DAYS move from explain_sessions to
+explain_sessions_archive, oldest first, ARCHIVE_BATCH at a time. Each
+batch is its own short transaction (through the writer on SQLite) with
+a pause after it, so the job never holds the write lock for long and
+request writes get in between batches. The hot table, and every index
+the per-request queries scan, then only holds recent history.
+
+What those queries still need from archived sessions is kept per topic
+in topic_session_summaries: counts and sums for the averages, the last
+archived session (time and confidence), and the recall fit's sums over
+the observations among archived sessions. A topic's sessions are
+archived oldest first, so each batch extends its summary.
+
+Reads that need the full history - a topic's sessions view, search
+results - continue into the archive table (see ExplainSessionCRUD).
+Search documents are left as they are: archived reflections stay
+searchable.
+
+Only sessions the daily rollups have already folded in are archived. A
+row lock on the job's rollup_state entry keeps it to one runner at a
+time across processes; its high-water mark is the newest archived time.
+"""
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import math
+import time
+
+from app.core.config import settings
+from app.core.metrics import ARCHIVED_SESSIONS
+from app.db.read_cache import touch
+from app.db.session import SessionLocal
+from app.db.writer import use_write_queue, write_queue
+from app.models.rollup import RollupState
+from app.models.topic import ArchivedExplainSession, ExplainSession, TopicSessionSummary
+from app.services.rollup_service import ROLLUP_NAME
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_NAME = "explain_archive"
+NOTHING_ARCHIVED = datetime(1970, 1, 1)  # the state row's high-water mark before the first batch
+SESSION_COLUMNS = ("id", "topic_id", "user_id", "duration_seconds", "struggles", "forgot", "unclear",
+                   "confidence", "created_at")
+
+
+class ArchiveService:
+    """Move old explain sessions to the archive, keeping per-topic summaries"""
+
+    @staticmethod
+    def cutoff(db: Session, now: datetime) -> Optional[datetime]:
+        """Sessions created before this may be archived: old enough, and already in the daily rollups"""
+        rolled_up = db.query(RollupState.high_water).filter(RollupState.name == ROLLUP_NAME).scalar()
+        if rolled_up is None:
+            return None
+        return min(now - timedelta(days=settings.ARCHIVE_AFTER_DAYS), rolled_up)
+
+    @staticmethod
+    def summarize(db: Session, rows: List) -> None:
+        """Extend the topics' summaries with `rows`, archived sessions in time order"""
+        # Imported here: NumPy stays out of app startup
+        from app.services.recall_service import CONFIDENCE_RECALL
+
+        by_topic: Dict[str, List] = {}
+        for row in rows:
+            by_topic.setdefault(row.topic_id, []).append(row)
+        summaries = TopicSessionSummary.__table__
+        existing = {row.topic_id: row._asdict() for row in db.execute(
+            select(summaries).where(summaries.c.topic_id.in_(list(by_topic))).with_for_update()
+        )}
+
+        created, changed = [], []
+        for topic_id, topic_rows in by_topic.items():
+            summary = existing.get(topic_id)
+            if summary is None:
+                summary = {
+                    "topic_id": topic_id, "user_id": topic_rows[0].user_id, "sessions": 0, "rated_sessions": 0,
+                    "confidence_sum": 0, "duration_seconds": 0, "first_session_at": topic_rows[0].created_at,
+                    "last_session_at": None, "last_confidence": 0, "fit_numerator": 0.0, "fit_denominator": 0.0,
+                }
+                created.append(summary)
+            else:
+                changed.append(summary)
+            previous = summary["last_session_at"]
+            for row in topic_rows:
+                confidence = row.confidence or 0
+                summary["sessions"] += 1
+                summary["duration_seconds"] += row.duration_seconds or 0
+                if confidence:
+                    summary["rated_sessions"] += 1
+                    summary["confidence_sum"] += confidence
+                # Same observations as RecallService.fit_stability
+                if previous is not None:
+                    gap = (row.created_at - previous).total_seconds() / 86400
+                    recalled = CONFIDENCE_RECALL[confidence] if 1 <= confidence <= 5 else math.nan
+                    if gap > 0 and not math.isnan(recalled):
+                        summary["fit_numerator"] += -gap * math.log(recalled)
+                        summary["fit_denominator"] += gap ** 2
+                previous = row.created_at
+                summary["last_confidence"] = confidence
+            summary["last_session_at"] = previous
+
+        # One executemany each: a batch touches hundreds of topics
+        if created:
+            db.execute(insert(TopicSessionSummary), created)
+        if changed:
+            db.execute(update(TopicSessionSummary), changed)
+
+    @staticmethod
+    def archive_batch(db: Session, now: Optional[datetime] = None, limit: Optional[int] = None) -> int:
+        """
+        Archive up to `limit` of the oldest eligible sessions. Returns how
+        many were moved. Flushes only.
+        """
+        now = now or datetime.utcnow()
+        limit = limit or settings.ARCHIVE_BATCH
+        # Row lock: with several app processes on PostgreSQL only one archives at a time.
+        # The row must exist to be locked, so the first run creates it (a no-op after)
+        state_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        db.execute(state_insert(RollupState.__table__).values(
+            name=ARCHIVE_NAME, high_water=NOTHING_ARCHIVED
+        ).on_conflict_do_nothing(index_elements=["name"]))
+        state = db.query(RollupState).filter(RollupState.name == ARCHIVE_NAME).with_for_update().one()
+        cutoff = ArchiveService.cutoff(db, now)
+        if cutoff is None:
+            return 0
+
+        sessions = ExplainSession.__table__
+        rows = db.execute(
+            select(*(sessions.c[name] for name in SESSION_COLUMNS))
+            .where(sessions.c.created_at < cutoff)
+            .order_by(sessions.c.created_at, sessions.c.id)
+            .limit(limit)
+        ).all()
+        if not rows:
+            return 0
+
+        db.execute(insert(ArchivedExplainSession.__table__),
+                   [{**row._asdict(), "archived_at": now} for row in rows])
+        ArchiveService.summarize(db, rows)
+        # Core delete: the search documents stay, now describing archived sessions
+        db.execute(sessions.delete().where(sessions.c.id.in_([row.id for row in rows])))
+
+        state.high_water = rows[-1].created_at
+        for user_id in {row.user_id for row in rows}:
+            touch(db, user_id)
+        db.flush()
+
+        if settings.METRICS_ENABLED:
+            ARCHIVED_SESSIONS.inc(amount=len(rows))
+        return len(rows)
+
+    @staticmethod
+    def archive_all(now: Optional[datetime] = None) -> int:
+        """Archive everything eligible, one batch per transaction, pausing between batches"""
+        now = now or datetime.utcnow()
+        job = lambda db: ArchiveService.archive_batch(db, now)  # noqa: E731
+        total = 0
+        while True:
+            if use_write_queue():
+                moved = write_queue.submit(job).result()
+            else:
+                db = SessionLocal()
+                try:
+                    moved = job(db)
+                    db.commit()
+                finally:
+                    db.close()
+            total += moved
+            if moved < settings.ARCHIVE_BATCH:
+                return total
+            time.sleep(settings.ARCHIVE_BATCH_PAUSE_MS / 1000)
+
+
+async def run_archive_job(interval: Optional[float] = None):
+    """Background task: archive old explain sessions every `interval` seconds"""
+    interval = interval or settings.ARCHIVE_INTERVAL_SECONDS
+    while True:
+        try:
+            moved = await asyncio.to_thread(ArchiveService.archive_all)
+            if moved:
+                logger.info("Archived %d explain sessions", moved)
+        except Exception:
+            logger.exception("Explain session archive job failed")
+        await asyncio.sleep(interval)
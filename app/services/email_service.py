@@ -1,7 +1,10 @@
-import aiosmtplib
 from email.message import EmailMessage
+import logging
 import os
 from datetime import datetime
+from app.core.metrics import time_outbound
+
+logger = logging.getLogger(__name__)
 
 class EmailService:
     """Send email notifications via Gmail SMTP"""
@@ -9,20 +12,15 @@ class EmailService:
     @staticmethod
     async def send_feedback_notification(feedback_data: dict):
         """Send email when feedback is received"""
+        import aiosmtplib  # loaded on first send to keep startup light
         
         # Get credentials from environment
         email_user = os.getenv("EMAIL_USER")
         email_password = os.getenv("EMAIL_PASSWORD")
         email_recipient = os.getenv("EMAIL_RECIPIENT", email_user)
         
-        # ADD DEBUGGING
-        #print(f"🔍 DEBUG - EMAIL_USER: {email_user}")
-        #print(f"🔍 DEBUG - EMAIL_PASSWORD: {'*' * len(email_password) if email_password else 'NOT SET'}")
-        #print(f"🔍 DEBUG - EMAIL_RECIPIENT: {email_recipient}")
-        
         if not email_user or not email_password:
-            print("⚠️ Email not configured. Skipping notification.")
-            print("   Set EMAIL_USER and EMAIL_PASSWORD environment variables")
+            logger.warning("Email not configured (set EMAIL_USER and EMAIL_PASSWORD). Skipping notification.")
             return
         
         # Create email message
@@ -57,24 +55,23 @@ StudyCore Feedback System
         message.set_content(body)
         
         try:
-            print("📧 Attempting to send email...")
+            logger.debug("Sending feedback email")
             
             # Send via Gmail SMTP
-            await aiosmtplib.send(
-                message,
-                hostname="smtp.gmail.com",
-                port=465,
-                username=email_user,
-                password=email_password,
-                use_tls=True,
-                timeout=30
-            )
+            with time_outbound("smtp", "send"):
+                await aiosmtplib.send(
+                    message,
+                    hostname="smtp.gmail.com",
+                    port=465,
+                    username=email_user,
+                    password=email_password,
+                    use_tls=True,
+                    timeout=30
+                )
             
-            print(f"✅ Email notification sent")
+            logger.info("Feedback email sent")
             return True
             
         except Exception as e:
-            print(f"❌ Failed to send email: {str(e)}")
-            import traceback
-            traceback.print_exc()  # Show full error
+            logger.exception("Failed to send email: %s", e)
             return False
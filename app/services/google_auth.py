@@ -1,9 +1,13 @@
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
 from app.core.config import settings
+from app.core.metrics import time_outbound
 import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, TYPE_CHECKING
+
+# The Google client libraries are slow to import, so they are loaded on
+# first use (the login flow) instead of at startup
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import Flow
 
 # OAuth scopes we need
 SCOPES = [
@@ -16,8 +20,10 @@ class GoogleAuthService:
     """Handles all Google OAuth operations"""
     
     @staticmethod
-    def create_flow(redirect_uri: Optional[str] = None) -> Flow:
+    def create_flow(redirect_uri: Optional[str] = None) -> "Flow":
         """Create OAuth flow for authentication"""
+        from google_auth_oauthlib.flow import Flow
+        
         client_config = {
             "web": {
                 "client_id": settings.GOOGLE_CLIENT_ID,
@@ -52,7 +58,8 @@ class GoogleAuthService:
     def exchange_code_for_token(code: str) -> Dict[str, Any]:
         """Exchange authorization code for tokens"""
         flow = GoogleAuthService.create_flow()
-        flow.fetch_token(code=code)
+        with time_outbound("google", "token_exchange"):
+            flow.fetch_token(code=code)
         
         credentials = flow.credentials
         
@@ -72,17 +79,13 @@ class GoogleAuthService:
     @staticmethod
     def get_user_info(token_data: Dict[str, Any]) -> Dict[str, Any]:
         """Get user profile information from Google"""
-        credentials = Credentials(
-            token=token_data['token'],
-            refresh_token=token_data.get('refresh_token'),
-            token_uri=token_data['token_uri'],
-            client_id=token_data['client_id'],
-            client_secret=token_data['client_secret'],
-            scopes=token_data['scopes']
-        )
+        from googleapiclient.discovery import build
         
-        service = build('oauth2', 'v2', credentials=credentials)
-        user_info = service.userinfo().get().execute()
+        credentials = GoogleAuthService.get_credentials_from_token(token_data)
+        
+        with time_outbound("google", "userinfo"):
+            service = build('oauth2', 'v2', credentials=credentials)
+            user_info = service.userinfo().get().execute()
         
         return {
             'id': user_info['id'],
@@ -92,8 +95,10 @@ class GoogleAuthService:
         }
     
     @staticmethod
-    def get_credentials_from_token(token_data: Dict[str, Any]) -> Credentials:
+    def get_credentials_from_token(token_data: Dict[str, Any]) -> "Credentials":
         """Recreate Credentials object from stored token data"""
+        from google.oauth2.credentials import Credentials
+        
         return Credentials(
             token=token_data['token'],
             refresh_token=token_data.get('refresh_token'),
@@ -0,0 +1,150 @@
+"""
+Memory-strength status.
+
+A topic's status depends on its confidence, its explain count and how
+long ago it was last explained. The first two only change when the
+topic is explained; time since the last explain only matters at the
+7- and 14-day marks. So the status is stored on the topic together
+with `status_changes_at`, the next moment one of those marks changes
+it, and reads are plain column lookups.
+
+Writes that touch the inputs call refresh(). The sweeper re-evaluates
+only topics whose `status_changes_at` has passed, found through its
+index, so each sweep costs one indexed range read plus one UPDATE per
+topic that actually changes.
+"""
+from sqlalchemy.orm import Session
+from typing import Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.metrics import MEMORY_STATUS_TRANSITIONS
+from app.db.events import notify, user_channel
+from app.db.read_cache import touch
+from app.db.session import SessionLocal
+from app.db.writer import use_write_queue, write_queue
+from app.models.topic import Topic
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("CRITICAL", "WEAK", "STRENGTHENING", "STRONG", "AUTOMATIC")
+
+# Days since the last explain at which the status can change on its own
+THRESHOLD_DAYS = (7, 14)
+
+
+class MemoryStrengthService:
+    """Memory-strength status rules, and keeping the stored status current"""
+
+    @staticmethod
+    def status_at(total_explains: int, avg_confidence: int, last_explained: Optional[datetime],
+                  now: datetime) -> str:
+        """
+        CRITICAL, WEAK, STRENGTHENING, STRONG or AUTOMATIC.
+
+        CRITICAL:      never explained, or very low confidence / very stale
+        AUTOMATIC:     mastered (5/5 confidence + 5+ repetitions)
+        STRONG:        high confidence + explained in the last week
+        STRENGTHENING: moderate confidence + explained in the last week
+        WEAK:          low confidence, or 7-13 days since the last explain
+        """
+        if not total_explains:
+            return "CRITICAL"
+
+        days_since_last = None
+        if last_explained:
+            days_since_last = (now - last_explained).days
+
+        avg_conf = avg_confidence or 0
+
+        if avg_conf >= 5.0 and total_explains >= 5:
+            return "AUTOMATIC"
+        if avg_conf >= 4.0 and (days_since_last is None or days_since_last < 7):
+            return "STRONG"
+        if avg_conf >= 3.0 and (days_since_last is None or days_since_last < 7):
+            return "STRENGTHENING"
+        if avg_conf < 3.0 or (days_since_last and 7 <= days_since_last < 14):
+            return "WEAK"
+        return "CRITICAL"
+
+    @staticmethod
+    def transition(total_explains: int, avg_confidence: int, last_explained: Optional[datetime],
+                   now: datetime) -> Tuple[str, Optional[datetime]]:
+        """(status now, when it next changes by itself - None if it never does)"""
+        status = MemoryStrengthService.status_at(total_explains, avg_confidence, last_explained, now)
+        if last_explained:
+            for days in THRESHOLD_DAYS:
+                mark = last_explained + timedelta(days=days)
+                if mark > now and MemoryStrengthService.status_at(
+                        total_explains, avg_confidence, last_explained, mark) != status:
+                    return status, mark
+        return status, None
+
+    @staticmethod
+    def refresh(topic: Topic, now: Optional[datetime] = None) -> bool:
+        """Recompute the stored status; True if it changed"""
+        status, changes_at = MemoryStrengthService.transition(
+            topic.total_explains, topic.avg_confidence, topic.last_explained, now or datetime.utcnow())
+        changed = status != topic.memory_status
+        topic.memory_status = status
+        topic.status_changes_at = changes_at
+        return changed
+
+    @staticmethod
+    def sweep(db: Session, now: Optional[datetime] = None, limit: int = 500) -> int:
+        """Re-evaluate up to `limit` topics whose status is due to change. Flushes only."""
+        now = now or datetime.utcnow()
+        topics = db.query(Topic).filter(
+            Topic.status_changes_at <= now
+        ).order_by(Topic.status_changes_at).limit(limit).with_for_update(skip_locked=True).all()
+        for topic in topics:
+            if MemoryStrengthService.refresh(topic, now):
+                MEMORY_STATUS_TRANSITIONS.inc(topic.memory_status)
+                touch(db, topic.user_id)
+                notify(db, user_channel(topic.user_id), "topic.status", topic_id=topic.id, status=topic.memory_status)
+        db.flush()
+        return len(topics)
+
+    @staticmethod
+    def sweep_all(now: Optional[datetime] = None) -> int:
+        """Sweep in batches until nothing is due; each batch is its own transaction"""
+        now = now or datetime.utcnow()
+        db = SessionLocal()
+        try:
+            # Usually nothing is due - don't queue a write transaction for that
+            if db.query(Topic.id).filter(Topic.status_changes_at <= now).first() is None:
+                return 0
+        finally:
+            db.close()
+
+        limit = settings.STATUS_SWEEP_BATCH
+        job = lambda db: MemoryStrengthService.sweep(db, now, limit)  # noqa: E731
+        total = 0
+        while True:
+            if use_write_queue():
+                swept = write_queue.submit(job).result()
+            else:
+                db = SessionLocal()
+                try:
+                    swept = job(db)
+                    db.commit()
+                finally:
+                    db.close()
+            total += swept
+            if swept < limit:
+                return total
+
+
+async def run_status_sweeper(interval: Optional[float] = None):
+    """Background task: sweep due status changes every `interval` seconds"""
+    interval = interval or settings.STATUS_SWEEP_INTERVAL_SECONDS
+    while True:
+        try:
+            swept = await asyncio.to_thread(MemoryStrengthService.sweep_all)
+            if swept:
+                logger.info("Memory status sweep re-evaluated %d topics", swept)
+        except Exception:
+            logger.exception("Memory status sweep failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,223 @@
+"""
+Daily cross-user rollups.
+
+One `daily_rollups` row per UTC day holds that day's totals: active
+and new students, explains and their confidence distribution, topics
+created. A background job folds in source rows created since a
+high-water mark (`rollup_state`), so each run reads only the new rows
+through their created_at indexes, and a 90-day dashboard reads 90 rows.
+
+Active students are distinct per day, which can't be summed from
+counts: `daily_active_students` remembers the (day, student) pairs
+already counted, and only new pairs increment the day's total.
+
+The high-water mark trails the clock by ROLLUP_SETTLE_SECONDS so that
+rows stamped just before it but committed just after are not skipped.
+Rollups count events: deleting a topic later doesn't take it back out.
+"""
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.orm import Session
+from typing import Dict, Optional, Tuple
+from datetime import date, datetime, timedelta
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.metrics import ROLLUP_ROWS
+from app.db.session import SessionLocal
+from app.db.writer import use_write_queue, write_queue
+from app.models.rollup import DailyRollup, DailyActiveStudent, RollupState
+from app.models.topic import Topic, ExplainSession
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_NAME = "daily"
+CONFIDENCE_LEVELS = (1, 2, 3, 4, 5)
+COUNTERS = ("active_students", "new_students", "explains", "explain_seconds",
+            *(f"confidence_{level}" for level in CONFIDENCE_LEVELS), "topics_created")
+
+
+def _as_date(value) -> date:
+    """date(created_at) comes back as a date on PostgreSQL and a string on SQLite"""
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+class RollupService:
+    """Maintain and read the daily rollups"""
+
+    @staticmethod
+    def fold(db: Session, start: datetime, end: datetime) -> int:
+        """
+        Add source rows created in (start, end] to the rollups. Returns
+        how many source rows were read. Flushes only.
+        """
+        totals: Dict[date, Dict[str, int]] = {}
+
+        def add(day, column: str, amount):
+            if amount:
+                counters = totals.setdefault(_as_date(day), {})
+                counters[column] = counters.get(column, 0) + int(amount)
+
+        def created(model):
+            return (model.created_at > start) & (model.created_at <= end)
+
+        session_day = func.date(ExplainSession.created_at)
+        rows = db.execute(
+            select(
+                session_day,
+                func.count(),
+                func.coalesce(func.sum(ExplainSession.duration_seconds), 0),
+                *(func.count(case((ExplainSession.confidence == level, 1))) for level in CONFIDENCE_LEVELS),
+            ).where(created(ExplainSession)).group_by(session_day)
+        ).all()
+        explains = 0
+        for day, count, seconds, *levels in rows:
+            explains += count
+            add(day, "explains", count)
+            add(day, "explain_seconds", seconds)
+            for level, level_count in zip(CONFIDENCE_LEVELS, levels):
+                add(day, f"confidence_{level}", level_count)
+
+        # Distinct (day, student) pairs; only ones not counted before add to the day
+        pairs = set()
+        if explains:
+            pairs = {(_as_date(day), user_id) for day, user_id in db.execute(
+                select(session_day, ExplainSession.user_id).where(created(ExplainSession)).distinct()
+            )}
+            days = {day for day, _ in pairs}
+            pairs -= set(db.execute(
+                select(DailyActiveStudent.day, DailyActiveStudent.user_id).where(DailyActiveStudent.day.in_(list(days)))
+            ).tuples())
+            if pairs:
+                db.execute(insert(DailyActiveStudent), [{"day": day, "user_id": user_id} for day, user_id in pairs])
+            for day, _ in pairs:
+                add(day, "active_students", 1)
+
+        topic_day = func.date(Topic.created_at)
+        topics = 0
+        for day, count in db.execute(select(topic_day, func.count()).where(created(Topic)).group_by(topic_day)):
+            topics += count
+            add(day, "topics_created", count)
+
+        user_day = func.date(User.created_at)
+        users = 0
+        for day, count in db.execute(select(user_day, func.count()).where(created(User)).group_by(user_day)):
+            users += count
+            add(day, "new_students", count)
+
+        if totals:
+            existing = {r.day: r for r in db.query(DailyRollup).filter(DailyRollup.day.in_(list(totals)))}
+            for day, counters in totals.items():
+                rollup = existing.get(day)
+                if rollup is None:
+                    rollup = DailyRollup(day=day, **{column: 0 for column in COUNTERS})
+                    db.add(rollup)
+                for column, amount in counters.items():
+                    setattr(rollup, column, getattr(rollup, column) + amount)
+        db.flush()
+
+        if settings.METRICS_ENABLED:
+            ROLLUP_ROWS.inc("explain_sessions", amount=explains)
+            ROLLUP_ROWS.inc("topics", amount=topics)
+            ROLLUP_ROWS.inc("users", amount=users)
+        return explains + topics + users
+
+    @staticmethod
+    def _earliest(db: Session) -> Optional[datetime]:
+        """Creation time of the oldest source row (each an index lookup)"""
+        times = [db.query(func.min(model.created_at)).scalar() for model in (ExplainSession, Topic, User)]
+        times = [t for t in times if t is not None]
+        return min(times) if times else None
+
+    @staticmethod
+    def advance(db: Session, now: Optional[datetime] = None) -> Tuple[int, bool]:
+        """
+        Fold in the next window after the high-water mark and move the
+        mark. Returns (source rows read, caught up). Flushes only.
+        """
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=settings.ROLLUP_SETTLE_SECONDS)
+        # Row lock: with several app processes on PostgreSQL only one advances at a time
+        state = db.query(RollupState).filter(RollupState.name == ROLLUP_NAME).with_for_update().first()
+        if state is None:
+            earliest = RollupService._earliest(db)
+            start = earliest - timedelta(microseconds=1) if earliest else cutoff
+            state = RollupState(name=ROLLUP_NAME, high_water=start)
+            db.add(state)
+        start = state.high_water
+        if start >= cutoff:
+            return 0, True
+
+        end = min(cutoff, start + timedelta(hours=settings.ROLLUP_MAX_WINDOW_HOURS))
+        rows = RollupService.fold(db, start, end)
+        state.high_water = end
+        db.flush()
+        return rows, end >= cutoff
+
+    @staticmethod
+    def advance_all(now: Optional[datetime] = None) -> int:
+        """Advance until caught up; each window is its own transaction"""
+        now = now or datetime.utcnow()
+        job = lambda db: RollupService.advance(db, now)  # noqa: E731
+        total = 0
+        while True:
+            if use_write_queue():
+                rows, caught_up = write_queue.submit(job).result()
+            else:
+                db = SessionLocal()
+                try:
+                    rows, caught_up = job(db)
+                    db.commit()
+                finally:
+                    db.close()
+            total += rows
+            if caught_up:
+                return total
+
+    @staticmethod
+    def daily(db: Session, days: int, today: Optional[date] = None) -> dict:
+        """The last `days` days of rollups (oldest first, zeros for quiet days) and their totals"""
+        today = today or datetime.utcnow().date()
+        first = today - timedelta(days=days - 1)
+        rows = {r.day: r for r in db.query(DailyRollup).filter(
+            DailyRollup.day >= first, DailyRollup.day <= today
+        )}
+        state = db.query(RollupState.high_water).filter(RollupState.name == ROLLUP_NAME).scalar()
+
+        series = []
+        for offset in range(days):
+            day = first + timedelta(days=offset)
+            row = rows.get(day)
+            entry = {"day": day.isoformat()}
+            entry.update({column: getattr(row, column) if row else 0 for column in COUNTERS})
+            series.append(entry)
+
+        totals = {column: sum(entry[column] for entry in series) for column in COUNTERS if column != "active_students"}
+        return {
+            "from": first.isoformat(),
+            "to": today.isoformat(),
+            "rolled_up_to": state.isoformat() if state else None,
+            "days": series,
+            "totals": totals,
+            "avg_daily_active_students": round(sum(e["active_students"] for e in series) / days, 1),
+            "confidence_distribution": {
+                str(level): totals[f"confidence_{level}"] for level in CONFIDENCE_LEVELS
+            },
+        }
+
+
+async def run_rollup_job(interval: Optional[float] = None):
+    """Background task: fold new rows into the daily rollups every `interval` seconds"""
+    interval = interval or settings.ROLLUP_INTERVAL_SECONDS
+    while True:
+        try:
+            rows = await asyncio.to_thread(RollupService.advance_all)
+            if rows:
+                logger.info("Daily rollups folded in %d rows", rows)
+        except Exception:
+            logger.exception("Daily rollup job failed")
+        await asyncio.sleep(interval)
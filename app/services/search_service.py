@@ -0,0 +1,193 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import List, Optional
+import heapq
+from app.core.config import settings
+from app.db.search_index import PREFIX_MAX, user_key
+from app.models.topic import Topic, ExplainSession, ArchivedExplainSession
+import re
+
+# Words only - everything else in the query is dropped, so user input
+# can never turn into FTS5 / tsquery operators
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# highlight() markers; hits are counted from these, then shown as **bold**
+_OPEN, _CLOSE = "\x01", "\x02"
+
+_SQLITE_SEARCH = """
+    SELECT doc_type, doc_id, topic_id,
+           highlight(search_index, 1, char(1), char(2)) AS title,
+           highlight(search_index, 2, char(1), char(2)) AS body
+    FROM search_index
+    WHERE search_index MATCH :match {type_filter}
+    {order}
+    LIMIT :candidates
+"""
+
+_POSTGRES_SEARCH = """
+    SELECT doc_type, doc_id::text AS doc_id, topic_id::text AS topic_id,
+           title,
+           ts_headline('english', body, q, 'StartSel=**, StopSel=**, MaxFragments=1, MaxWords=16') AS snippet,
+           ts_rank(tsv, q) AS rank
+    FROM search_documents, to_tsquery('english', :tsquery) AS q
+    WHERE user_id = :user_id AND tsv @@ q {type_filter}
+    ORDER BY rank DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+# Ranking weights (BM25 term-frequency saturation and length normalisation)
+TITLE_WEIGHT = 10.0
+K1 = 1.2
+B = 0.75
+
+
+def _snippet(body: str, words: int = 16) -> str:
+    """A window of `words` words around the first highlighted hit"""
+    tokens = body.split()
+    first = next((i for i, token in enumerate(tokens) if _OPEN in token), 0)
+    start = max(0, min(first - words // 4, len(tokens) - words))
+    window = " ".join(tokens[start:start + words])
+    if start > 0:
+        window = "…" + window
+    if start + words < len(tokens):
+        window += "…"
+    return _bold(window)
+
+
+def _bold(value: str) -> str:
+    return value.replace(_OPEN, "**").replace(_CLOSE, "**")
+
+
+class SearchService:
+    """Ranked, per-user full-text search over topics and explain sessions"""
+
+    @staticmethod
+    def query_terms(query: str) -> List[str]:
+        return _WORD.findall(query.lower())[:12]
+
+    @staticmethod
+    def search(db: Session, user_id: str, query: str, limit: int = 20, offset: int = 0,
+               doc_type: Optional[str] = None) -> dict:
+        """One page of results, best match first, plus whether there is another page"""
+        terms = SearchService.query_terms(query)
+        if not terms:
+            return {"results": [], "has_more": False}
+
+        if db.get_bind().dialect.name == "postgresql":
+            rows, has_more = SearchService._search_postgres(db, user_id, terms, limit, offset, doc_type)
+        else:
+            rows, has_more = SearchService._search_sqlite(db, user_id, terms, limit, offset, doc_type)
+
+        # Topic titles and session details for the page - two IN queries (three with archived hits)
+        topic_ids = {r["topic_id"] for r in rows if r["topic_id"]}
+        session_ids = [r["doc_id"] for r in rows if r["doc_type"] == "session"]
+        titles = dict(db.query(Topic.id, Topic.title).filter(
+            Topic.id.in_(topic_ids), Topic.user_id == user_id
+        ).all()) if topic_ids else {}
+        sessions = {s.id: s for s in db.query(
+            ExplainSession.id, ExplainSession.created_at, ExplainSession.confidence
+        ).filter(ExplainSession.id.in_(session_ids)).all()} if session_ids else {}
+        archived_ids = [doc_id for doc_id in session_ids if doc_id not in sessions]
+        if archived_ids:  # archived sessions keep their search documents
+            sessions.update({s.id: s for s in db.query(
+                ArchivedExplainSession.id, ArchivedExplainSession.created_at, ArchivedExplainSession.confidence
+            ).filter(ArchivedExplainSession.id.in_(archived_ids)).all()})
+
+        results = []
+        for r in rows:
+            result = {
+                "type": r["doc_type"],
+                "id": r["doc_id"],
+                "topic_id": r["topic_id"],
+                "topic_title": titles.get(r["topic_id"]),
+                "snippet": r["snippet"],
+                "score": round(float(r["rank"]), 4),
+            }
+            if r["doc_type"] == "topic":
+                result["highlighted_title"] = r["title"]
+            session = sessions.get(r["doc_id"])
+            if session is not None:
+                result["created_at"] = session.created_at.isoformat() if session.created_at else None
+                result["confidence"] = session.confidence
+            results.append(result)
+
+        return {"results": results, "has_more": has_more}
+
+    @staticmethod
+    def _search_postgres(db: Session, user_id: str, terms: List[str], limit: int, offset: int,
+                         doc_type: Optional[str]):
+        # Every term must match; the last one also matches as a prefix
+        # (search-as-you-type). Fetches limit + 1 rows to know whether
+        # there is a next page without counting every match.
+        params = {
+            "tsquery": " & ".join(terms[:-1] + [terms[-1] + ":*"]),
+            "user_id": user_id,
+            "limit": limit + 1,
+            "offset": offset,
+        }
+        type_filter = ""
+        if doc_type:
+            type_filter = "AND doc_type = :doc_type"
+            params["doc_type"] = doc_type
+
+        rows = db.execute(text(_POSTGRES_SEARCH.format(type_filter=type_filter)), params).mappings().all()
+        return [dict(r) for r in rows[:limit]], len(rows) > limit
+
+    @staticmethod
+    def _search_sqlite(db: Session, user_id: str, terms: List[str], limit: int, offset: int,
+                       doc_type: Optional[str]):
+        """
+        FTS5's bm25() counts each term's matches over the whole corpus (for
+        IDF) on every query - tens of milliseconds per term at a million
+        documents. Every hit matches all terms anyway, so rank the user's
+        own hits here instead: highlight() marks the matched tokens, and
+        the per-column hit counts go through BM25's term-frequency
+        saturation and length normalisation.
+
+        That needs every hit. Only when a user has more than
+        SEARCH_MAX_CANDIDATES of them does FTS5 pick that many by bm25()
+        (ORDER BY rank) for the ranking here - an arbitrary cut would lose
+        the best ones.
+        """
+        # Every term must match; the last one also matches as a prefix
+        # (search-as-you-type), cut to the longest prefix index
+        words = [f'"{t}"' for t in terms[:-1]] + [f'"{terms[-1][:PREFIX_MAX]}"*']
+        params = {
+            "match": f'user_key:{user_key(user_id)} AND {{title body}}: ({" ".join(words)})',
+            "candidates": settings.SEARCH_MAX_CANDIDATES + 1,
+        }
+        type_filter = ""
+        if doc_type:
+            type_filter = "AND doc_type = :doc_type"
+            params["doc_type"] = doc_type
+
+        candidates = db.execute(text(_SQLITE_SEARCH.format(type_filter=type_filter, order="")), params).all()
+        if len(candidates) > settings.SEARCH_MAX_CANDIDATES:
+            params["candidates"] = settings.SEARCH_MAX_CANDIDATES
+            candidates = db.execute(
+                text(_SQLITE_SEARCH.format(type_filter=type_filter, order="ORDER BY rank")), params).all()
+        if not candidates:
+            return [], False
+
+        avg_length = sum(len(c.body) for c in candidates) / len(candidates) or 1.0
+        scored = []
+        for c in candidates:
+            body_hits = c.body.count(_OPEN)
+            norm = K1 * (1 - B + B * len(c.body) / avg_length)
+            rank = TITLE_WEIGHT * c.title.count(_OPEN) + body_hits * (K1 + 1) / (body_hits + norm)
+            # Ties go to the newest document (ids are time-ordered)
+            scored.append((rank, c.doc_id, c))
+        best = heapq.nlargest(offset + limit + 1, scored, key=lambda item: item[:2])
+
+        page = [
+            {
+                "doc_type": c.doc_type,
+                "doc_id": c.doc_id,
+                "topic_id": c.topic_id,
+                "title": _bold(c.title),
+                "snippet": _snippet(c.body),
+                "rank": rank,
+            }
+            for rank, _, c in best[offset:offset + limit]
+        ]
+        return page, len(best) > offset + limit
@@ -0,0 +1,85 @@
+async function loadFeedback() {
+    try {
+        const response = await fetch('/api/feedback/admin/list');
+        const data = await response.json();
+
+        // Update stats
+        const statsContainer = document.getElementById('statsContainer');
+        const typeCounts = {};
+        data.feedback.forEach(item => {
+            typeCounts[item.type] = (typeCounts[item.type] || 0) + 1;
+        });
+
+        statsContainer.innerHTML = `
+            <div class="stat-card">
+                <div class="stat-value">${data.total}</div>
+                <div class="stat-label">Total Feedback</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-value">${typeCounts.feature || 0}</div>
+                <div class="stat-label">Features</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-value">${typeCounts.bug || 0}</div>
+                <div class="stat-label">Bugs</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-value">${typeCounts.improvement || 0}</div>
+                <div class="stat-label">Improvements</div>
+            </div>
+        `;
+
+        // Display feedback items
+        const container = document.getElementById('feedbackContainer');
+
+        if (data.total === 0) {
+            container.innerHTML = '<div class="feedback-item"><p style="color: #999; text-align: center;">No feedback yet. Share your app to get user insights!</p></div>';
+            return;
+        }
+
+        container.innerHTML = data.feedback.map(item => `
+            <div class="feedback-item">
+                <div class="feedback-header">
+                    <span class="type-badge type-${item.type}">${item.type.toUpperCase()}</span>
+                    <span class="meta">${item.created_at}</span>
+                </div>
+                <div class="message">${item.message}</div>
+                <div class="meta">
+                    <strong>${item.name}</strong> • ${item.email}
+                    ${item.user_id ? ' • Registered User' : ' • Guest'}
+                </div>
+            </div>
+        `).join('');
+
+    } catch (error) {
+        console.error('Error:', error);
+        document.getElementById('feedbackContainer').innerHTML = 
+            '<div class="feedback-item"><p style="color: #c33;">Error loading feedback. Make sure you\'re logged in.</p></div>';
+    }
+}
+
+loadFeedback();
+
+// Refresh when feedback arrives; poll every 30 seconds only if the
+// event stream is unavailable
+let pollTimer = null;
+function startPolling() {
+    if (!pollTimer) pollTimer = setInterval(loadFeedback, 30000);
+}
+if (window.EventSource) {
+    const events = new EventSource('/api/events?feedback=1');
+    let reconnecting = false;
+    events.addEventListener('feedback.created', loadFeedback);
+    events.addEventListener('resync', loadFeedback);
+    events.onopen = () => {
+        // Anything sent while we were disconnected was missed
+        if (reconnecting) loadFeedback();
+        reconnecting = false;
+    };
+    events.onerror = () => {
+        reconnecting = true;
+        if (events.readyState === EventSource.CLOSED) startPolling();
+    };
+} else {
+    startPolling();
+}
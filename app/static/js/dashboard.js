@@ -0,0 +1,271 @@
+// Get current time for greeting
+const hour = new Date().getHours();
+let greeting = "Good evening";
+if (hour < 12) greeting = "Good morning";
+else if (hour < 18) greeting = "Good afternoon";
+
+document.getElementById('greetingText').textContent =
+    greeting + "! Here's what needs your attention today.";
+
+// Study Guide Toggle Functions
+function toggleGuide() {
+    const content = document.getElementById('guideContent');
+    const toggle = document.getElementById('guideToggle');
+
+    if (content.style.display === 'none') {
+        content.style.display = 'block';
+        toggle.textContent = '▲';
+    } else {
+        content.style.display = 'none';
+        toggle.textContent = '▼';
+    }
+}
+
+function dismissGuide() {
+    document.getElementById('studyGuide').style.display = 'none';
+    localStorage.setItem('guide_dismissed', 'true');
+}
+
+// Auto-expand guide for new users
+window.addEventListener('DOMContentLoaded', () => {
+    if (!localStorage.getItem('guide_dismissed')) {
+        document.getElementById('guideContent').style.display = 'block';
+        document.getElementById('guideToggle').textContent = '▲';
+    }
+});
+
+// Load memory stats on page load
+async function loadMemoryStats() {
+    try {
+        const response = await fetch('/api/topics/memory-stats');
+        const data = await response.json();
+
+        // Hide loading, show content
+        document.getElementById('memoryStatsLoading').style.display = 'none';
+        document.getElementById('memoryStatsContent').style.display = 'block';
+
+        // Update exam-ready percentage
+        const examReadyPercent = data.exam_ready_percent;
+        document.getElementById('examReadyPercent').textContent = examReadyPercent + '%';
+
+        // Update message based on percentage
+        const messageEl = document.getElementById('examReadyMessage');
+        if (examReadyPercent >= 80) {
+            messageEl.textContent = '🎉 Excellent! You\'re well-prepared';
+            messageEl.style.color = '#10b981';
+        } else if (examReadyPercent >= 50) {
+            messageEl.textContent = 'Good progress! Keep strengthening';
+        } else if (examReadyPercent > 0) {
+            messageEl.textContent = 'Keep training to increase this number';
+        } else {
+            messageEl.textContent = 'Start explaining topics to build memory strength';
+        }
+
+        // Show risk alert if needed
+        if (data.topics_at_risk > 0) {
+            document.getElementById('riskAlert').style.display = 'block';
+            document.getElementById('riskAlertText').textContent = 
+                `${data.topics_at_risk} topic${data.topics_at_risk !== 1 ? 's' : ''} at risk of being forgotten`;
+        }
+
+        // Update status counts
+        document.querySelector('#statusCritical div:nth-child(2)').textContent = data.by_status.CRITICAL;
+        document.querySelector('#statusWeak div:nth-child(2)').textContent = data.by_status.WEAK;
+        document.querySelector('#statusStrengthening div:nth-child(2)').textContent = data.by_status.STRENGTHENING;
+        document.querySelector('#statusStrong div:nth-child(2)').textContent = data.by_status.STRONG;
+        document.querySelector('#statusAutomatic div:nth-child(2)').textContent = data.by_status.AUTOMATIC;
+
+        // Show topics needing attention
+        if (data.topics_needing_attention.length > 0) {
+            document.getElementById('attentionTopicsSection').style.display = 'block';
+
+            const listHTML = data.topics_needing_attention.map(topic => {
+                const strength = topic.strength;
+                return `
+                    <div style="background: white; padding: 1rem; border-radius: 8px; 
+                                border-left: 4px solid ${strength.color}; 
+                                display: flex; justify-content: space-between; align-items: center;
+                                box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
+                        <div style="flex: 1;">
+                            <div style="font-weight: 600; color: #1a1a1a; margin-bottom: 0.25rem;">
+                                ${topic.title}
+                            </div>
+                            <div style="font-size: 0.85rem; color: ${strength.color};">
+                                ${strength.emoji} ${strength.message}
+                            </div>
+                        </div>
+                        <button onclick="window.location.href='/explain/${topic.id}'" 
+                                style="background: ${strength.color}; color: white; 
+                                       border: none; padding: 0.5rem 1rem; border-radius: 6px; 
+                                       font-weight: 600; cursor: pointer; white-space: nowrap;">
+                            Explain Now
+                        </button>
+                    </div>
+                `;
+            }).join('');
+
+            document.getElementById('attentionTopicsList').innerHTML = listHTML;
+        }
+
+    } catch (error) {
+        console.error('Error loading memory stats:', error);
+        document.getElementById('memoryStatsLoading').innerHTML = 
+            '<p style="color: #ef4444;">Error loading stats. Please refresh.</p>';
+    }
+}
+
+// Load due reviews
+async function loadDueReviews() {
+    try {
+        const timestamp = new Date().getTime();
+        const response = await fetch(`/api/due-today?t=${timestamp}`);
+        const data = await response.json();
+
+        const container = document.getElementById('dueReviews');
+
+        if (data.total_due === 0) {
+            container.innerHTML = `
+                <div class="empty-state">
+                    <div class="empty-state-icon">✨</div>
+                    <h3 style="margin-bottom: 0.5rem;">Nothing due today!</h3>
+                    <p style="opacity: 0.9; margin-bottom: 1.5rem;">
+                        You're all caught up. Want to learn something new?
+                    </p>
+                    <button onclick="window.location.href='/topics'" class="btn-review">
+                        Browse Topics
+                    </button>
+                </div>
+            `;
+            return;
+        }
+
+        let html = '';
+
+        // Show scheduled reviews with correct field names
+        data.due_schedules.forEach(review => {
+            // Determine status message
+            let statusMessage = '';
+            if (review.status === 'overdue') {
+                const days = review.days_overdue;
+                statusMessage = `${days} day${days !== 1 ? 's' : ''} overdue`;
+            } else {
+                statusMessage = 'Due today';
+            }
+
+            html += `
+                <div class="review-card">
+                    <div class="review-info">
+                        <h3>${review.topic || 'Untitled Topic'}</h3>
+                        <div class="review-meta">
+                            Scheduled review · ${statusMessage}
+                        </div>
+                    </div>
+                    ${review.can_explain ?
+                        `<a href="/explain/${review.topic_id}" class="btn-review">
+                            🎯 Review Now
+                        </a>` :
+                        `<button onclick="createTopic('${review.topic}')" class="btn-review">
+                            + Create Topic First
+                        </button>`
+                    }
+                </div>
+            `;
+        });
+
+        // Show topics needing review
+        data.topics_needing_review.forEach(topic => {
+            html += `
+                <div class="review-card">
+                    <div class="review-info">
+                        <h3>${topic.title}</h3>
+                        <div class="review-meta">
+                            Last reviewed ${topic.days_since} day${topic.days_since !== 1 ? 's' : ''} ago ·
+                            Confidence: ${topic.confidence}/5
+                        </div>
+                    </div>
+                    <a href="/explain/${topic.topic_id}" class="btn-review">
+                        🔄 Review Again
+                    </a>
+                </div>
+            `;
+        });
+
+        container.innerHTML = html;
+
+    } catch (error) {
+        console.error('Error loading reviews:', error);
+        document.getElementById('dueReviews').innerHTML = `
+            <div class="empty-state">
+                <p style="color: rgba(255,255,255,0.8);">
+                    Error loading reviews. Please refresh the page.
+                </p>
+            </div>
+        `;
+    }
+}
+
+// Load quick stats
+async function loadQuickStats() {
+    try {
+        const response = await fetch('/api/analytics/stats');
+        const data = await response.json();
+
+        document.getElementById('quickStats').innerHTML = `
+            <div class="stat-item">
+                <div class="stat-value">${data.total_topics || 0}</div>
+                <div class="stat-label">Topics</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-value">${data.total_explains || 0}</div>
+                <div class="stat-label">Explains</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-value">${data.avg_confidence || 0}/5</div>
+                <div class="stat-label">Avg Confidence</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-value">${data.current_streak || 0}</div>
+                <div class="stat-label">Day Streak</div>
+            </div>
+        `;
+    } catch (error) {
+        console.error('Error loading stats:', error);
+    }
+}
+
+function createTopic(topicName) {
+    localStorage.setItem('prefill_topic', topicName);
+    window.location.href = '/topics';
+}
+
+// Load everything
+window.addEventListener('DOMContentLoaded', () => {
+    loadMemoryStats();
+    loadDueReviews();
+    loadQuickStats();
+    listenForChanges();
+});
+
+// Reload when something changes (here or in another tab) instead of
+// polling; bursts of events collapse into one reload
+function listenForChanges() {
+    if (!window.EventSource) return;
+    const events = new EventSource('/api/events');
+    let reloadTimer = null;
+    let reconnecting = false;
+    const reload = () => {
+        clearTimeout(reloadTimer);
+        reloadTimer = setTimeout(() => {
+            loadMemoryStats();
+            loadDueReviews();
+            loadQuickStats();
+        }, 300);
+    };
+    ['topic.created', 'topic.deleted', 'topic.rescheduled', 'topic.status', 'session.saved',
+     'schedule.created', 'review.completed', 'resync'].forEach(name => events.addEventListener(name, reload));
+    events.onopen = () => {
+        if (reconnecting) reload();
+        reconnecting = false;
+    };
+    events.onerror = () => { reconnecting = true; };
+}
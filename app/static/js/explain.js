@@ -0,0 +1,289 @@
+const topicId = window.location.pathname.split('/').pop();
+let timerInterval;
+let timeRemaining = 300; // 5 minutes in seconds
+let selectedConfidence = null;
+let startTime;
+
+// Load topic details
+async function loadTopic() {
+    try {
+        const response = await fetch(`/api/topics/${topicId}`);
+        const data = await response.json();
+
+        document.getElementById('topicTitle').textContent = data.title;
+        if (data.subject) {
+            document.getElementById('topicSubject').textContent = data.subject;
+        }
+    } catch (error) {
+        console.error('Error loading topic:', error);
+        document.getElementById('topicTitle').textContent = 'Topic Not Found';
+    }
+}
+
+// Updated function to load past reflections
+async function loadPastReflections() {
+    try {
+        const response = await fetch(`/api/topics/${topicId}/sessions`);
+        const data = await response.json();
+
+        const container = document.getElementById('reflectionsList');
+
+        if (data.sessions.length === 0) {
+            container.innerHTML = '<p style="color: #666; text-align: center;">No past sessions yet. Complete your first explanation above!</p>';
+            return;
+        }
+
+        let html = '<div style="display: grid; gap: 1.5rem;">';
+
+        data.sessions.forEach((session, index) => {
+            const date = new Date(session.date);
+            const formattedDate = date.toLocaleDateString('en-NG', {
+                month: 'short',
+                day: 'numeric',
+                year: 'numeric',
+                hour: '2-digit',
+                minute: '2-digit'
+            });
+
+            html += `
+                <div style="background: white; padding: 1.5rem; border-radius: 12px; border-left: 4px solid ${getConfidenceColor(session.confidence)}; box-shadow: 0 2px 10px rgba(0,0,0,0.05);">
+                    <div style="display: flex; justify-content: space-between; align-items: start; margin-bottom: 1rem; flex-wrap: wrap; gap: 1rem;">
+                        <div>
+                            <strong style="color: #1a1a1a; font-size: 1.1rem;">Session ${data.sessions.length - index}</strong>
+                            <div style="color: #666; margin-top: 0.25rem; font-size: 0.9rem;">${formattedDate} ${session.days_ago > 0 ? `(${session.days_ago} day${session.days_ago !== 1 ? 's' : ''} ago)` : '(today)'}</div>
+                        </div>
+                        <div style="background: ${getConfidenceColor(session.confidence)}; color: white; padding: 0.5rem 1rem; border-radius: 50px; font-size: 0.9rem; font-weight: 600;">
+                            Confidence: ${session.confidence}/5
+                        </div>
+                    </div>
+
+                    ${session.struggles ? `
+                        <div style="margin-bottom: 1rem; padding: 1rem; background: #fef3f2; border-radius: 8px;">
+                            <strong style="color: #dc2626; font-size: 0.9rem;">💭 What you struggled with:</strong>
+                            <p style="color: #1a1a1a; margin-top: 0.5rem; line-height: 1.5;">${session.struggles}</p>
+                        </div>
+                    ` : ''}
+
+                    ${session.forgot ? `
+                        <div style="margin-bottom: 1rem; padding: 1rem; background: #fef9c3; border-radius: 8px;">
+                            <strong style="color: #ca8a04; font-size: 0.9rem;">❓ What you forgot:</strong>
+                            <p style="color: #1a1a1a; margin-top: 0.5rem; line-height: 1.5;">${session.forgot}</p>
+                        </div>
+                    ` : ''}
+
+                    ${session.unclear ? `
+                        <div style="margin-bottom: 1rem; padding: 1rem; background: #eff6ff; border-radius: 8px;">
+                            <strong style="color: #2563eb; font-size: 0.9rem;">🤔 What was unclear:</strong>
+                            <p style="color: #1a1a1a; margin-top: 0.5rem; line-height: 1.5;">${session.unclear}</p>
+                        </div>
+                    ` : ''}
+
+                    <div style="color: #666; font-size: 0.85rem; margin-top: 1rem; padding-top: 0.75rem; border-top: 1px solid #e5e7eb;">
+                        ⏱️ Duration: ${Math.floor(session.duration_seconds / 60)}min ${session.duration_seconds % 60}s
+                    </div>
+                </div>
+            `;
+        });
+
+        html += '</div>';
+        container.innerHTML = html;
+
+    } catch (error) {
+        console.error('Error loading reflections:', error);
+        document.getElementById('reflectionsList').innerHTML =
+            '<p style="color: #ef4444; text-align: center;">Error loading past sessions. Please refresh the page.</p>';
+    }
+}
+
+// Updated confidence color function
+function getConfidenceColor(confidence) {
+    const colors = {
+        1: '#ef4444',  // Red
+        2: '#f97316',  // Orange
+        3: '#eab308',  // Yellow
+        4: '#22c55e',  // Green
+        5: '#10b981'   // Dark Green
+    };
+    return colors[confidence] || '#667eea';
+}
+
+function startTimer() {
+    startTime = Date.now();
+    document.getElementById('startBtn').disabled = true;
+    document.getElementById('startBtn').textContent = 'Explaining...';
+
+    timerInterval = setInterval(() => {
+        timeRemaining--;
+        updateDisplay();
+
+        if (timeRemaining <= 0) {
+            endTimer();
+        }
+    }, 1000);
+}
+
+function updateDisplay() {
+    const minutes = Math.floor(timeRemaining / 60);
+    const seconds = timeRemaining % 60;
+    document.getElementById('timerDisplay').textContent =
+        `${minutes}:${seconds.toString().padStart(2, '0')}`;
+
+    const progress = ((300 - timeRemaining) / 300) * 100;
+    document.getElementById('progressFill').style.width = `${progress}%`;
+}
+
+function endTimer() {
+    clearInterval(timerInterval);
+    document.getElementById('timerPhase').style.display = 'none';
+    document.getElementById('reflectionPhase').classList.add('active');
+    loadPastReflections();
+}
+
+// Removed skipToReflection function per instructions
+
+function selectConfidence(level) {
+    selectedConfidence = level;
+    document.querySelectorAll('.confidence-btn').forEach(btn => {
+        btn.classList.remove('selected');
+    });
+    event.target.classList.add('selected');
+}
+
+// Helper function to format date nicely
+function formatDate(dateString) {
+    const date = new Date(dateString);
+    const options = { weekday: 'long', month: 'long', day: 'numeric' };
+    return date.toLocaleDateString('en-US', options);
+}
+
+// Helper function to get confidence emoji
+function getConfidenceEmoji(confidence) {
+    const emojis = {
+        1: '😰',
+        2: '😕',
+        3: '😐',
+        4: '😊',
+        5: '🎯'
+    };
+    return emojis[confidence] || '😐';
+}
+
+// Helper function to get confidence message
+function getConfidenceMessage(confidence) {
+    const messages = {
+        1: "Don't worry! Struggling means you're learning. Review soon to improve.",
+        2: "You're getting there! A quick review will help solidify this.",
+        3: "Decent understanding! Regular review will strengthen this knowledge.",
+        4: "Great job! You've got this down. Just reinforce it later.",
+        5: "Excellent! You could teach this. Review periodically to maintain mastery."
+    };
+    return messages[confidence] || "Keep up the good work!";
+}
+
+// NEW: Emergency exit confirmation
+function confirmQuit() {
+    const confirmed = confirm(
+        "⚠️ WARNING: Quitting without completing breaks your learning.\n\n" +
+        "You'll lose progress on this topic and it will stay marked as 'UNTRAINED'.\n\n" +
+        "Are you SURE you want to quit?"
+    );
+
+    if (confirmed) {
+        window.location.href = '/dashboard';
+    }
+}
+
+document.getElementById('reflectionForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    if (selectedConfidence === null) {
+        alert('Please select a confidence level');
+        return;
+    }
+
+    const durationSeconds = Math.floor((Date.now() - startTime) / 1000);
+
+    const sessionData = {
+        topic_id: topicId,
+        duration_seconds: durationSeconds,
+        struggles: document.getElementById('struggles').value,
+        forgot: document.getElementById('forgot').value,
+        unclear: document.getElementById('unclear').value,
+        confidence: selectedConfidence
+    };
+
+    try {
+        const response = await fetch('/api/topics/explain', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(sessionData)
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            // Hide reflection form
+            document.getElementById('reflectionPhase').style.display = 'none';
+
+            // Show success with AUTO-SCHEDULED review info
+            const successHTML = `
+                <div class="success-box">
+                    <div class="success-icon">✅</div>
+                    <h2 style="font-size: 2rem; margin-bottom: 1rem;">Explanation Complete!</h2>
+                    <p style="font-size: 1.1rem; opacity: 0.95; margin-bottom: 1.5rem;">
+                        Great work identifying your struggles. That's where real learning happens.
+                    </p>
+
+                    <div style="background: rgba(255,255,255,0.1); padding: 1.5rem; border-radius: 12px;">
+                        <div style="font-size: 1.2rem; opacity: 0.9; margin-bottom: 0.5rem;">
+                            Your Confidence
+                        </div>
+                        <div style="font-size: 3rem; margin-bottom: 0.5rem;">
+                            ${getConfidenceEmoji(selectedConfidence)} ${selectedConfidence}/5
+                        </div>
+                        <p style="opacity: 0.95; margin-bottom: 1.5rem;">
+                            ${getConfidenceMessage(selectedConfidence)}
+                        </p>
+
+                        ${data.next_review_date ? `
+                        <div style="border-top: 2px solid rgba(255,255,255,0.2); padding-top: 1.5rem; margin-top: 1.5rem;">
+                            <div style="font-size: 1.2rem; opacity: 0.9; margin-bottom: 1rem;">
+                                📅 Next Review Scheduled
+                            </div>
+                            <div class="days-badge">
+                                ${data.days_until_review} day${data.days_until_review !== 1 ? 's' : ''}
+                            </div>
+                            <div style="font-size: 1.1rem; opacity: 0.95;">
+                                ${formatDate(data.next_review_date)}
+                            </div>
+                            <p style="margin-top: 1rem; opacity: 0.85; font-size: 0.95rem;">
+                                We'll remind you when it's time to review. This timing is optimized based on your confidence level.
+                            </p>
+                        </div>
+                        ` : ''}
+                    </div>
+                </div>
+
+                <div class="controls">
+                    <button class="btn" onclick="window.location.href='/topics'">
+                        ← Back to Topics
+                    </button>
+                    <button class="btn" style="background: white; color: #667eea;" onclick="window.location.href = '/dashboard?refresh=' + Date.now();">
+                        Go to Dashboard →
+                    </button>
+                </div>
+            `;
+
+            document.getElementById('successPhase').innerHTML = successHTML;
+            document.getElementById('successPhase').style.display = 'block';
+        } else {
+            alert('Error saving session: ' + (data.message || 'Unknown error'));
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error saving session: ' + error.message);
+    }
+});
+
+// Load topic on page load
+loadTopic();
@@ -0,0 +1,44 @@
+document.getElementById('feedbackForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const btn = document.getElementById('submitBtn');
+    const successMsg = document.getElementById('successMessage');
+    const errorMsg = document.getElementById('errorMessage');
+
+    successMsg.style.display = 'none';
+    errorMsg.style.display = 'none';
+
+    btn.disabled = true;
+    btn.textContent = 'Sending...';
+
+    const formData = {
+        name: document.getElementById('name').value || 'Anonymous',
+        email: document.getElementById('email').value || 'not provided',
+        type: document.getElementById('type').value,
+        message: document.getElementById('message').value
+    };
+
+    try {
+        const response = await fetch('/api/feedback', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(formData)
+        });
+
+        const data = await response.json();
+
+        if (response.ok) {
+            successMsg.textContent = 'Thank you! Your feedback has been received. 🎉';
+            successMsg.style.display = 'block';
+            document.getElementById('feedbackForm').reset();
+        } else {
+            throw new Error(data.detail || 'Failed to submit feedback');
+        }
+    } catch (error) {
+        errorMsg.textContent = error.message;
+        errorMsg.style.display = 'block';
+    } finally {
+        btn.disabled = false;
+        btn.textContent = 'Submit Feedback';
+    }
+});
@@ -0,0 +1,213 @@
+async function loadTopics() {
+    try {
+        const response = await fetch('/api/topics/list');
+        const data = await response.json();
+
+        const container = document.getElementById('topicsContainer');
+
+        if (data.total === 0) {
+            container.innerHTML = `
+                <div class="empty-state" style="grid-column: 1/-1;">
+                    <div class="empty-state-icon">📚</div>
+                    <h3>No topics yet</h3>
+                    <p>Create your first topic to start using Explain Mode!</p>
+                    <button class="btn" onclick="openNewTopicModal()">+ Create First Topic</button>
+                </div>
+            `;
+            return;
+        }
+
+        container.innerHTML = data.topics.map(topic => {
+            // Use memory_strength from backend, or provide defaults
+            const strength = topic.memory_strength || {
+                status: "UNKNOWN",
+                color: "#999",
+                emoji: "❓",
+                message: "Unknown status"
+            };
+
+            return `
+                <div class="topic-card" style="border-left: 4px solid ${strength.color};">
+                    <!-- Memory Strength Badge (Top Right) -->
+                    <div style="position: absolute; top: 1rem; right: 1rem; 
+                                background: ${strength.color}; color: white; 
+                                padding: 0.4rem 0.8rem; border-radius: 20px; 
+                                font-size: 0.75rem; font-weight: 700;">
+                        ${strength.emoji} ${strength.status}
+                    </div>
+
+                    <div class="topic-title">${topic.title}</div>
+                    ${topic.subject ? `<div class="topic-subject">📚 ${topic.subject}</div>` : ''}
+
+                    <!-- Memory Strength Message -->
+                    <div style="background: ${strength.color}15; 
+                                color: ${strength.color}; 
+                                padding: 0.75rem; 
+                                border-radius: 8px; 
+                                font-size: 0.85rem; 
+                                margin-bottom: 1rem;
+                                font-weight: 500;">
+                        ${strength.message}
+                    </div>
+
+                    <div class="topic-stats">
+                        <span>🎯 ${topic.total_explains} explain${topic.total_explains !== 1 ? 's' : ''}</span>
+                        ${topic.avg_confidence > 0 ? 
+                            `<span style="color: ${strength.color}">⭐ ${topic.avg_confidence.toFixed(1)}/5</span>` 
+                            : '<span style="color: #999">Not explained yet</span>'}
+                    </div>
+
+                    ${topic.last_explained ? 
+                        `<div style="font-size: 0.85rem; color: #999; margin-bottom: 1rem;">
+                            Last explained: ${new Date(topic.last_explained).toLocaleDateString()}
+                        </div>` 
+                        : ''}
+
+                    <div class="topic-actions">
+                        <button class="btn" onclick="startExplain('${topic.id}')" 
+                                style="background: ${strength.color}; border-color: ${strength.color};">
+                            ${topic.total_explains > 0 ? '🔄 Explain Again' : '🎯 Start Explaining'}
+                        </button>
+                        <button class="btn btn-secondary" onclick="deleteTopic('${topic.id}')">🗑️</button>
+                    </div>
+                </div>
+            `;
+        }).join('');
+    } catch (error) {
+        console.error('Error loading topics:', error);
+        document.getElementById('topicsContainer').innerHTML = '<p style="color: #c33;">Error loading topics</p>';
+    }
+}
+
+function openNewTopicModal() {
+    document.getElementById('newTopicModal').classList.add('active');
+}
+
+function closeNewTopicModal() {
+    document.getElementById('newTopicModal').classList.remove('active');
+    document.getElementById('newTopicForm').reset();
+}
+
+// New form submission with countdown redirect
+document.getElementById('newTopicForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const topicData = {
+        title: document.getElementById('topicTitle').value,
+        subject: document.getElementById('topicSubject').value || null,
+        description: document.getElementById('topicDescription').value || null
+    };
+
+    try {
+        const response = await fetch('/api/topics/create', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(topicData)
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            if (data.force_explain) {
+                // Show 3-second countdown, then force explain
+                showCountdownAndRedirect(data.topic.id);
+            } else {
+                // Fallback (shouldn't happen)
+                closeNewTopicModal();
+                loadTopics();
+            }
+        } else {
+            alert('Error creating topic');
+        }
+    } catch (error) {
+        alert('Error: ' + error.message);
+    }
+});
+
+// NEW FUNCTION: Countdown modal
+function showCountdownAndRedirect(topicId) {
+    closeNewTopicModal();
+
+    // Create fullscreen countdown overlay
+    const overlay = document.createElement('div');
+    overlay.style.cssText = `
+        position: fixed;
+        top: 0; left: 0; right: 0; bottom: 0;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+        justify-content: center;
+        z-index: 10000;
+        color: white;
+    `;
+
+    overlay.innerHTML = `
+        <div style="text-align: center;">
+            <div style="font-size: 2rem; margin-bottom: 2rem; opacity: 0.9;">
+                Topic Created! 🎯
+            </div>
+            <div style="font-size: 8rem; font-weight: 900; margin-bottom: 1rem;" id="countdownNumber">3</div>
+            <div style="font-size: 1.5rem; opacity: 0.95;">
+                Starting Explain Mode...
+            </div>
+            <div style="margin-top: 2rem; font-size: 1.1rem; opacity: 0.85; max-width: 500px; line-height: 1.6;">
+                Remember: The struggle is the point. Don't peek at notes. Just explain what you remember.
+            </div>
+        </div>
+    `;
+
+    document.body.appendChild(overlay);
+
+    // Countdown 3, 2, 1
+    let count = 3;
+    const interval = setInterval(() => {
+        count--;
+        if (count > 0) {
+            document.getElementById('countdownNumber').textContent = count;
+        } else {
+            clearInterval(interval);
+            window.location.href = `/explain/${topicId}`;
+        }
+    }, 1000);
+}
+
+function startExplain(topicId) {
+    window.location.href = `/explain/${topicId}`;
+}
+
+async function deleteTopic(topicId) {
+    if (!confirm('Delete this topic? This will also delete all explain sessions.')) return;
+
+    try {
+        const response = await fetch(`/api/topics/${topicId}`, {
+            method: 'DELETE'
+        });
+
+        if (response.ok) {
+            loadTopics();
+        } else {
+            alert('Error deleting topic');
+        }
+    } catch (error) {
+        alert('Error: ' + error.message);
+    }
+}
+
+// Load topics on page load and check for prefilled topic
+window.addEventListener('DOMContentLoaded', function() {
+    const prefilledTopic = localStorage.getItem('prefill_topic');
+    if (prefilledTopic) {
+        document.getElementById('topicTitle').value = prefilledTopic;
+        localStorage.removeItem('prefill_topic');
+        openNewTopicModal();
+    }
+    loadTopics();
+});
+
+// Close modal when clicking outside
+document.getElementById('newTopicModal').addEventListener('click', function(e) {
+    if (e.target === this) {
+        closeNewTopicModal();
+    }
+});
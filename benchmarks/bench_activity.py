@@ -0,0 +1,119 @@
+"""
+Activity bitmap: streaks and the yearly heatmap.
+
+Seeds one student with --years of history (active on a random share of
+days, a few explains each active day) and stores the same days as the
+user_analytics bitmap, then compares:
+
+    bitmap   AnalyticsService.activity_heatmap - one row, bit operations
+    scan     distinct explain days from explain_sessions, walked in Python
+
+and checks both agree. Finally records activity from several threads at
+once and checks that no session count is lost.
+
+    python -m benchmarks.bench_activity --years 3
+"""
+import argparse
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+
+from benchmarks.common import SessionLocal, seed_user, setup_database, summarize, timed
+
+from sqlalchemy import func, insert, select
+
+from app.db.bitmap import day_number, from_days
+from app.db.types import new_id
+from app.models import ExplainSession, UserAnalytics
+from app.services.analytics_service import AnalyticsService
+
+
+def seed(db, user_id: str, today: date, years: int, rng: random.Random) -> int:
+    days = [today - timedelta(days=d) for d in range(365 * years) if rng.random() < 0.6]
+    rows = []
+    for day in days:
+        for _ in range(rng.randint(1, 4)):
+            rows.append({"id": new_id(), "topic_id": new_id(), "user_id": user_id, "duration_seconds": 60,
+                         "confidence": 3, "created_at": datetime.combine(day, time(rng.randint(0, 23)))})
+    for start in range(0, len(rows), 5000):
+        db.execute(insert(ExplainSession.__table__), rows[start:start + 5000])
+    origin, bitmap = from_days(day_number(day) for day in days)
+    db.add(UserAnalytics(id=new_id(), user_id=user_id, total_sessions=0, activity=bitmap, activity_origin=origin))
+    db.commit()
+    return len(rows)
+
+
+def scan(db, user_id: str, start: date, end: date) -> dict:
+    """Heatmap and streaks from the event table"""
+    day = func.date(ExplainSession.created_at)
+    active = {date.fromisoformat(d) if isinstance(d, str) else d
+              for (d,) in db.execute(select(day).where(ExplainSession.user_id == user_id).distinct())}
+    longest = run = 0
+    previous = None
+    for d in sorted(active):
+        run = run + 1 if previous is not None and d - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = d
+    today = datetime.utcnow().date()
+    cursor = today if today in active else today - timedelta(days=1)
+    current = 0
+    while cursor in active:
+        current += 1
+        cursor -= timedelta(days=1)
+    length = (end - start).days + 1
+    return {
+        "days": [int(start + timedelta(days=i) in active) for i in range(length)],
+        "current_streak": current,
+        "longest_streak": longest,
+    }
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_database()
+    db = SessionLocal()
+    user_id = seed_user(db).id
+    today = datetime.utcnow().date()
+    sessions = seed(db, user_id, today, args.years, random.Random(7))
+    bitmap = db.query(UserAnalytics.activity).filter(UserAnalytics.user_id == user_id).scalar()
+    print(f"{args.years} years, {sessions:,} sessions; bitmap {len(bitmap)} bytes\n")
+
+    start, end = today - timedelta(days=364), today
+    samples = {"bitmap": [], "scan": []}
+    for _ in range(args.repeat):
+        from_bitmap, elapsed = timed(AnalyticsService.activity_heatmap, db, user_id, start, end)
+        samples["bitmap"].append(elapsed)
+        from_scan, elapsed = timed(scan, db, user_id, start, end)
+        samples["scan"].append(elapsed)
+    print(f"{'':8} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, values in samples.items():
+        summary = summarize(values)
+        print(f"{name:8} {summary['p50_ms']:9.2f} {summary['p95_ms']:9.2f}")
+    same = all(from_bitmap[key] == from_scan[key] for key in ("days", "current_streak", "longest_streak"))
+    print(f"\nbitmap and scan agree: {same} (streak {from_bitmap['current_streak']}, "
+          f"longest {from_bitmap['longest_streak']}, {from_bitmap['active_days']} active days)")
+
+    def record(_):
+        session = SessionLocal()
+        try:
+            AnalyticsService.record_activity(session, user_id)
+            session.commit()
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(record, range(args.writes)))
+    db.rollback()  # end the read snapshot taken before the writes
+    total = db.query(UserAnalytics.total_sessions).filter(UserAnalytics.user_id == user_id).scalar()
+    print(f"{args.writes} concurrent record_activity calls on {args.threads} threads: total_sessions {total}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main_()
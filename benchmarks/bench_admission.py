@@ -0,0 +1,152 @@
+"""
+Admission control: rate limits, load shedding, and fast-path cost.
+
+Drives the app in-process over ASGI (one event loop, as under uvicorn):
+
+    rate limits   one student hammers POST /api/topics/explain, one IP
+                  hammers the anonymous POST /api/feedback - both are
+                  cut off at their burst with 429 + Retry-After, while a
+                  second student's requests still go through
+    flood         --flood concurrent topic-list reads from different
+                  students: peak DB connections checked out, statuses,
+                  and latency of the requests that were served. With
+                  --compare it is run with admission off first - slow:
+                  worker threads holding a connection wait on threads
+                  waiting for one, until the 30 s pool timeout
+    fast path     per-request cost of the limiter (cookie -> user id ->
+                  token bucket) for a signed-in student
+
+    python -m benchmarks.bench_admission --flood 400 [--compare]
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from benchmarks.common import SessionLocal, auth_cookies, seed_topic, seed_user, setup_database, summarize
+
+import httpx
+
+from app.core.admission import Admission, user_id_from_cookie
+from app.core.config import settings
+from app.db.session import engine, read_engine
+from app.db.writer import use_write_queue, write_queue
+from main import app
+
+FEEDBACK = {"name": "Bench", "email": "bench@example.com", "type": "other", "message": "Benchmark feedback message"}
+
+
+def cookie_header(user_id: str) -> dict:
+    return {"cookie": "; ".join(f'{k}="{v}"' for k, v in auth_cookies(user_id).items())}
+
+
+def reset_limits():
+    """Fresh buckets and slots, built from the current settings"""
+    app.middleware_stack = None  # rebuilt on the next request, with a new AdmissionMiddleware
+
+
+async def rate_limits(client, students, topic_ids):
+    reset_limits()
+    hammer, other = students[0], students[1]
+    explain = {"topic_id": topic_ids[0], "duration_seconds": 60, "confidence": 3}
+    statuses = Counter()
+    retry_after = set()
+    for _ in range(settings.RATE_LIMIT_WRITE_BURST + 10):
+        r = await client.post("/api/topics/explain", json=explain, headers=cookie_header(hammer))
+        statuses[r.status_code] += 1
+        if r.status_code == 429:
+            retry_after.add(r.headers["retry-after"])
+    r = await client.post("/api/topics/explain", json={**explain, "topic_id": topic_ids[1]}, headers=cookie_header(other))
+    print(f"explain x{sum(statuses.values())} from one student: {dict(statuses)}, Retry-After {sorted(retry_after)}; "
+          f"another student: {r.status_code}")
+
+    statuses = Counter()
+    for _ in range(settings.RATE_LIMIT_ANONYMOUS_BURST + 10):
+        r = await client.post("/api/feedback", json=FEEDBACK)
+        statuses[r.status_code] += 1
+    print(f"feedback x{sum(statuses.values())} from one IP: {dict(statuses)}")
+
+
+async def flood(client, students, enabled: bool):
+    settings.ADMISSION_ENABLED = enabled
+    reset_limits()
+    peak = {"primary": 0, "read": 0}
+    done = asyncio.Event()
+
+    async def sample():
+        while not done.is_set():
+            peak["primary"] = max(peak["primary"], engine.pool.checkedout())
+            peak["read"] = max(peak["read"], read_engine.pool.checkedout())
+            await asyncio.sleep(0.001)
+
+    async def read(user_id):
+        start = time.perf_counter()
+        r = await client.get("/api/topics/list", headers=cookie_header(user_id))
+        return r.status_code, time.perf_counter() - start
+
+    sampler = asyncio.create_task(sample())
+    start = time.perf_counter()
+    results = await asyncio.gather(*(read(user_id) for user_id in students))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await sampler
+
+    statuses = Counter(status for status, _ in results)
+    served = summarize([t for status, t in results if status == 200])
+    print(f"admission {'on ' if enabled else 'off'}: {dict(statuses)} in {elapsed:.2f} s; "
+          f"peak connections primary {peak['primary']}, read {peak['read']}; "
+          f"served p50 {served['p50_ms']:.0f} ms, p95 {served['p95_ms']:.0f} ms")
+
+
+def fast_path(user_id: str, repeat: int) -> float:
+    admission = Admission()
+    scope = {"headers": [(k.encode(), v.encode()) for k, v in cookie_header(user_id).items()]}
+    limiter = admission.limiters["read"]
+    limiter.rate = 1e9  # never empty: time the admitted path
+    start = time.perf_counter()
+    for _ in range(repeat):
+        limiter.acquire(user_id_from_cookie(scope), time.monotonic())
+    return (time.perf_counter() - start) / repeat
+
+
+async def main(args):
+    transport = httpx.ASGITransport(app=app, client=("203.0.113.7", 5000), raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await rate_limits(client, args.students, args.topic_ids)
+        print()
+        if args.compare:
+            await flood(client, args.students, enabled=False)
+        await flood(client, args.students, enabled=True)
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flood", type=int, default=400, help="concurrent requests, one student each")
+    parser.add_argument("--queue-timeout-ms", type=float, default=settings.ADMISSION_QUEUE_TIMEOUT_MS)
+    parser.add_argument("--compare", action="store_true", help="flood with admission off first (minutes)")
+    args = parser.parse_args()
+
+    settings.ADMISSION_ENABLED = True
+    settings.ADMISSION_QUEUE_TIMEOUT_MS = args.queue_timeout_ms
+    settings.SLOW_QUERY_MS = float("inf")
+    setup_database()
+    db = SessionLocal()
+    args.students = [seed_user(db, i).id for i in range(args.flood)]
+    args.topic_ids = [seed_topic(db, user_id).id for user_id in args.students[:2]]
+    db.close()
+    print(f"max concurrent {settings.ADMISSION_MAX_CONCURRENT}, queue {settings.ADMISSION_MAX_QUEUE}, "
+          f"queue timeout {settings.ADMISSION_QUEUE_TIMEOUT_MS:.0f} ms\n")
+
+    if use_write_queue():
+        write_queue.start()
+    try:
+        asyncio.run(main(args))
+    finally:
+        write_queue.stop()
+
+    per_request = fast_path(args.students[0], 20000)
+    print(f"\nfast path: {per_request * 1e6:.1f} us per request (cookie parse, token verify, bucket)")
+
+
+if __name__ == "__main__":
+    main_()
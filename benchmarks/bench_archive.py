@@ -0,0 +1,215 @@
+"""
+Hot/cold tiering of explain sessions: the archive job and what it saves.
+
+Seeds a synthetic dataset, backfills the daily rollups (the job only
+archives what they have folded in), then archives every session older
+than --after-days:
+
+    batches    transaction time per batch - how long the job holds the
+               write lock at a time - while another thread keeps saving
+               explains; their commit latency, against the same writes
+               with the job idle
+    reads      the busiest student's topic detail, sessions, recall,
+               stats and search responses, before and after: they must
+               not change
+    hot table  rows left in explain_sessions, and the per-request reads
+               over it timed before and after
+
+    python -m benchmarks.bench_archive --users 2000 --sessions 200000 --after-days 90
+"""
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import SessionLocal, auth_cookies, setup_database, summarize, timed
+from benchmarks.dataset import generate
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.db.topic_crud import ExplainSessionCRUD
+from app.db.writer import use_write_queue, write_queue
+from app.models import ArchivedExplainSession, ExplainSession, Topic
+from app.services.analytics_service import AnalyticsService
+from app.services.archive_service import ArchiveService
+from app.services.recall_service import RecallService
+from app.services.rollup_service import RollupService
+from main import app
+
+
+def busiest(db) -> tuple:
+    """The student with the most sessions, and their busiest topic"""
+    user_id = db.query(ExplainSession.user_id).group_by(ExplainSession.user_id).order_by(
+        func.count().desc()).limit(1).scalar()
+    topic_id = db.query(ExplainSession.topic_id).filter(ExplainSession.user_id == user_id).group_by(
+        ExplainSession.topic_id).order_by(func.count().desc()).limit(1).scalar()
+    return user_id, topic_id
+
+
+def responses(client, topic_id: str) -> dict:
+    paths = (f"/api/topics/{topic_id}", f"/api/topics/{topic_id}/sessions", "/api/topics/recall",
+             "/api/analytics/stats", "/api/search?q=entropy&per_page=50")
+    out = {}
+    for path in paths:
+        r = client.get(path)
+        r.raise_for_status()
+        out[path] = r.json()
+    return out
+
+
+def first_difference(before, after, path: str = ""):
+    """Where two JSON values first differ (ignoring the clock), or None"""
+    if isinstance(before, dict) and isinstance(after, dict):
+        for key in (before.keys() | after.keys()) - {"as_of"}:
+            found = first_difference(before.get(key), after.get(key), f"{path}.{key}")
+            if found:
+                return found
+        return None
+    if isinstance(before, list) and isinstance(after, list):
+        if len(before) != len(after):
+            return f"{path}: {len(before)} items, then {len(after)}"
+        for i, (b, a) in enumerate(zip(before, after)):
+            found = first_difference(b, a, f"{path}[{i}]")
+            if found:
+                return found
+        return None
+    if isinstance(before, float) and isinstance(after, float) and abs(before - after) <= 1e-4:
+        return None  # the recall fit adds its sums in another order: the last rounded digit may move
+    return None if before == after else f"{path}: {json.dumps(before)} -> {json.dumps(after)}"
+
+
+def write(job):
+    """Commit a write job the way the app does: through the writer on SQLite"""
+    if use_write_queue():
+        return write_queue.submit(job).result()
+    db = SessionLocal()
+    try:
+        result = job(db)
+        db.commit()
+        return result
+    finally:
+        db.close()
+
+
+def hot_reads(user_id: str, topic_id: str, repeat: int) -> dict:
+    db = SessionLocal()
+    try:
+        reads = {
+            "recall": lambda: RecallService.estimate(db, user_id),
+            "stats": lambda: AnalyticsService.get_user_stats(db, user_id),
+            "sessions": lambda: ExplainSessionCRUD.get_topic_sessions(db, user_id, topic_id, limit=5),
+        }
+        out = {}
+        for name, read in reads.items():
+            samples = []
+            for _ in range(repeat):
+                _, elapsed = timed(read)
+                samples.append(elapsed)
+            out[name] = summarize(samples)["p50_ms"]
+        return out
+    finally:
+        db.close()
+
+
+class Writer(threading.Thread):
+    """Saves an explain every --write-every ms for another student, timing each commit"""
+
+    def __init__(self, user_id: str, topic_id: str, every: float):
+        super().__init__(daemon=True)
+        self.user_id, self.topic_id, self.every = user_id, topic_id, every
+        self.samples = []
+        self.stop = threading.Event()
+
+    def run(self):
+        session = {"topic_id": self.topic_id, "user_id": self.user_id, "duration_seconds": 60, "confidence": 3}
+        while not self.stop.is_set():
+            start = time.perf_counter()
+            write(lambda db: ExplainSessionCRUD.create(db, session).id)
+            self.samples.append(time.perf_counter() - start)
+            self.stop.wait(self.every / 1000)
+
+
+def writes_for(seconds: float, user_id: str, topic_id: str, every: float, work=None) -> tuple:
+    writer = Writer(user_id, topic_id, every)
+    writer.start()
+    result = work() if work else time.sleep(seconds)
+    writer.stop.set()
+    writer.join()
+    return {**summarize(writer.samples), "max_ms": max(writer.samples, default=0) * 1000}, result
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=200000)
+    parser.add_argument("--after-days", type=int, default=90, help="archive sessions older than this")
+    parser.add_argument("--batch", type=int, default=settings.ARCHIVE_BATCH, help="sessions per transaction")
+    parser.add_argument("--write-every", type=float, default=5.0, help="ms between the other thread's explains")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    settings.SLOW_QUERY_MS = float("inf")
+    settings.ARCHIVE_AFTER_DAYS = args.after_days
+    settings.ARCHIVE_BATCH = args.batch
+    setup_database()
+    db = SessionLocal()
+    now = datetime.utcnow()
+    counts = generate(db, args.users, args.sessions, seed=5, now=now)
+    RollupService.advance_all(now + timedelta(seconds=settings.ROLLUP_SETTLE_SECONDS + 1))
+    user_id, topic_id = busiest(db)
+    other_topic = db.query(Topic.id, Topic.user_id).filter(Topic.user_id != user_id).first()
+    hot_before = db.query(func.count()).select_from(ExplainSession).scalar()
+    db.close()
+    print(f"{counts.get('explain_sessions', 0):,} sessions, {counts.get('users', 0):,} users; archiving "
+          f"sessions older than {args.after_days} days, {settings.ARCHIVE_BATCH} per batch\n")
+
+    client = TestClient(app, cookies=auth_cookies(user_id))
+    before = responses(client, topic_id)
+    reads_before = hot_reads(user_id, topic_id, args.repeat)
+
+    def archive() -> list:
+        batches = []
+        while True:
+            start = time.perf_counter()
+            moved = write(lambda db: ArchiveService.archive_batch(db, now))
+            batches.append((moved, time.perf_counter() - start))
+            if moved < settings.ARCHIVE_BATCH:
+                return batches
+            time.sleep(settings.ARCHIVE_BATCH_PAUSE_MS / 1000)
+
+    if use_write_queue():
+        write_queue.start()
+    try:
+        idle, _ = writes_for(2.0, other_topic.user_id, other_topic.id, args.write_every)
+        busy, batches = writes_for(0, other_topic.user_id, other_topic.id, args.write_every, archive)
+    finally:
+        write_queue.stop()
+    moved = sum(m for m, _ in batches)
+    batch = summarize([elapsed for _, elapsed in batches])
+    print(f"batches:   {moved:,} sessions in {len(batches)} batches, {sum(e for _, e in batches):.2f} s in "
+          f"transactions; per batch p50 {batch['p50_ms']:.1f} ms, p95 {batch['p95_ms']:.1f} ms, "
+          f"max {max(e for _, e in batches) * 1000:.1f} ms")
+    print(f"           concurrent explain commits: idle p50 {idle['p50_ms']:.1f} / p95 {idle['p95_ms']:.1f} ms, "
+          f"during the job p50 {busy['p50_ms']:.1f} / p95 {busy['p95_ms']:.1f} / max {busy['max_ms']:.1f} ms")
+
+    after = responses(client, topic_id)
+    for path in before:
+        difference = first_difference(before[path], after[path])
+        print(f"reads:     {path:<52} {'identical' if difference is None else 'DIFFERS ' + difference}")
+
+    db = SessionLocal()
+    hot_after = db.query(func.count()).select_from(ExplainSession).scalar()
+    archived = db.query(func.count()).select_from(ArchivedExplainSession).scalar()
+    db.close()
+    reads_after = hot_reads(user_id, topic_id, args.repeat)
+    print(f"\nhot table: {hot_before:,} rows before, {hot_after:,} after ({archived:,} archived)")
+    print(f"{'p50 ms':>18} {'before':>8} {'after':>8}")
+    for name in reads_before:
+        print(f"{name:>18} {reads_before[name]:>8.2f} {reads_after[name]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,131 @@
+"""
+Concurrent-writer benchmark for the SQLite profiles.
+
+Many clients submit explain sessions at once (each submission updates
+topic stats, analytics and the review schedule). Each mode runs in its
+own process so the settings are read fresh, against a fresh database:
+
+    rollback   rollback journal, no busy_timeout, no writer queue (the old setup)
+    wal        WAL + pragmas, writes on the request threads
+    writer     WAL + pragmas + single-writer group commit (the default)
+
+    python -m benchmarks.bench_concurrent_writers --concurrency 50 --duration 10
+
+Reports accepted writes per second, latency percentiles and the number
+of failed submissions ("database is locked" shows up as 500s).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+MODES = {
+    "rollback": {"SQLITE_WAL": "false", "SQLITE_SINGLE_WRITER": "false", "SQLITE_BUSY_TIMEOUT_MS": "0"},
+    "wal": {"SQLITE_WAL": "true", "SQLITE_SINGLE_WRITER": "false"},
+    "writer": {"SQLITE_WAL": "true", "SQLITE_SINGLE_WRITER": "true"},
+}
+
+
+async def hammer(base_url: str, users: list, concurrency: int, duration: float):
+    import httpx
+
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int):
+        nonlocal errors
+        user = users[index % len(users)]
+        async with httpx.AsyncClient(base_url=base_url, cookies=user["cookies"], timeout=60) as client:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/api/topics/explain", json={
+                        "topic_id": random.choice(user["topic_ids"]),
+                        "duration_seconds": random.randint(60, 600),
+                        "struggles": "Lost track of the sign convention",
+                        "forgot": None,
+                        "unclear": None,
+                        "confidence": random.randint(1, 5),
+                    })
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies, errors
+
+
+def avg_batch(base_url: str, token: str):
+    """Mean jobs per writer commit, from the server's db_write_batch_size histogram"""
+    import httpx
+
+    text = httpx.get(f"{base_url}/metrics", headers={"Authorization": f"Bearer {token}"}).text
+    values = dict(line.rsplit(" ", 1) for line in text.splitlines() if line.startswith("db_write_batch_size_"))
+    count = float(values.get("db_write_batch_size_count", 0))
+    return round(float(values["db_write_batch_size_sum"]) / count, 2) if count else None
+
+
+def run_mode(args) -> dict:
+    """Child process: seed, serve (in its own process), hammer, print one JSON line"""
+    from benchmarks.common import summarize
+    from benchmarks.loadtest import seed, start_server, stop_server
+
+    users = seed(args.users, 3)
+    token = os.urandom(8).hex()
+    base_url, server = start_server({"METRICS_TOKEN": token})
+    try:
+        start = time.perf_counter()
+        latencies, errors = asyncio.run(hammer(base_url, users, args.concurrency, args.duration))
+        elapsed = time.perf_counter() - start
+        batch = avg_batch(base_url, token)
+    finally:
+        stop_server(server)
+
+    result = summarize(latencies)
+    result.update({
+        "writes_per_sec": round(len(latencies) / elapsed, 1),
+        "errors": errors,
+        "avg_batch": batch,
+    })
+    return result
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args)))
+        return
+
+    print(f"{'mode':10} {'writes/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'batch':>6}")
+    for mode in args.modes.split(","):
+        env = dict(os.environ, **MODES[mode])
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_concurrent_writers", "--child", mode,
+             "--users", str(args.users), "--concurrency", str(args.concurrency), "--duration", str(args.duration)],
+            env=env, capture_output=True, text=True,
+        )
+        if output.returncode != 0:
+            print(f"{mode:10} failed:\n{output.stderr[-2000:]}")
+            continue
+        r = json.loads(output.stdout.strip().splitlines()[-1])
+        print(f"{mode:10} {r['writes_per_sec']:9.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:8.1f} "
+              f"{r['errors']:7} {r['avg_batch'] or '-':>6}")
+
+
+if __name__ == "__main__":
+    main_()
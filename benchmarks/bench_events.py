@@ -0,0 +1,239 @@
+"""
+Server-sent change events: idle cost, fan-out latency, slow clients.
+
+Serves main:app with uvicorn in a background thread and connects plain
+sockets to GET /api/events:
+
+    idle       --streams open streams (made-up users: the endpoint reads
+               only the cookie) sit idle for --idle seconds with a
+               keep-alive every --heartbeat seconds: memory per stream,
+               server CPU, and SQL statements run meanwhile (should be 0)
+    fan-out    one student with --tabs tabs open saves an explain; time
+               from the POST until each tab has "session.saved". Same for
+               new feedback reaching --admins feedback-page streams
+    polling    what the same clients cost polling instead: statements of
+               one feedback-list poll, times the streams, every 30 s
+    slow       a client that stops reading while events keep coming:
+               the server drops what it can't buffer and the client gets
+               one "resync" when it reads again
+
+    python -m benchmarks.bench_events --streams 2000 --tabs 20 --admins 50
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+
+from benchmarks.common import SessionLocal, auth_cookies, seed_topic, seed_user, setup_database, summarize
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import DB_STATEMENTS, EVENTS_DROPPED
+from app.db.events import broker, frame, user_channel
+
+FEEDBACK = {"name": "Bench", "email": "bench@example.com", "type": "other", "message": "Benchmark feedback message"}
+
+
+def start_server() -> tuple:
+    """Serve main:app with uvicorn in a background thread; returns (port, server, native thread id)"""
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    config = uvicorn.Config("main:app", host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+    server = uvicorn.Server(config)
+    ids = {}
+
+    def run():
+        ids["native"] = threading.get_native_id()
+        server.run()
+
+    threading.Thread(target=run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return port, server, ids["native"]
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def thread_cpu_seconds(native_id: int) -> float:
+    with open(f"/proc/self/task/{native_id}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / 100  # utime + stime, in clock ticks
+
+
+class Stream:
+    """One GET /api/events over a raw socket"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, port: int, user_id: str, query: str = "", rcvbuf: int = 0) -> "Stream":
+        sock = socket.socket()
+        if rcvbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", port))
+        reader, writer = await asyncio.open_connection(sock=sock)
+        cookie = "; ".join(f'{k}="{v}"' for k, v in auth_cookies(user_id).items())
+        writer.write(f"GET /api/events{query} HTTP/1.1\r\nHost: bench\r\nCookie: {cookie}\r\n\r\n".encode())
+        await writer.drain()
+        status = await reader.readline()
+        if b" 200 " not in status:
+            raise RuntimeError(f"stream refused: {status!r}")
+        while await reader.readline() not in (b"\r\n", b""):
+            pass
+        stream = cls(reader, writer)
+        await stream.wait_for(b"retry:")
+        return stream
+
+    async def wait_for(self, marker: bytes) -> bytes:
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("stream closed")
+            if marker in line:
+                return line
+
+    def close(self):
+        self.writer.close()
+
+
+async def idle(port: int, native_id: int, args) -> list:
+    rss, statements = rss_bytes(), DB_STATEMENTS.value()
+    streams = []
+    for start in range(0, args.streams, 500):
+        streams += await asyncio.gather(*(Stream.open(port, f"idle-{i}")
+                                          for i in range(start, min(args.streams, start + 500))))
+    opened = rss_bytes() - rss
+
+    cpu = thread_cpu_seconds(native_id)
+    await asyncio.sleep(args.idle)
+    cpu = thread_cpu_seconds(native_id) - cpu
+    print(f"idle:    {len(broker)} streams open, {opened / len(streams) / 1024:.1f} KiB each (server and client "
+          f"socket); {args.idle:.0f} s idle with a keep-alive every {args.heartbeat:g} s: server CPU "
+          f"{cpu / args.idle:.1%} of a core, {int(DB_STATEMENTS.value() - statements)} SQL statements "
+          f"(background jobs included)")
+    return streams
+
+
+async def fan_out(port: int, args, student: str, topic_id: str):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", cookies=auth_cookies(student)) as client:
+        tabs = [await Stream.open(port, student) for _ in range(args.tabs)]
+        admins = [await Stream.open(port, f"admin-{i}", "?feedback=1") for i in range(args.admins)]
+
+        async def delivered(streams, marker, post):
+            start = time.perf_counter()
+            arrivals = [asyncio.create_task(s.wait_for(marker)) for s in streams]
+            (await post()).raise_for_status()
+            done = []
+            for arrival in arrivals:
+                await arrival
+                done.append(time.perf_counter() - start)
+            return done
+
+        saves, feedback = [], []
+        explain = {"topic_id": topic_id, "duration_seconds": 60, "confidence": 4}
+        for _ in range(args.rounds):
+            saves += await delivered(tabs, b"session.saved", lambda: client.post("/api/topics/explain", json=explain))
+            feedback += await delivered(admins, b"feedback.created", lambda: client.post("/api/feedback", json=FEEDBACK))
+
+        for label, samples, count in (("explain", saves, args.tabs), ("feedback", feedback, args.admins)):
+            summary = summarize(samples)
+            print(f"fan-out: {label:<8} to {count:>4} streams, POST to last delivery p50 {summary['p50_ms']:.1f} ms, "
+                  f"p95 {summary['p95_ms']:.1f} ms ({args.rounds} rounds)")
+
+        before = DB_STATEMENTS.value()
+        (await client.get("/api/feedback/admin/list")).raise_for_status()
+        per_poll = DB_STATEMENTS.value() - before
+        for s in tabs + admins:
+            s.close()
+    return per_poll
+
+
+async def slow_client(port: int, args):
+    stream = await Stream.open(port, "slow", rcvbuf=4096)
+    channel = user_channel("slow")
+    message = frame("topic.rescheduled", {"topic_id": "x" * 36, "next_review": "2026-01-01"})
+    dropped = EVENTS_DROPPED.value()
+
+    async def read_all() -> tuple:
+        delivered, resyncs = 0, 0
+        while True:
+            try:
+                line = await asyncio.wait_for(stream.reader.readline(), 0.5)
+            except asyncio.TimeoutError:
+                return delivered, resyncs
+            delivered += line.startswith(b"event: topic.rescheduled")
+            resyncs += line.startswith(b"event: resync")
+
+    # The client stops reading; events trickle in until the socket buffers
+    # and then the stream's queue are full, and a few more after that
+    sent, start = 0, time.perf_counter()
+    while EVENTS_DROPPED.value() - dropped < 100 and sent < 1_000_000:
+        for _ in range(20):
+            broker.publish(channel, message)
+        sent += 20
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    delivered, resyncs = await read_all()
+    # Caught up: events flow normally again
+    for _ in range(5):
+        broker.publish(channel, message)
+    after, _ = await read_all()
+    stream.close()
+    print(f"slow:    {sent:,} events in {elapsed:.1f} s to a client that stopped reading: {delivered:,} delivered, "
+          f"{int(EVENTS_DROPPED.value() - dropped):,} dropped (buffer {settings.SSE_CLIENT_BUFFER}), {resyncs} resyncs (one per gap); "
+          f"then {after} of 5 delivered")
+
+
+async def main(port: int, native_id: int, args, student: str, topic_id: str):
+    streams = await idle(port, native_id, args)
+    per_poll = await fan_out(port, args, student, topic_id)
+    print(f"polling: one feedback-list poll runs {per_poll:g} statements; {len(streams)} clients polling every "
+          f"30 s would run {per_poll * len(streams) * 2:,.0f} a minute, the streams ran 0 while idle")
+    for s in streams:
+        s.close()
+    await slow_client(port, args)
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=2000, help="idle streams")
+    parser.add_argument("--idle", type=float, default=10.0, help="seconds to sit idle")
+    parser.add_argument("--heartbeat", type=float, default=1.0, help="keep-alive interval, seconds")
+    parser.add_argument("--tabs", type=int, default=20)
+    parser.add_argument("--admins", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    settings.SLOW_QUERY_MS = float("inf")
+    settings.SSE_HEARTBEAT_SECONDS = args.heartbeat
+    settings.SSE_MAX_CLIENTS = max(settings.SSE_MAX_CLIENTS, args.streams + args.tabs + args.admins + 10)
+    setup_database()
+    db = SessionLocal()
+    student = seed_user(db).id
+    topic_id = seed_topic(db, student).id
+    db.close()
+
+    port, server, native_id = start_server()
+    try:
+        asyncio.run(main(port, native_id, args, student, topic_id))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,53 @@
+"""
+Commits, statements and latency per /api/topics/explain submission.
+
+Reads the X-DB-* accounting headers (SQL_DEBUG_HEADERS) for each
+submission and times it end to end.
+
+    python -m benchmarks.bench_explain_commits --requests 500
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.common import SessionLocal, auth_cookies, seed_topic, seed_user, setup_database, summarize
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+import main
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--topics", type=int, default=20, help="submissions rotate across this many topics")
+    args = parser.parse_args()
+
+    settings.SQL_DEBUG_HEADERS = True
+    setup_database()
+    db = SessionLocal()
+    user_id = seed_user(db).id
+    topic_ids = [seed_topic(db, user_id, i).id for i in range(args.topics)]
+    db.close()
+    cookies = auth_cookies(user_id)
+
+    latencies = []
+    counters = {"commits": [], "statements": [], "round-trips": []}
+    with TestClient(main.app) as client:
+        for i in range(args.requests):
+            body = {"topic_id": topic_ids[i % len(topic_ids)], "duration_seconds": 120, "confidence": 1 + i % 5}
+            start = time.perf_counter()
+            response = client.post("/api/topics/explain", json=body, cookies=cookies)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+            for name in counters:
+                counters[name].append(int(response.headers[f"x-db-{name}"]))
+
+    for name, values in counters.items():
+        print(f"{name:12} per submission: {statistics.fmean(values):.2f}")
+    print(f"latency: {summarize(latencies)}")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,112 @@
+"""
+Primary-key storage benchmark: table/index sizes and insert throughput.
+
+Seeds a synthetic dataset (bulk inserts), then times ORM inserts of
+explain sessions into the populated table, flushing and committing in
+small batches the way the app does. Finally reports the on-disk size of
+every table and index (dbstat on SQLite, pg_relation_size on Postgres).
+
+    python -m benchmarks.bench_id_storage --users 2000 --sessions 200000
+
+Run it on two commits to compare id formats.
+"""
+import argparse
+import random
+import time
+import uuid
+
+from benchmarks.common import SessionLocal, seed_topic, seed_user, setup_database
+from benchmarks.dataset import generate
+
+from sqlalchemy import text
+
+from app.db.session import engine
+from app.models import ExplainSession
+
+try:
+    from app.db.types import new_id
+except ImportError:  # string-id schema
+    def new_id():
+        return str(uuid.uuid4())
+
+
+def relation_sizes(conn) -> dict:
+    """Bytes per table/index"""
+    if conn.dialect.name == "postgresql":
+        rows = conn.execute(text(
+            "SELECT c.relname, pg_relation_size(c.oid) FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'i')"))
+    else:
+        rows = conn.execute(text("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+    return {name: int(size) for name, size in rows}
+
+
+def index_names(conn) -> set:
+    if conn.dialect.name == "postgresql":
+        rows = conn.execute(text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()"))
+    else:
+        rows = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))
+    return {name for (name,) in rows}
+
+
+def orm_inserts(count: int, batch: int) -> float:
+    """Rows per second for ORM inserts committed every `batch` rows"""
+    db = SessionLocal()
+    user_id = seed_user(db, 999999).id
+    topic_ids = [seed_topic(db, user_id, t).id for t in range(20)]
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for i in range(count):
+        db.add(ExplainSession(
+            id=new_id(),
+            topic_id=rng.choice(topic_ids),
+            user_id=user_id,
+            duration_seconds=rng.randint(60, 600),
+            struggles="benchmark",
+            confidence=rng.randint(1, 5),
+        ))
+        if (i + 1) % batch == 0:
+            db.commit()
+    db.commit()
+    elapsed = time.perf_counter() - start
+    db.close()
+    return count / elapsed
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=200000)
+    parser.add_argument("--inserts", type=int, default=20000, help="ORM inserts after seeding")
+    parser.add_argument("--batch", type=int, default=20, help="ORM inserts per commit")
+    args = parser.parse_args()
+
+    setup_database()
+    db = SessionLocal()
+    start = time.perf_counter()
+    counts = generate(db, args.users, args.sessions, seed=7)
+    bulk_elapsed = time.perf_counter() - start
+    db.close()
+    total_rows = sum(counts.values())
+    print(f"bulk seed   {total_rows} rows in {bulk_elapsed:.1f}s  ({total_rows / bulk_elapsed:,.0f} rows/s)")
+    print(f"orm insert  {orm_inserts(args.inserts, args.batch):,.0f} rows/s "
+          f"({args.inserts} explain sessions, commit every {args.batch})")
+
+    with engine.connect() as conn:
+        sizes = relation_sizes(conn)
+        indexes = index_names(conn) | {name for name in sizes if name.startswith("sqlite_autoindex")}
+
+    print(f"\n{'relation':42} {'kind':6} {'KiB':>10}")
+    for name, size in sorted(sizes.items(), key=lambda item: -item[1]):
+        if name.startswith(("sqlite_schema", "sqlite_master")):
+            continue
+        print(f"{name:42} {'index' if name in indexes else 'table':6} {size / 1024:10,.0f}")
+    index_total = sum(size for name, size in sizes.items() if name in indexes)
+    table_total = sum(size for name, size in sizes.items() if name not in indexes)
+    print(f"\n{'all tables':42} {'':6} {table_total / 1024:10,.0f}")
+    print(f"{'all indexes':42} {'':6} {index_total / 1024:10,.0f}")
+
+
+if __name__ == "__main__":
+    main_()
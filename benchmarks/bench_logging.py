@@ -0,0 +1,71 @@
+"""
+Explain throughput with logging off, queued (the default handler) and
+synchronous (a plain StreamHandler, i.e. what print() used to cost).
+
+Log lines go to a temp file so the numbers reflect real write I/O.
+
+    python -m benchmarks.bench_logging --requests 1000
+"""
+import argparse
+import logging
+import tempfile
+import time
+
+from benchmarks.common import SessionLocal, auth_cookies, seed_topic, seed_user, setup_database, summarize
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.logging_config import RequestIdFilter, TextFormatter, setup_logging
+import main
+
+MODES = ("off", "queued", "sync")
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per mode")
+    args = parser.parse_args()
+
+    settings.METRICS_ENABLED = False
+    log_file = tempfile.NamedTemporaryFile("w", suffix=".log", delete=False)
+    setup_logging(stream=log_file, level="DEBUG")
+
+    root = logging.getLogger()
+    queued_handlers = list(root.handlers)
+    sync_handler = logging.StreamHandler(log_file)
+    sync_handler.setFormatter(TextFormatter())
+    sync_handler.addFilter(RequestIdFilter())
+    handlers = {"off": queued_handlers, "queued": queued_handlers, "sync": [sync_handler]}
+
+    setup_database()
+    db = SessionLocal()
+    user_id = seed_user(db).id
+    topic_id = seed_topic(db, user_id).id
+    db.close()
+    cookies = auth_cookies(user_id)
+    body = {"topic_id": topic_id, "duration_seconds": 120, "struggles": "recursion", "confidence": 4}
+
+    samples = {mode: [] for mode in MODES}
+    with TestClient(main.app) as client:
+        for i in range(args.requests * len(MODES) + 30):
+            # Round-robin so the growing session table affects every mode equally
+            mode = MODES[i % len(MODES)]
+            root.handlers = handlers[mode]
+            root.setLevel(logging.WARNING if mode == "off" else logging.DEBUG)
+            start = time.perf_counter()
+            response = client.post("/api/topics/explain", json=body, cookies=cookies)
+            elapsed = time.perf_counter() - start
+            assert response.status_code == 200, response.text
+            if i >= 30:  # warm up
+                samples[mode].append(elapsed)
+
+    print(f"log file: {log_file.name}")
+    for mode in MODES:
+        stats = summarize(samples[mode])
+        throughput = len(samples[mode]) / sum(samples[mode])
+        print(f"{mode:7} {throughput:8.1f} req/s  {stats}")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,94 @@
+"""
+Measure what metrics collection costs per request.
+
+Two workloads, each switching metrics on/off per request:
+
+    probe    GET /health/live - no DB work, so the difference is the
+             middleware's fixed cost
+    explain  POST /api/topics/explain - the write hot path, where the
+             per-statement SQL accounting runs too; commit times vary,
+             so compare medians over enough requests
+
+Exits non-zero when the probe's median cost exceeds --max-overhead-ms or
+the explain's median grows by more than --max-overhead-pct.
+
+    python -m benchmarks.bench_metrics_overhead --requests 1000
+"""
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.common import SessionLocal, auth_cookies, seed_topic, seed_user, setup_database, summarize
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+import main
+
+
+def run(request, count: int) -> dict:
+    """
+    Requests in on/off pairs, so DB growth affects both equally, in a
+    random order within each pair: strict alternation measures a bias
+    between odd and even requests (about 0.3 ms on the explain, with
+    metrics on for both) as metrics overhead.
+    """
+    rng = random.Random(0)
+    samples = {True: [], False: []}
+    for _ in range(count // 2):
+        first = rng.random() < 0.5
+        for enabled in (first, not first):
+            settings.METRICS_ENABLED = enabled
+            start = time.perf_counter()
+            response = request()
+            samples[enabled].append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+    return samples
+
+
+def report(name: str, samples: dict) -> tuple:
+    off, on = summarize(samples[False]), summarize(samples[True])
+    delta = on["p50_ms"] - off["p50_ms"]
+    pct = (on["p50_ms"] / off["p50_ms"] - 1) * 100
+    print(f"{name:<8} off p50 {off['p50_ms']:.3f} ms, on p50 {on['p50_ms']:.3f} ms: "
+          f"{delta:+.3f} ms/request ({pct:+.2f}%)  [means {off['mean_ms']:.3f} / {on['mean_ms']:.3f} ms]")
+    return delta, pct
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="explain requests per setting")
+    parser.add_argument("--probes", type=int, default=5000, help="probe requests per setting")
+    parser.add_argument("--max-overhead-ms", type=float, default=0.1, help="probe: fixed cost per request")
+    parser.add_argument("--max-overhead-pct", type=float, default=5.0, help="explain: median slowdown")
+    args = parser.parse_args()
+
+    setup_database()
+    db = SessionLocal()
+    user_id = seed_user(db).id
+    topic_id = seed_topic(db, user_id).id
+    db.close()
+    cookies = auth_cookies(user_id)
+    body = {"topic_id": topic_id, "duration_seconds": 120, "struggles": "recursion", "confidence": 4}
+
+    with TestClient(main.app) as client:
+        probe = lambda: client.get("/health/live")  # noqa: E731
+        explain = lambda: client.post("/api/topics/explain", json=body, cookies=cookies)  # noqa: E731
+        run(probe, 500)  # warm up
+        run(explain, 50)
+        probe_ms, _ = report("probe", run(probe, args.probes * 2))
+        _, explain_pct = report("explain", run(explain, args.requests * 2))
+
+    failed = False
+    if probe_ms > args.max_overhead_ms:
+        print(f"FAIL probe overhead {probe_ms:.3f} ms > {args.max_overhead_ms} ms")
+        failed = True
+    if explain_pct > args.max_overhead_pct:
+        print(f"FAIL explain overhead {explain_pct:.2f}% > {args.max_overhead_pct}%")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,127 @@
+"""
+Page weight and render time for every HTML page.
+
+For each page, signed in as a seeded student:
+
+    html        bytes of the page itself (and gzipped, as a proxy would send it)
+    assets      bytes of the /static stylesheets and scripts it links
+    first       a first visit: page plus assets
+    repeat      navigating to it again: the page, plus any asset the
+                browser may not reuse (not fingerprinted + immutable)
+    warm ms     p50 render time in a running process (--repeat renders)
+    cold ms     first render in a fresh interpreter, compiling the templates
+    cached      the same, loading them from a Jinja bytecode cache instead
+
+    python -m benchmarks.bench_pages --repeat 200
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import SessionLocal, auth_cookies, seed_topic, seed_user, setup_database, summarize
+
+PAGES = ("/", "/dashboard", "/topics", "/analytics", "/explain/{topic_id}", "/feedback", "/admin/feedback",
+         "/privacy", "/terms")
+ASSET_RE = re.compile(r'<(?:link[^>]+href|script[^>]+src)="(/static/[^"]+)"')
+
+
+def client(user_id: str):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    return TestClient(app, cookies=auth_cookies(user_id))
+
+
+def cold_renders(user_id: str, topic_id: str) -> dict:
+    """Runs in a fresh interpreter: time each page's first render"""
+    c = client(user_id)
+    c.get("/health/live")  # imports and middleware setup out of the way
+    times = {}
+    for page in PAGES:
+        path = page.format(topic_id=topic_id)
+        start = time.perf_counter()
+        c.get(path).raise_for_status()
+        times[page] = time.perf_counter() - start
+    return times
+
+
+def measure(user_id: str, topic_id: str, repeat: int) -> list:
+    c = client(user_id)
+    rows = []
+    for page in PAGES:
+        path = page.format(topic_id=topic_id)
+        r = c.get(path)
+        r.raise_for_status()
+        html = r.content
+        assets, uncached = 0, 0
+        for url in dict.fromkeys(ASSET_RE.findall(r.text)):
+            asset = c.get(url)
+            asset.raise_for_status()
+            assets += len(asset.content)
+            if "immutable" not in asset.headers.get("cache-control", ""):
+                uncached += len(asset.content)
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            c.get(path)
+            samples.append(time.perf_counter() - start)
+        rows.append({
+            "page": page,
+            "html": len(html),
+            "html_gzip": len(gzip.compress(html)),
+            "assets": assets,
+            "first": len(html) + assets,
+            "repeat": len(html) + uncached,
+            "warm_ms": summarize(samples)["p50_ms"],
+        })
+    return rows
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="renders per page for the warm time")
+    parser.add_argument("--child", nargs=2, metavar=("USER_ID", "TOPIC_ID"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(cold_renders(*args.child)))
+        return
+
+    setup_database()
+    db = SessionLocal()
+    user_id = seed_user(db).id
+    topic_id = seed_topic(db, user_id).id
+    db.close()
+
+    rows = measure(user_id, topic_id, args.repeat)
+    # Same database and secret for the children. Cold: no bytecode cache,
+    # every template compiled. Cached: a fresh cache filled by one run, read by the next.
+    env = {**os.environ, "BENCH_DATABASE_URL": os.environ["DATABASE_URL"], "LOG_LEVEL": "WARNING",
+           "TEMPLATE_CACHE_DIR": tempfile.mkdtemp(prefix="studycore-bench-jinja-")}
+    runs = []
+    for bytecode_cache in ("false", "true", "true"):
+        output = subprocess.run([sys.executable, "-m", "benchmarks.bench_pages", "--child", user_id, topic_id],
+                                env={**env, "TEMPLATE_BYTECODE_CACHE": bytecode_cache},
+                                capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    cold = [runs[0], runs[2]]
+
+    print(f"{'page':<20} {'html':>7} {'gzip':>6} {'assets':>7} {'first':>7} {'repeat':>7} {'warm ms':>8} "
+          f"{'cold ms':>8} {'cached':>7}")
+    for row in rows:
+        page = row["page"]
+        print(f"{page:<20} {row['html']:>7,} {row['html_gzip']:>6,} {row['assets']:>7,} {row['first']:>7,} "
+              f"{row['repeat']:>7,} {row['warm_ms']:>8.2f} {cold[0][page] * 1000:>8.1f} {cold[1][page] * 1000:>7.1f}")
+    total = {key: sum(row[key] for row in rows) for key in ("html", "html_gzip", "assets", "first", "repeat")}
+    print(f"{'all pages':<20} {total['html']:>7,} {total['html_gzip']:>6,} {total['assets']:>7,} {total['first']:>7,} "
+          f"{total['repeat']:>7,} {'':>8} {sum(cold[0].values()) * 1000:>8.1f} {sum(cold[1].values()) * 1000:>7.1f}")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,184 @@
+"""
+DB-scale benchmark for the CRUD and service queries behind the pages.
+
+Grows one synthetic database through several scales (users:sessions,
+cumulative) and at each scale times, for a heavy user (most topics) and
+a median user:
+
+    TopicCRUD.get_user_topics
+    ExplainSessionCRUD.get_topic_sessions   (the user's busiest topic)
+    AnalyticsService.get_user_stats
+    get_due_today                           (the endpoint function)
+
+Each query's SQL plan is captured. With --baseline, timings more than
+--tolerance slower than the baseline, or plans that start scanning a
+table they used to search, are flagged and the exit code is 1.
+
+    python -m benchmarks.bench_queries --scales 1000:50000,10000:500000 --save-baseline queries.json
+    python -m benchmarks.bench_queries --scales 1000:50000,10000:500000 --baseline queries.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from benchmarks.common import SessionLocal, setup_database
+from benchmarks.dataset import generate
+
+from sqlalchemy import event, func
+
+from app.api.due_today import get_due_today
+from app.db.query_stats import explain_statement
+from app.db.session import engine
+from app.db.topic_crud import TopicCRUD, ExplainSessionCRUD
+from app.models import User, Topic, ExplainSession
+from app.services.analytics_service import AnalyticsService
+
+
+def pick_users(db) -> dict:
+    """Heaviest user by topic count, and the median one"""
+    counts = db.query(Topic.user_id, func.count(Topic.id).label("n")).group_by(Topic.user_id).order_by(
+        func.count(Topic.id).desc()).all()
+    return {"heavy": counts[0].user_id, "median": counts[len(counts) // 2].user_id}
+
+
+def busiest_topic(db, user_id: str) -> str:
+    return db.query(ExplainSession.topic_id).filter(ExplainSession.user_id == user_id).group_by(
+        ExplainSession.topic_id).order_by(func.count(ExplainSession.id).desc()).limit(1).scalar() or \
+        db.query(Topic.id).filter(Topic.user_id == user_id).limit(1).scalar()
+
+
+def query_cases(db, user_id: str) -> dict:
+    user = db.get(User, user_id)
+    topic_id = busiest_topic(db, user_id)
+    return {
+        "get_user_topics": lambda: TopicCRUD.get_user_topics(db, user_id),
+        "get_topic_sessions": lambda: ExplainSessionCRUD.get_topic_sessions(db, user_id, topic_id, reflections=True),
+        "get_user_stats": lambda: AnalyticsService.get_user_stats(db, user_id),
+        "get_due_today": lambda: asyncio.run(get_due_today(current_user=user, db=db)),
+    }
+
+
+class PlanCapture:
+    """Records every statement (with parameters) executed while active"""
+
+    def __init__(self):
+        self.statements = []
+        self.active = False
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active and not executemany:
+            self.statements.append((statement, parameters))
+
+    def plans(self) -> list:
+        seen, plans = set(), []
+        with engine.connect() as conn:
+            for statement, parameters in self.statements:
+                if statement in seen or not statement.lstrip().upper().startswith("SELECT"):
+                    continue
+                seen.add(statement)
+                plans.append({"sql": " ".join(statement.split())[:200],
+                              "plan": explain_statement(conn, statement, parameters)})
+        return plans
+
+
+def run_case(fn, capture: PlanCapture, repeats: int) -> dict:
+    capture.statements = []
+    capture.active = True
+    fn()
+    capture.active = False
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "statements": len(capture.statements),
+        "plans": capture.plans(),
+    }
+
+
+def scanned_tables(plans: list) -> set:
+    """Tables read by full scan (SQLite 'SCAN x' / Postgres 'Seq Scan on x')"""
+    tables = set()
+    for entry in plans:
+        for line in entry["plan"]:
+            words = line.replace("Seq Scan on", "SCAN").split()
+            if "SCAN" in words:
+                index = words.index("SCAN")
+                if index + 1 < len(words):
+                    tables.add(words[index + 1])
+    return tables
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    problems = []
+    for key, current in results.items():
+        old = baseline.get("results", {}).get(key)
+        if not old:
+            continue
+        if current["median_ms"] > old["median_ms"] * (1 + tolerance) and current["median_ms"] - old["median_ms"] > 1:
+            problems.append(f"{key}: {old['median_ms']} ms -> {current['median_ms']} ms")
+        new_scans = scanned_tables(current["plans"]) - scanned_tables(old["plans"])
+        if new_scans:
+            problems.append(f"{key}: now full-scans {', '.join(sorted(new_scans))}")
+        if current["statements"] > old["statements"]:
+            problems.append(f"{key}: {old['statements']} -> {current['statements']} statements")
+    return problems
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="200:10000,2000:100000",
+                        help="comma-separated cumulative users:sessions targets")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--save-baseline", help="write results to this file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown (0.5 = +50%%)")
+    args = parser.parse_args()
+
+    setup_database()
+    capture = PlanCapture()
+    results = {}
+    seeded_users = seeded_sessions = 0
+
+    for scale in args.scales.split(","):
+        users, sessions = (int(x) for x in scale.split(":"))
+        db = SessionLocal()
+        start = time.perf_counter()
+        generate(db, users - seeded_users, sessions - seeded_sessions, seed=users, first_user=seeded_users)
+        seeded_users, seeded_sessions = users, sessions
+        print(f"\n== scale {scale} (seeded in {time.perf_counter() - start:.1f}s)")
+
+        for profile, user_id in pick_users(db).items():
+            for name, fn in query_cases(db, user_id).items():
+                result = run_case(fn, capture, args.repeats)
+                key = f"{scale}/{profile}/{name}"
+                results[key] = result
+                scans = scanned_tables(result["plans"])
+                print(f"{profile:6} {name:20} {result['median_ms']:10.2f} ms  {result['statements']:3} stmts"
+                      + (f"  full scan: {', '.join(sorted(scans))}" if scans else ""))
+                db.rollback()
+        db.close()
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"scales": args.scales, "results": results}, f, indent=2)
+        print(f"\nwrote {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        problems = find_regressions(results, baseline, args.tolerance)
+        print("\nregressions:" if problems else "\nno regressions against baseline")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main_()
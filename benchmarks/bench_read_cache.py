@@ -0,0 +1,134 @@
+"""
+Read-model cache under a refresh storm.
+
+One student with --topics topics has --tabs tabs open; every wave, each
+tab reloads the dashboard at once (topic list, memory stats, due today,
+analytics stats). Between waves the student saves an explain, which must
+show up in the very next wave. Run with the cache off and on:
+
+    built      read models actually computed (cache misses)
+    hits       share of lookups served from the cache or a running miss
+    statements SQL statements for the whole storm (auth and writes included)
+    stale      topic lists that missed the explain saved before their wave
+
+    python -m benchmarks.bench_read_cache --tabs 20 --waves 20
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import SessionLocal, auth_cookies, seed_user, setup_database, summarize
+
+import httpx
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.metrics import DB_STATEMENTS, READ_CACHE_REQUESTS
+from app.db.read_cache import read_cache
+from app.db.types import new_id
+from app.db.writer import use_write_queue, write_queue
+from app.models import ExplainSession, Topic
+from main import app
+
+DASHBOARD = ("/api/topics/list", "/api/topics/memory-stats", "/api/due-today", "/api/analytics/stats")
+
+
+def seed(db, user_id: str, topics: int) -> str:
+    now = datetime.utcnow()
+    rows = [{"id": new_id(), "user_id": user_id, "title": f"Topic {i}", "subject": "Bench", "total_explains": 3,
+             "avg_confidence": 3, "last_explained": now - timedelta(days=i % 20), "created_at": now}
+            for i in range(topics)]
+    db.execute(insert(Topic.__table__), rows)
+    db.execute(insert(ExplainSession.__table__), [
+        {"id": new_id(), "topic_id": row["id"], "user_id": user_id, "duration_seconds": 60, "confidence": 3,
+         "created_at": now - timedelta(days=d)} for row in rows for d in range(3)])
+    db.commit()
+    return rows[0]["id"]
+
+
+async def storm(client, tabs: int, waves: int, topic_id: str, seeded: int) -> dict:
+    latencies, stale = [], 0
+    explains = None  # what the topic list must show from the next wave on
+
+    async def load(path):
+        start = time.perf_counter()
+        r = await client.get(path)
+        latencies.append(time.perf_counter() - start)
+        return path, r.json()
+
+    for _ in range(waves):
+        responses = await asyncio.gather(*(load(path) for _ in range(tabs) for path in DASHBOARD))
+        for path, body in responses:
+            if path == "/api/topics/list" and explains is not None:
+                seen = next(t["total_explains"] for t in body["topics"] if t["id"] == topic_id)
+                stale += seen != explains
+        r = await client.post("/api/topics/explain", json={"topic_id": topic_id, "duration_seconds": 60, "confidence": 4})
+        r.raise_for_status()
+        explains = explains + 1 if explains is not None else seeded + 1
+    return {"latencies": latencies, "stale": stale}
+
+
+async def run(args, user_id: str, topic_id: str, enabled: bool):
+    settings.READ_CACHE_ENABLED = enabled
+    read_cache.clear()
+    statements = DB_STATEMENTS.value()
+    misses = sum(v for (_, result), v in READ_CACHE_REQUESTS._values.items() if result == "miss")
+    hits = sum(v for (_, result), v in READ_CACHE_REQUESTS._values.items() if result != "miss")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies=auth_cookies(user_id)) as client:
+        start = time.perf_counter()
+        seeded = next(t["total_explains"] for t in (await client.get("/api/topics/list")).json()["topics"]
+                      if t["id"] == topic_id)
+        result = await storm(client, args.tabs, args.waves, topic_id, seeded)
+        elapsed = time.perf_counter() - start
+
+    requests = len(result["latencies"])
+    if enabled:
+        misses = sum(v for (_, r), v in READ_CACHE_REQUESTS._values.items() if r == "miss") - misses
+        hits = sum(v for (_, r), v in READ_CACHE_REQUESTS._values.items() if r != "miss") - hits
+        computed = f"{int(misses):>6}"
+        hit_rate = f"{hits / max(1, hits + misses):6.1%}"
+    else:
+        computed, hit_rate = f"{requests:>6}", f"{'-':>6}"
+    summary = summarize(result["latencies"])
+    print(f"cache {'on ' if enabled else 'off'} {requests:>8} {computed} {hit_rate} "
+          f"{int(DB_STATEMENTS.value() - statements):>10} {summary['p50_ms']:8.1f} {summary['p95_ms']:8.1f} "
+          f"{elapsed:7.2f} {result['stale']:>6}")
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--tabs", type=int, default=20)
+    parser.add_argument("--waves", type=int, default=20)
+    args = parser.parse_args()
+
+    settings.SLOW_QUERY_MS = float("inf")
+    # A storm this size needs the concurrency cap (or threads deadlock on the
+    # pool); the rate limits would turn most of it away, which isn't measured here
+    settings.ADMISSION_ENABLED = True
+    settings.ADMISSION_QUEUE_TIMEOUT_MS = 60000
+    settings.RATE_LIMIT_READ_BURST = settings.RATE_LIMIT_WRITE_BURST = 10 ** 9
+    setup_database()
+    db = SessionLocal()
+    user_id = seed_user(db).id
+    topic_id = seed(db, user_id, args.topics)
+    db.close()
+    print(f"{args.topics} topics; {args.tabs} tabs x {len(DASHBOARD)} endpoints per wave, {args.waves} waves, "
+          f"an explain saved after each\n")
+
+    if use_write_queue():
+        write_queue.start()
+    try:
+        print(f"{'':9} {'requests':>8} {'built':>6} {'hits':>6} {'statements':>10} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'wall s':>7} {'stale':>6}")
+        for enabled in (False, True):
+            asyncio.run(run(args, user_id, topic_id, enabled))
+    finally:
+        write_queue.stop()
+
+
+if __name__ == "__main__":
+    main_()
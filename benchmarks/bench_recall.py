@@ -0,0 +1,120 @@
+"""
+Recall-estimate benchmark at 10k topics per call.
+
+Seeds one user with --topics topics and a few explain sessions each,
+then times:
+
+    estimate   RecallService.estimate - both queries plus the fit
+    fit        the NumPy fit and recall on arrays already in memory
+    loop       the same model as a per-topic Python loop, for comparison
+
+and checks that the loop and the vectorized fit agree.
+
+    python -m benchmarks.bench_recall --topics 10000
+"""
+import argparse
+import math
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.common import SessionLocal, seed_user, setup_database, summarize, timed
+
+import numpy as np
+from sqlalchemy import insert
+
+from app.db.types import new_id
+from app.models import ExplainSession, Topic
+from app.services.recall_service import (CONFIDENCE_RECALL, PRIOR_STABILITY_DAYS, STABILITY_BOUNDS_DAYS,
+                                         RecallService, _days)
+
+
+def seed(db, user_id: str, topics: int, rng: random.Random, now: datetime) -> int:
+    topic_rows, session_rows = [], []
+    for t in range(topics):
+        topic_id = new_id()
+        when = now - timedelta(days=rng.randint(30, 120))
+        topic_rows.append({"id": topic_id, "user_id": user_id, "title": f"Topic {t}", "created_at": when,
+                           "total_explains": 0, "avg_confidence": 0})
+        for _ in range(rng.randint(0, 10)):
+            when = min(now, when + timedelta(hours=rng.randint(6, 24 * 14)))
+            session_rows.append({"id": new_id(), "topic_id": topic_id, "user_id": user_id, "created_at": when,
+                                 "duration_seconds": 60, "confidence": rng.choice([None, 1, 2, 3, 4, 5])})
+    db.execute(insert(Topic.__table__), topic_rows)
+    for start in range(0, len(session_rows), 5000):
+        db.execute(insert(ExplainSession.__table__), session_rows[start:start + 5000])
+    db.commit()
+    return len(session_rows)
+
+
+def loop_fit(history: list, now_days: float) -> list:
+    """Per-topic loop: history is [(times, confidences)] per topic"""
+    out = []
+    for times, confidences in history:
+        latest = confidences[-1] or 0
+        prior = PRIOR_STABILITY_DAYS[latest]
+        numerator, denominator = prior, prior ** 2
+        for i in range(1, len(times)):
+            gap = times[i] - times[i - 1]
+            if gap > 0 and confidences[i]:
+                numerator += -gap * math.log(CONFIDENCE_RECALL[confidences[i]])
+                denominator += gap ** 2
+        stability = min(max(denominator / numerator, STABILITY_BOUNDS_DAYS[0]), STABILITY_BOUNDS_DAYS[1])
+        out.append((stability, math.exp(-max(now_days - times[-1], 0.0) / stability)))
+    return out
+
+
+def measure(fn, repeat: int) -> dict:
+    fn()
+    return summarize([timed(fn)[1] for _ in range(repeat)])
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_database()
+    db = SessionLocal()
+    now = datetime.utcnow()
+    user_id = seed_user(db).id
+    sessions = seed(db, user_id, args.topics, random.Random(3), now)
+    print(f"{args.topics:,} topics, {sessions:,} sessions\n")
+
+    # The user's history as arrays (what estimate() builds after its queries)
+    rows = db.query(ExplainSession.topic_id, ExplainSession.created_at, ExplainSession.confidence).filter(
+        ExplainSession.user_id == user_id).order_by(ExplainSession.topic_id, ExplainSession.created_at).all()
+    topic_ids = np.array([r[0] for r in rows], dtype=object)
+    starts = np.r_[True, topic_ids[1:] != topic_ids[:-1]]
+    group = np.cumsum(starts) - 1
+    times = _days(np.array([r[1] for r in rows], dtype="datetime64[us]"))
+    confidence = np.array([r[2] or 0 for r in rows], dtype=np.int64)
+    n = int(starts.sum())
+    now_days = float(_days(np.datetime64(now, "us")))
+    bounds = np.flatnonzero(np.r_[starts, True])
+    history = [(times[a:b].tolist(), confidence[a:b].tolist()) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def fit():
+        stability = RecallService.fit_stability(group, times, confidence, n)
+        last = times[np.r_[group[1:] != group[:-1], True]]
+        return stability, RecallService.recall(stability, now_days - last)
+
+    exam = now + timedelta(days=30)
+    results = {
+        "estimate": measure(lambda: RecallService.estimate(db, user_id, now=now, exam_at=exam), args.repeat),
+        "fit": measure(fit, args.repeat),
+        "loop": measure(lambda: loop_fit(history, now_days), args.repeat),
+    }
+    print(f"{'':10} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, summary in results.items():
+        print(f"{name:10} {summary['p50_ms']:9.2f} {summary['p95_ms']:9.2f}")
+
+    stability, recall = fit()
+    expected = np.array(loop_fit(history, now_days))
+    print(f"\nvectorized vs loop: max |stability diff| {np.abs(stability - expected[:, 0]).max():.2e} days, "
+          f"max |recall diff| {np.abs(recall - expected[:, 1]).max():.2e}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main_()
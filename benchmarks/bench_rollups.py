@@ -0,0 +1,111 @@
+"""
+Daily rollups: backfill, incremental runs, and the 90-day dashboard.
+
+Seeds a synthetic dataset, backfills the rollups from scratch, then
+compares reading a 90-day admin dashboard from the rollups against
+aggregating it from explain_sessions / topics / users directly, and
+checks both give the same numbers. Finally adds a burst of new sessions
+and times the incremental run that folds them in.
+
+    python -m benchmarks.bench_rollups --users 10000 --sessions 1000000
+"""
+import argparse
+import random
+from datetime import datetime, time, timedelta
+
+from benchmarks.common import SessionLocal, setup_database, timed
+from benchmarks.dataset import generate
+
+from sqlalchemy import case, func, insert, select
+
+from app.core.config import settings
+from app.db.types import new_id
+from app.models import ExplainSession, Topic, User
+from app.services.rollup_service import CONFIDENCE_LEVELS, RollupService, _as_date
+
+DAYS = 90
+
+
+def scan(db, first, last) -> dict:
+    """The dashboard computed from the source tables"""
+    start, end = datetime.combine(first, time.min), datetime.combine(last + timedelta(days=1), time.min)
+    out = {}
+
+    def put(day, **values):
+        out.setdefault(_as_date(day), {}).update(values)
+
+    day = func.date(ExplainSession.created_at)
+    for row in db.execute(select(
+        day, func.count(), func.count(func.distinct(ExplainSession.user_id)),
+        *(func.count(case((ExplainSession.confidence == level, 1))) for level in CONFIDENCE_LEVELS),
+    ).where(ExplainSession.created_at >= start, ExplainSession.created_at < end).group_by(day)):
+        put(row[0], explains=row[1], active_students=row[2],
+            **{f"confidence_{level}": n for level, n in zip(CONFIDENCE_LEVELS, row[3:])})
+    for model, column in ((Topic, "topics_created"), (User, "new_students")):
+        day = func.date(model.created_at)
+        for d, n in db.execute(select(day, func.count()).where(
+                model.created_at >= start, model.created_at < end).group_by(day)):
+            put(d, **{column: n})
+    return out
+
+
+def mismatches(rollup: dict, scanned: dict) -> int:
+    bad = 0
+    for entry in rollup["days"]:
+        expected = scanned.get(_as_date(entry["day"]), {})
+        bad += any(entry[column] != expected.get(column, 0) for column in
+                   ("explains", "active_students", "topics_created", "new_students",
+                    *(f"confidence_{level}" for level in CONFIDENCE_LEVELS)))
+    return bad
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--sessions", type=int, default=1000000)
+    parser.add_argument("--burst", type=int, default=2000, help="new sessions for the incremental run")
+    args = parser.parse_args()
+
+    settings.SLOW_QUERY_MS = float("inf")  # the source-table scan is slow on purpose
+    setup_database()
+    db = SessionLocal()
+    now = datetime.utcnow()
+    counts = generate(db, args.users, args.sessions, seed=11, now=now)
+    print(f"{counts.get('explain_sessions', 0):,} sessions, {counts.get('topics', 0):,} topics, "
+          f"{counts.get('users', 0):,} users\n")
+
+    # Past the settle delay, so everything seeded is eligible
+    settled = now + timedelta(seconds=settings.ROLLUP_SETTLE_SECONDS + 1)
+    rows, elapsed = timed(RollupService.advance_all, settled)
+    print(f"backfill      {rows:>10,} rows  {elapsed:8.2f} s")
+
+    today = now.date()
+    first = today - timedelta(days=DAYS - 1)
+    scanned, scan_elapsed = timed(scan, db, first, today)
+    rollup, rollup_elapsed = timed(RollupService.daily, db, DAYS, today)
+    print(f"\n{DAYS}-day dashboard: source tables {scan_elapsed * 1000:.1f} ms, "
+          f"rollups {rollup_elapsed * 1000:.2f} ms ({len(rollup['days'])} rows)")
+    print(f"days that differ: {mismatches(rollup, scanned)}")
+
+    # Incremental: a burst of new explains, as the background job sees it
+    rng = random.Random(1)
+    topics = db.execute(select(Topic.id, Topic.user_id).limit(500)).all()
+    burst_at = now + timedelta(seconds=5)
+    db.execute(insert(ExplainSession.__table__), [{
+        "id": new_id(), "topic_id": topic_id, "user_id": user_id, "duration_seconds": 120,
+        "confidence": rng.randint(1, 5), "created_at": burst_at,
+    } for topic_id, user_id in (rng.choice(topics) for _ in range(args.burst))])
+    db.commit()
+    rows, elapsed = timed(RollupService.advance_all, burst_at + timedelta(seconds=settings.ROLLUP_SETTLE_SECONDS + 1))
+    print(f"\nincremental   {rows:>10,} rows  {elapsed * 1000:8.1f} ms")
+    rows, elapsed = timed(RollupService.advance_all, burst_at + timedelta(seconds=settings.ROLLUP_SETTLE_SECONDS + 2))
+    print(f"idle run      {rows:>10,} rows  {elapsed * 1000:8.1f} ms")
+
+    scanned = scan(db, first, today)
+    rollup = RollupService.daily(db, DAYS, today)
+    print(f"days that differ after the burst: {mismatches(rollup, scanned)}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,116 @@
+"""
+Schedule upsert under concurrency.
+
+Many threads save an explain of the same topic at once, each through
+create_or_update_schedule in its own session, as concurrent requests
+would. Afterwards the topic must have exactly one schedule with exactly
+one pending review item, and every other explain must have closed one.
+
+The same hammering with the old select-then-insert shows the race it
+replaces: threads that all see no schedule each insert one (the unique
+index now rejects all but the first, so those saves fail instead).
+
+    python -m benchmarks.bench_schedule_upsert --threads 16 --saves 400
+"""
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from benchmarks.common import SessionLocal, seed_topic, seed_user, setup_database, summarize, timed
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.api.topics import create_or_update_schedule
+from app.db.types import new_id
+from app.models import ReviewItem, Schedule
+
+
+def upsert(user_id: str, topic_id: str, day: int) -> None:
+    db = SessionLocal()
+    try:
+        create_or_update_schedule(db, user_id, topic_id, "Topic", date.today() + timedelta(days=day % 14 + 1))
+        db.commit()
+    finally:
+        db.close()
+
+
+def select_then_insert(user_id: str, topic_id: str, barrier: threading.Barrier) -> None:
+    db = SessionLocal()
+    try:
+        existing = db.query(Schedule.id).filter(Schedule.user_id == user_id, Schedule.topic_id == topic_id).first()
+        db.commit()  # hand the connection back: there may be more threads than pooled connections
+        barrier.wait()  # every thread has looked before any inserts - the window the race needs
+        if existing is None:
+            db.add(Schedule(id=new_id(), user_id=user_id, topic_id=topic_id, topic="Topic", intervals=[1, 3, 7, 14],
+                            start_date=datetime.utcnow(), completed=0, created_at=datetime.utcnow()))
+        db.commit()
+    finally:
+        db.close()
+
+
+def counts(user_id: str, topic_id: str) -> dict:
+    db = SessionLocal()
+    try:
+        schedules = db.scalar(select(func.count()).select_from(Schedule).where(
+            Schedule.user_id == user_id, Schedule.topic_id == topic_id))
+        statuses = dict(db.execute(select(ReviewItem.status, func.count()).where(
+            ReviewItem.user_id == user_id, ReviewItem.topic_id == topic_id).group_by(ReviewItem.status)).all())
+        completed = db.scalar(select(func.coalesce(func.sum(Schedule.completed), 0)).where(
+            Schedule.user_id == user_id, Schedule.topic_id == topic_id))
+        return {"schedules": schedules, "completed": completed, **statuses}
+    finally:
+        db.close()
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--saves", type=int, default=400)
+    args = parser.parse_args()
+
+    setup_database()
+    db = SessionLocal()
+    user_id = seed_user(db).id
+    topic_ids = [seed_topic(db, user_id, i).id for i in range(2)]
+    db.close()
+
+    # Upsert: every save of one topic, from all threads at once
+    topic_id = topic_ids[0]
+    samples = []
+
+    def save(i):
+        _, elapsed = timed(upsert, user_id, topic_id, i)
+        samples.append(elapsed)
+
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(save, range(args.saves)))
+    result = counts(user_id, topic_id)
+    summary = summarize(samples)
+    ok = (result["schedules"] == 1 and result.get("pending") == 1
+          and result.get("done") == args.saves - 1 == result["completed"])
+    print(f"upsert: {args.saves} saves on {args.threads} threads -> {result}")
+    print(f"        p50 {summary['p50_ms']:.2f} ms, p95 {summary['p95_ms']:.2f} ms per save; "
+          f"{'ok' if ok else 'WRONG'}")
+
+    # Select-then-insert: all threads look first, then insert
+    topic_id = topic_ids[1]
+    barrier = threading.Barrier(args.threads)
+    failures = []
+
+    def racy(_):
+        try:
+            select_then_insert(user_id, topic_id, barrier)
+        except (IntegrityError, OperationalError) as exc:
+            failures.append(exc)
+
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(racy, range(args.threads)))
+    result = counts(user_id, topic_id)
+    print(f"\nselect-then-insert: {args.threads} concurrent first saves -> {result['schedules']} schedule(s), "
+          f"{len(failures)} rejected by the unique index")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,97 @@
+"""
+Full-text search latency at scale.
+
+Seeds a synthetic dataset (the generator rebuilds the search index after
+its bulk inserts), then times SearchService.search for the heaviest user
+(most sessions) and a median user over a few query shapes, next to the
+LIKE scan it replaces:
+
+    common      a word in most reflections
+    rare        a word in few reflections
+    prefix      an incomplete last word (search-as-you-type)
+    phrase      several words, all required
+
+    python -m benchmarks.bench_search --users 10000 --sessions 1000000
+"""
+import argparse
+import time
+
+from benchmarks.common import SessionLocal, setup_database, summarize
+from benchmarks.dataset import generate
+
+from sqlalchemy import func, or_
+
+from app.core.config import settings
+from app.models import ExplainSession
+from app.services.search_service import SearchService
+
+QUERIES = {
+    "common": "the",
+    "rare": "krebs",
+    "prefix": "nucleoph",
+    "phrase": "boundary conditions entropy",
+}
+
+
+def pick_users(db) -> dict:
+    """Heaviest user by session count, and the median one"""
+    counts = db.query(ExplainSession.user_id, func.count(ExplainSession.id)).group_by(
+        ExplainSession.user_id).order_by(func.count(ExplainSession.id).desc()).all()
+    return {
+        "heavy": (counts[0][0], counts[0][1]),
+        "median": (counts[len(counts) // 2][0], counts[len(counts) // 2][1]),
+    }
+
+
+def like_scan(db, user_id: str, query: str, limit: int):
+    """The pre-index approach: every term LIKE'd against every reflection column"""
+    filters = [ExplainSession.user_id == user_id]
+    for term in SearchService.query_terms(query):
+        pattern = f"%{term}%"
+        filters.append(or_(ExplainSession.struggles.ilike(pattern), ExplainSession.forgot.ilike(pattern),
+                           ExplainSession.unclear.ilike(pattern)))
+    return db.query(ExplainSession).filter(*filters).order_by(
+        ExplainSession.created_at.desc()).limit(limit).all()
+
+
+def measure(fn, repeat: int) -> dict:
+    fn()  # warm the page cache
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--sessions", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--per-page", type=int, default=20)
+    args = parser.parse_args()
+
+    settings.SLOW_QUERY_MS = float("inf")  # the LIKE baseline would log every run
+    setup_database()
+    db = SessionLocal()
+    start = time.perf_counter()
+    counts = generate(db, args.users, args.sessions, seed=11)
+    print(f"seeded {counts.get('explain_sessions', 0):,} sessions and indexed them in "
+          f"{time.perf_counter() - start:.1f}s")
+
+    users = pick_users(db)
+    print(f"\n{'user':8} {'query':8} {'method':6} {'hits':>5} {'p50 ms':>9} {'p95 ms':>9}")
+    for label, (user_id, sessions) in users.items():
+        for name, query in QUERIES.items():
+            hits = len(SearchService.search(db, user_id, query, limit=args.per_page)["results"])
+            fts = measure(lambda: SearchService.search(db, user_id, query, limit=args.per_page), args.repeat)
+            like = measure(lambda: like_scan(db, user_id, query, args.per_page), args.repeat)
+            print(f"{label:8} {name:8} {'index':6} {hits:5} {fts['p50_ms']:9.2f} {fts['p95_ms']:9.2f}")
+            print(f"{'':8} {'':8} {'like':6} {'':5} {like['p50_ms']:9.2f} {like['p95_ms']:9.2f}")
+        print(f"({label} user has {sessions:,} sessions)")
+    db.close()
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,78 @@
+"""
+Memory-status sweeper cost, and status counts across users.
+
+Seeds a synthetic dataset, then runs the sweeper at later and later
+clock times. Each sweep should cost time in proportion to the topics
+whose status actually came due, not to the size of the table. Finally
+compares counting topics per status across all users from the stored
+column against recomputing every topic's status in Python.
+
+    python -m benchmarks.bench_status_sweep --users 10000 --sessions 1000000
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from benchmarks.common import SessionLocal, setup_database, timed
+from benchmarks.dataset import generate
+
+from sqlalchemy import func
+
+from app.models import Topic
+from app.services.memory_service import MemoryStrengthService
+
+HORIZONS = [
+    ("now", timedelta(0)),
+    ("+1 hour", timedelta(hours=1)),
+    ("+1 day", timedelta(days=1)),
+    ("+3 days", timedelta(days=3)),
+    ("+7 days", timedelta(days=7)),
+]
+
+
+def stored_counts(db) -> dict:
+    return dict(db.query(Topic.memory_status, func.count()).group_by(Topic.memory_status).all())
+
+
+def recomputed_counts(db, now: datetime) -> dict:
+    """What "how many topics are CRITICAL" cost before the status was stored"""
+    counts = {}
+    for total, confidence, last in db.query(Topic.total_explains, Topic.avg_confidence, Topic.last_explained):
+        status = MemoryStrengthService.status_at(total, confidence, last, now)
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--sessions", type=int, default=1000000)
+    args = parser.parse_args()
+
+    setup_database()
+    db = SessionLocal()
+    now = datetime.utcnow()
+    generate(db, args.users, args.sessions, seed=5, now=now)
+    total = db.query(func.count(Topic.id)).scalar()
+    print(f"{total:,} topics\n")
+
+    print(f"{'clock':10} {'due':>8} {'swept':>8} {'ms':>9} {'us/topic':>9}")
+    for label, ahead in HORIZONS:
+        at = now + ahead
+        due = db.query(func.count(Topic.id)).filter(Topic.status_changes_at <= at).scalar()
+        db.rollback()
+        swept, elapsed = timed(MemoryStrengthService.sweep_all, at)
+        per_topic = elapsed / swept * 1e6 if swept else 0.0
+        print(f"{label:10} {due:8,} {swept:8,} {elapsed * 1000:9.1f} {per_topic:9.1f}")
+
+    at = now + HORIZONS[-1][1]
+    stored, stored_elapsed = timed(stored_counts, db)
+    recomputed, recomputed_elapsed = timed(recomputed_counts, db, at)
+    print(f"\nstatus counts, all users: stored column {stored_elapsed * 1000:.1f} ms, "
+          f"recomputed {recomputed_elapsed * 1000:.1f} ms")
+    print(f"  stored     {dict(sorted(stored.items()))}")
+    print(f"  recomputed {dict(sorted(recomputed.items()))}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,108 @@
+"""
+Topic detail cost as a topic's session history grows.
+
+One topic gets more and more explain sessions, each with ~--text bytes
+of reflections. At each size, GET /api/topics/{id} (five recent
+sessions, no reflections) and GET /api/topics/{id}/sessions (everything)
+are timed, with peak Python memory per request (tracemalloc) and the
+bytes the driver handed back:
+
+    python -m benchmarks.bench_topic_detail --sizes 10,100,1000,10000 --text 1500
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.common import SessionLocal, auth_cookies, seed_topic, seed_user, setup_database, summarize
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+
+from app.db.session import engine, read_engine
+from app.db.types import new_id
+from app.models import ExplainSession
+from main import app
+
+
+class FetchedBytes:
+    """Rough size of what a request's SELECTs returned: re-runs them afterwards and sums value lengths"""
+
+    def __init__(self):
+        self.statements = []
+        for e in {engine, read_engine}:
+            event.listen(e, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.statements.append((statement, parameters))
+
+    def collect(self) -> int:
+        statements, self.statements = self.statements, []
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            total = 0
+            for statement, parameters in statements:
+                cursor.execute(statement, parameters)
+                total += sum(len(v) if isinstance(v, (str, bytes)) else 8 for row in cursor.fetchall() for v in row)
+            return total
+        finally:
+            connection.close()
+
+
+def grow(db, user_id: str, topic_id: str, start: int, count: int, text: int):
+    now = datetime.utcnow()
+    filler = ("I kept mixing up the steps and had to look it up again. " * (text // 180 + 1))[:text // 3]
+    rows = [{"id": new_id(), "topic_id": topic_id, "user_id": user_id, "duration_seconds": 120,
+             "confidence": 1 + i % 5, "struggles": filler, "forgot": filler, "unclear": filler,
+             "created_at": now - timedelta(minutes=start + i)} for i in range(count)]
+    for chunk in range(0, len(rows), 5000):
+        db.execute(insert(ExplainSession.__table__), rows[chunk:chunk + 5000])
+    db.commit()
+
+
+def measure(client, path: str, fetched: FetchedBytes, repeat: int) -> dict:
+    client.get(path).raise_for_status()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        client.get(path)
+        samples.append(time.perf_counter() - start)
+    fetched.collect()
+    tracemalloc.start()
+    client.get(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"p50_ms": summarize(samples)["p50_ms"], "peak_kb": peak / 1024, "fetched_kb": fetched.collect() / 1024}
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="sessions on the topic, cumulative")
+    parser.add_argument("--text", type=int, default=1500, help="reflection bytes per session")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_database()
+    db = SessionLocal()
+    user_id = seed_user(db).id
+    topic_id = seed_topic(db, user_id).id
+    fetched = FetchedBytes()
+    client = TestClient(app, cookies=auth_cookies(user_id))
+
+    print(f"{'sessions':>8}   {'detail p50 ms':>13} {'peak KiB':>9} {'fetched KiB':>11}   "
+          f"{'all sessions p50 ms':>19} {'peak KiB':>9} {'fetched KiB':>11}")
+    have = 0
+    for size in (int(s) for s in args.sizes.split(",")):
+        grow(db, user_id, topic_id, have, size - have, args.text)
+        have = size
+        detail = measure(client, f"/api/topics/{topic_id}", fetched, args.repeat)
+        full = measure(client, f"/api/topics/{topic_id}/sessions", fetched, max(1, args.repeat // 4))
+        print(f"{size:>8}   {detail['p50_ms']:>13.2f} {detail['peak_kb']:>9.0f} {detail['fetched_kb']:>11.1f}   "
+              f"{full['p50_ms']:>19.2f} {full['peak_kb']:>9.0f} {full['fetched_kb']:>11.1f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main_()
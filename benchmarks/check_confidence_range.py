@@ -0,0 +1,94 @@
+"""
+Check that confidences outside 1-5 can't break the recall fit.
+
+    api      POST /api/topics/explain rejects them (422) and accepts 1-5
+    stored   sessions saved with them before the API checked - written
+             here straight through the CRUD - are read as "not given":
+             GET /api/topics/recall answers 200 with the same estimates
+             as for the sessions without a confidence, and the archive
+             job can summarize them
+
+Exits non-zero on the first failure.
+
+    python -m benchmarks.check_confidence_range
+"""
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import SessionLocal, auth_cookies, seed_topic, seed_user, setup_database
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db.topic_crud import ExplainSessionCRUD
+from app.models import ExplainSession
+from app.services.archive_service import ArchiveService
+import main
+
+OUT_OF_RANGE = (0, 6, 100, -1)
+
+
+def store_sessions(user_id: str, topic_id: str, confidences) -> None:
+    """A day apart, ending yesterday, bypassing the API's validation"""
+    db = SessionLocal()
+    start = datetime.utcnow() - timedelta(days=len(confidences))
+    for day, confidence in enumerate(confidences):
+        session = ExplainSessionCRUD.create(db, {
+            "topic_id": topic_id, "user_id": user_id, "duration_seconds": 60, "confidence": confidence,
+        })
+        session.created_at = start + timedelta(days=day)
+    db.commit()
+    db.close()
+
+
+def main_():
+    settings.READ_CACHE_ENABLED = False
+    setup_database()
+    db = SessionLocal()
+    user_id = seed_user(db).id
+    checked, legacy, unrated = (seed_topic(db, user_id, i).id for i in range(3))
+    db.close()
+
+    failures = 0
+
+    def check(ok: bool, what: str):
+        nonlocal failures
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        failures += not ok
+
+    with TestClient(main.app, cookies=auth_cookies(user_id)) as client:
+        for confidence in OUT_OF_RANGE:
+            r = client.post("/api/topics/explain", json={
+                "topic_id": checked, "duration_seconds": 60, "confidence": confidence})
+            check(r.status_code == 422, f"explain with confidence {confidence}: {r.status_code}")
+        r = client.post("/api/topics/explain", json={"topic_id": checked, "duration_seconds": 60, "confidence": 5})
+        check(r.status_code == 200, f"explain with confidence 5: {r.status_code}")
+
+        store_sessions(user_id, legacy, [3, 6, 4, -1, 100])
+        store_sessions(user_id, unrated, [3, None, 4, None, None])
+        r = client.get("/api/topics/recall")
+        check(r.status_code == 200, f"recall with stored out-of-range confidences: {r.status_code}")
+        if r.status_code == 200:
+            by_id = {topic["id"]: topic for topic in r.json()["topics"]}
+            same = by_id[legacy]["stability_days"] == by_id[unrated]["stability_days"]
+            check(same, f"out-of-range fitted as not given: {by_id[legacy]['stability_days']} "
+                        f"vs {by_id[unrated]['stability_days']} days")
+
+    db = SessionLocal()
+    rows = db.query(*(ExplainSession.__table__.c[name] for name in (
+        "id", "topic_id", "user_id", "duration_seconds", "confidence", "created_at"))).filter(
+        ExplainSession.topic_id == legacy).order_by(ExplainSession.created_at).all()
+    try:
+        ArchiveService.summarize(db, rows)
+        check(True, "archive summary over out-of-range confidences")
+    except Exception as exc:
+        check(False, f"archive summary over out-of-range confidences: {exc!r}")
+    finally:
+        db.rollback()
+        db.close()
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main_()
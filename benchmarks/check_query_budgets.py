@@ -0,0 +1,102 @@
+"""
+Check that API endpoints stay within their SQL statement budgets.
+
+Seeds a user with enough topics, sessions and schedules that any
+per-row query (N+1) blows the budget, then calls each endpoint with
+SQL_DEBUG_HEADERS on and compares X-DB-Statements against BUDGETS.
+Exits non-zero on the first regression.
+
+    python -m benchmarks.check_query_budgets
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import SessionLocal, auth_cookies, seed_topic, seed_user, setup_database
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db.query_stats import assert_response_queries
+from app.db.topic_crud import ExplainSessionCRUD
+from app.api.topics import create_or_update_schedule
+import main
+
+# (method, path template, max statements). {topic_id} is filled in.
+BUDGETS = [
+    ("GET", "/api/topics/list", 3),
+    ("GET", "/api/topics/list?status=WEAK&sort=next_review&per_page=10", 3),
+    ("GET", "/api/topics/memory-stats", 3),
+    ("GET", "/api/topics/recall", 3),
+    ("GET", "/api/topics/{topic_id}", 5),
+    ("GET", "/api/topics/{topic_id}/sessions", 4),
+    ("GET", "/api/due-today", 5),
+    ("GET", "/api/analytics/stats", 8),
+    ("GET", "/api/analytics/activity", 2),
+    ("GET", "/api/analytics/admin/daily", 3),
+    ("GET", "/api/schedules/my-schedules", 3),
+    ("GET", "/api/schedules/calendar", 3),
+    ("GET", "/api/search?q=topic", 4),
+    ("POST", "/api/topics/explain", 12),  # +1 closing the schedule's pending review items
+]
+
+
+def seed(topics: int, sessions_per_topic: int):
+    db = SessionLocal()
+    user = seed_user(db)
+    user_id = user.id
+    settings.ADMIN_EMAILS = user.email  # so the admin endpoints are checked too
+    topic_ids = []
+    for i in range(topics):
+        topic_id = seed_topic(db, user_id, i).id
+        topic_ids.append(topic_id)
+        for _ in range(sessions_per_topic):
+            ExplainSessionCRUD.create(db, {
+                "topic_id": topic_id,
+                "user_id": user_id,
+                "duration_seconds": 90,
+                "confidence": 1 + i % 5,
+            })
+        # Mix of due and future reviews
+        review = datetime.utcnow().date() + timedelta(days=(i % 3) - 1)
+        create_or_update_schedule(db, user_id, topic_id, f"Topic {i}", review)
+    db.commit()
+    db.close()
+    return user_id, topic_ids
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--topics", type=int, default=30)
+    parser.add_argument("--sessions", type=int, default=3)
+    args = parser.parse_args()
+
+    setup_database()
+    user_id, topic_ids = seed(args.topics, args.sessions)
+    cookies = auth_cookies(user_id)
+    settings.SQL_DEBUG_HEADERS = True
+
+    failures = 0
+    with TestClient(main.app) as client:
+        for method, template, limit in BUDGETS:
+            path = template.format(topic_id=topic_ids[0])
+            if method == "POST":
+                response = client.post(path, cookies=cookies, json={
+                    "topic_id": topic_ids[0], "duration_seconds": 60, "confidence": 3,
+                })
+            else:
+                response = client.request(method, path, cookies=cookies)
+            assert response.status_code == 200, f"{method} {path}: {response.status_code} {response.text}"
+            count = response.headers["x-db-statements"]
+            try:
+                assert_response_queries(response, limit)
+                print(f"ok    {method:6} {template:36} {count:>3} / {limit}")
+            except AssertionError as e:
+                failures += 1
+                print(f"FAIL  {method:6} {template:36} {count:>3} / {limit}  ({e})")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main_()
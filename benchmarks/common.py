@@ -0,0 +1,94 @@
+"""
+Shared setup for the benchmark scripts.
+
+Importing this module points the app at a throwaway SQLite database
+(unless BENCH_DATABASE_URL is set) and fills in dummy OAuth settings,
+so benchmarks run without a .env file or a Google login.
+"""
+import logging
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+_bench_dir = tempfile.mkdtemp(prefix="studycore-bench-")
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{_bench_dir}/bench.db")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "bench")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "bench")
+os.environ.setdefault("GOOGLE_REDIRECT_URI", "http://localhost:8000/auth/callback")
+# One bench user sends far more than the per-user rate limits allow
+os.environ.setdefault("ADMISSION_ENABLED", "false")
+
+from app.core.security import create_access_token  # noqa: E402
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+from app.db.crud import UserCRUD  # noqa: E402
+from app.db.init_db import init_db  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.db.topic_crud import TopicCRUD  # noqa: E402
+
+
+def setup_database():
+    """Create the schema in the benchmark database"""
+    init_db()
+
+
+def seed_user(db, index: int = 0):
+    """Create a user with a predictable email"""
+    user = UserCRUD.create(db, {
+        "id": f"bench-{index}-{uuid.uuid4().hex[:8]}",
+        "email": f"bench{index}-{uuid.uuid4().hex[:8]}@example.com",
+        "name": f"Bench User {index}",
+    })
+    db.commit()
+    return user
+
+
+def seed_topic(db, user_id: str, index: int = 0):
+    topic = TopicCRUD.create(db, user_id=user_id, title=f"Topic {index}", subject="Benchmarks")
+    db.commit()
+    return topic
+
+
+def auth_cookies(user_id: str) -> dict:
+    """Cookie jar that authenticates as user_id without going through OAuth"""
+    return {"access_token": f"Bearer {create_access_token(data={'sub': user_id})}"}
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples) -> dict:
+    """Latency summary in milliseconds"""
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+__all__ = [
+    "SessionLocal",
+    "auth_cookies",
+    "percentile",
+    "seed_topic",
+    "seed_user",
+    "setup_database",
+    "summarize",
+    "timed",
+]
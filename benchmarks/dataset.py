@@ -0,0 +1,200 @@
+"""
+Synthetic dataset generator.
+
+Produces realistic, power-law shaped data: most students have a handful
+of topics and sessions, a few heavy users have hundreds. Rows are
+written with bulk executemany inserts in chunks, so millions of
+sessions seed in minutes rather than hours.
+
+    python -m benchmarks.dataset --users 100000 --sessions 10000000
+
+Uses BENCH_DATABASE_URL if set (see benchmarks/common.py).
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import SessionLocal, setup_database
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.search_index import rebuild_search_index
+from app.db.types import new_id
+from app.models import User, Topic, ExplainSession, Schedule, ReviewItem, UserAnalytics
+from app.services.memory_service import MemoryStrengthService
+
+SUBJECTS = ["Anatomy", "Biochemistry", "Physiology", "Calculus", "Thermodynamics", "Organic Chemistry",
+            "Statics", "Circuit Theory", "Microeconomics", "Constitutional Law", "Pharmacology", "Statistics"]
+WORDS = ("the derivation of the main equation boundary conditions enzyme kinetics membrane potential "
+         "integration by parts free body diagram nucleophilic substitution supply curve mechanism "
+         "why the sign flips second law entropy krebs cycle feedback loop limits of the proof "
+         "which step comes first units dimensional analysis the exception to the rule").split()
+CONFIDENCE_DAYS = {1: 1, 2: 2, 3: 3, 4: 7, 5: 14}
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _power_law(rng: random.Random, mean: float, cap: int, alpha: float = 1.5) -> int:
+    """Pareto-distributed count with the requested mean (alpha/(alpha-1) is the raw mean)"""
+    raw_mean = alpha / (alpha - 1)
+    return max(0, min(cap, int(rng.paretovariate(alpha) * mean / raw_mean)))
+
+
+class BulkWriter:
+    """Buffers rows per table and flushes them as executemany batches"""
+
+    def __init__(self, db, chunk: int):
+        self.db = db
+        self.chunk = chunk
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, model, row: dict):
+        buffer = self.buffers.setdefault(model, [])
+        buffer.append(row)
+        if len(buffer) >= self.chunk:
+            self.flush(model)
+
+    def flush(self, model=None):
+        models = [model] if model is not None else list(self.buffers)
+        for m in models:
+            rows = self.buffers.get(m)
+            if rows:
+                self.db.execute(insert(m.__table__), rows)
+                self.counts[m.__tablename__] = self.counts.get(m.__tablename__, 0) + len(rows)
+                self.buffers[m] = []
+        self.db.commit()
+
+
+def generate(db, users: int, sessions: int, topics_per_user: float = 8.0, seed: int = 42,
+             chunk: int = 5000, now: datetime = None, first_user: int = 0) -> dict:
+    """Generate the dataset and return row counts per table (first_user lets runs append)"""
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    mean_sessions_per_topic = sessions / max(1.0, users * topics_per_user)
+    writer = BulkWriter(db, chunk)
+
+    for u in range(first_user, first_user + users):
+        user_id = f"synthetic-{u}-{rng.getrandbits(32):08x}"
+        signup = now - timedelta(days=rng.randint(1, 365))
+        writer.add(User, {
+            "id": user_id,
+            "email": f"student{u}@synthetic.example",
+            "name": f"Student {u}",
+            "picture": "",
+            "is_active": True,
+            "is_premium": False,
+            "created_at": signup,
+            "last_login": now - timedelta(hours=rng.randint(0, 24 * 30)),
+        })
+
+        user_sessions = 0
+        for t in range(max(1, _power_law(rng, topics_per_user, 500))):
+            topic_id = new_id()
+            created = signup + timedelta(minutes=rng.randint(0, max(1, int((now - signup).total_seconds() // 60))))
+            count = _power_law(rng, mean_sessions_per_topic, 2000)
+
+            confidences = []
+            when = created
+            for _ in range(count):
+                when = min(now, when + timedelta(hours=rng.randint(6, 24 * 10)))
+                confidence = min(5, max(1, int(rng.gauss(2 + len(confidences) * 0.3, 1))))
+                confidences.append(confidence)
+                writer.add(ExplainSession, {
+                    "id": new_id(),
+                    "topic_id": topic_id,
+                    "user_id": user_id,
+                    "duration_seconds": rng.randint(60, 900),
+                    "struggles": _sentence(rng, rng.randint(3, 40)) if rng.random() < 0.8 else None,
+                    "forgot": _sentence(rng, rng.randint(3, 30)) if rng.random() < 0.6 else None,
+                    "unclear": _sentence(rng, rng.randint(3, 30)) if rng.random() < 0.5 else None,
+                    "confidence": confidence,
+                    "created_at": when,
+                })
+            user_sessions += count
+
+            title = f"{rng.choice(SUBJECTS)} topic {t}"
+            avg_confidence = int(sum(confidences) / count) if count else 0
+            last_explained = when if count else None
+            status, changes_at = MemoryStrengthService.transition(count, avg_confidence, last_explained, now)
+            writer.add(Topic, {
+                "id": topic_id,
+                "user_id": user_id,
+                "title": title,
+                "subject": rng.choice(SUBJECTS),
+                "description": _sentence(rng, rng.randint(0, 20)) or None,
+                "total_explains": count,
+                "avg_confidence": avg_confidence,
+                "last_explained": last_explained,
+                "memory_status": status,
+                "status_changes_at": changes_at,
+                "created_at": created,
+                "updated_at": when,
+            })
+
+            if count:
+                next_review = (when + timedelta(days=CONFIDENCE_DAYS[confidences[-1]])).replace(
+                    hour=0, minute=0, second=0, microsecond=0)
+                schedule_id = new_id()
+                writer.add(Schedule, {
+                    "id": schedule_id,
+                    "user_id": user_id,
+                    "topic_id": topic_id,
+                    "topic": title,
+                    "start_date": next_review,
+                    "intervals": [1, 3, 7, 14],
+                    "completed": 0,
+                    "created_at": when,
+                })
+                writer.add(ReviewItem, {
+                    "id": new_id(),
+                    "schedule_id": schedule_id,
+                    "user_id": user_id,
+                    "topic_id": topic_id,
+                    "due_at": next_review,
+                    "status": "pending",
+                    "created_at": when,
+                })
+
+        writer.add(UserAnalytics, {
+            "id": new_id(),
+            "user_id": user_id,
+            "total_sessions": user_sessions,
+            "last_active": now,
+            "total_schedules_created": 0,
+            "total_events_created": 0,
+            "current_streak": rng.randint(0, 10),
+            "longest_streak": rng.randint(10, 30),
+            "created_at": signup,
+            "updated_at": now,
+        })
+
+    writer.flush()
+    # Bulk inserts skip the ORM events that maintain the search index
+    rebuild_search_index(db.connection())
+    db.commit()
+    return writer.counts
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=100000, help="approximate total explain sessions")
+    parser.add_argument("--topics-per-user", type=float, default=8.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    setup_database()
+    db = SessionLocal()
+    start = time.perf_counter()
+    counts = generate(db, args.users, args.sessions, args.topics_per_user, args.seed)
+    db.close()
+    print(f"seeded {settings.DATABASE_URL} in {time.perf_counter() - start:.1f}s: {counts}")
+
+
+if __name__ == "__main__":
+    main_()
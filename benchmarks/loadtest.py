@@ -0,0 +1,269 @@
+"""
+End-to-end HTTP load test with synthetic users.
+
+Seeds N users (each with a few topics), mints their session cookies
+with create_access_token - no Google login involved - and replays a mix
+of the flows the pages actually perform:
+
+    dashboard  GET /dashboard + memory-stats + due-today + analytics stats
+    topics     GET /topics + /api/topics/list
+    explain    GET topic + sessions, POST /api/topics/explain
+    delete     POST /api/topics/create, DELETE /api/topics/{id}
+
+Results (throughput and p50/p95/p99 per endpoint) are written as JSON
+so runs on different commits can be compared:
+
+    python -m benchmarks.loadtest --users 50 --concurrency 20 --duration 30 --out baseline.json
+    python -m benchmarks.loadtest --users 50 --concurrency 20 --duration 30 --compare baseline.json
+
+By default the app is served by uvicorn in a child process on a free
+port, so the server doesn't share an interpreter (and its GIL) with the
+load generator. To target an already running server pass --base-url; it
+must share the seeded database (BENCH_DATABASE_URL) and SECRET_KEY.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from benchmarks.common import SessionLocal, auth_cookies, seed_topic, seed_user, setup_database, summarize
+
+import httpx
+
+FLOW_WEIGHTS = {"dashboard": 40, "topics": 30, "explain": 25, "delete": 5}
+
+
+class Recorder:
+    """Latency samples per endpoint label"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, client, label: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            return None
+        self.samples[label].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+
+async def flow_dashboard(client, rec, user):
+    await rec.call(client, "GET /dashboard", "GET", "/dashboard")
+    await asyncio.gather(
+        rec.call(client, "GET /api/topics/memory-stats", "GET", "/api/topics/memory-stats"),
+        rec.call(client, "GET /api/due-today", "GET", "/api/due-today"),
+        rec.call(client, "GET /api/analytics/stats", "GET", "/api/analytics/stats"),
+    )
+
+
+async def flow_topics(client, rec, user):
+    await rec.call(client, "GET /topics", "GET", "/topics")
+    await rec.call(client, "GET /api/topics/list", "GET", "/api/topics/list")
+
+
+async def flow_explain(client, rec, user):
+    topic_id = random.choice(user["topic_ids"])
+    await rec.call(client, "GET /api/topics/{topic_id}", "GET", f"/api/topics/{topic_id}")
+    await rec.call(client, "GET /api/topics/{topic_id}/sessions", "GET", f"/api/topics/{topic_id}/sessions")
+    await rec.call(client, "POST /api/topics/explain", "POST", "/api/topics/explain", json={
+        "topic_id": topic_id,
+        "duration_seconds": random.randint(60, 600),
+        "struggles": "Couldn't derive the second step",
+        "forgot": "The boundary condition",
+        "unclear": None,
+        "confidence": random.randint(1, 5),
+    })
+
+
+async def flow_delete(client, rec, user):
+    response = await rec.call(client, "POST /api/topics/create", "POST", "/api/topics/create", json={
+        "title": "Scratch topic", "subject": "Load test",
+    })
+    if response is not None and response.status_code == 200:
+        topic_id = response.json()["topic"]["id"]
+        await rec.call(client, "DELETE /api/topics/{topic_id}", "DELETE", f"/api/topics/{topic_id}")
+
+
+FLOWS = {
+    "dashboard": flow_dashboard,
+    "topics": flow_topics,
+    "explain": flow_explain,
+    "delete": flow_delete,
+}
+
+
+def seed(users: int, topics_per_user: int) -> list:
+    setup_database()
+    db = SessionLocal()
+    seeded = []
+    for i in range(users):
+        user_id = seed_user(db, i).id
+        topic_ids = [seed_topic(db, user_id, t).id for t in range(topics_per_user)]
+        seeded.append({"id": user_id, "topic_ids": topic_ids, "cookies": auth_cookies(user_id)})
+    db.close()
+    return seeded
+
+
+async def run_load(base_url: str, users: list, concurrency: int, duration: float) -> Recorder:
+    rec = Recorder()
+    names, weights = zip(*FLOW_WEIGHTS.items())
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency * 3)
+
+    async def worker(index: int):
+        user = users[index % len(users)]
+        async with httpx.AsyncClient(base_url=base_url, cookies=user["cookies"], limits=limits,
+                                     timeout=30, follow_redirects=False) as client:
+            while time.perf_counter() < deadline:
+                flow = random.choices(names, weights)[0]
+                await FLOWS[flow](client, rec, user)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return rec
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(env: dict = None, timeout: float = 60.0) -> tuple:
+    """
+    Serve main:app with uvicorn in a child process on a free port. The
+    child inherits this environment - the seeded database and SECRET_KEY
+    set by benchmarks.common - plus `env`.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=ROOT, env=dict(os.environ, **(env or {})),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + timeout
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health/live", timeout=1).status_code == 200:
+                return base_url, process
+        except httpx.HTTPError:
+            pass
+        if time.perf_counter() > deadline:
+            stop_server(process)
+            raise RuntimeError(f"server not up after {timeout:.0f} s")
+        time.sleep(0.1)
+
+
+def stop_server(process: subprocess.Popen):
+    """Shut the server down gracefully, or kill it"""
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def build_report(rec: Recorder, args, elapsed: float) -> dict:
+    endpoints = {}
+    for label in sorted(rec.samples):
+        stats = summarize(rec.samples[label])
+        stats["errors"] = rec.errors[label]
+        stats["rps"] = round(stats["count"] / elapsed, 2)
+        endpoints[label] = stats
+    total = sum(len(s) for s in rec.samples.values())
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "users": args.users,
+            "topics_per_user": args.topics,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "flows": FLOW_WEIGHTS,
+        },
+        "total": {
+            "requests": total,
+            "errors": sum(rec.errors.values()),
+            "rps": round(total / elapsed, 2),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def print_report(report: dict, baseline: dict = None):
+    print(f"commit {report['commit']}: {report['total']['requests']} requests, "
+          f"{report['total']['rps']} req/s, {report['total']['errors']} errors")
+    print(f"{'endpoint':42} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+    for label, stats in report["endpoints"].items():
+        line = (f"{label:42} {stats['rps']:8.1f} {stats['p50_ms']:8.1f} "
+                f"{stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f} {stats['errors']:5}")
+        old = (baseline or {}).get("endpoints", {}).get(label)
+        if old and old["p95_ms"]:
+            line += f"   p95 {(stats['p95_ms'] / old['p95_ms'] - 1) * 100:+.1f}% vs {baseline['commit']}"
+        print(line)
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--topics", type=int, default=10, help="topics seeded per user")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds")
+    parser.add_argument("--base-url", help="target an external server instead of starting one")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to diff against")
+    args = parser.parse_args()
+
+    users = seed(args.users, args.topics)
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        base_url, server = start_server()
+
+    try:
+        start = time.perf_counter()
+        rec = asyncio.run(run_load(base_url, users, args.concurrency, args.duration))
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            stop_server(server)
+
+    report = build_report(rec, args, elapsed)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main_()
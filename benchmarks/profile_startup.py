@@ -0,0 +1,98 @@
+"""
+Cold-start profile: import cost of main.py and time to first response.
+
+1. Runs `python -X importtime -c "import main"` in a fresh interpreter
+   and lists the most expensive imports. Fails if the OAuth/email
+   stacks or NumPy (which should load lazily) show up.
+2. Starts uvicorn in a subprocess and polls /health/live, reporting the
+   time from process spawn to the first 200 - against an empty
+   database (first boot) and again once the schema is stamped.
+
+Exits non-zero when time-to-first-response exceeds --target.
+
+    python -m benchmarks.profile_startup --target 2.5
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import benchmarks.common  # noqa: F401 - sets DATABASE_URL / dummy secrets in os.environ
+
+import httpx
+
+LAZY_MODULES = ("googleapiclient", "google_auth_oauthlib", "aiosmtplib", "numpy")
+
+
+def import_profile(top: int) -> float:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            capture_output=True, text=True, env=os.environ, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if not cumulative_us.strip().isdigit():
+            continue  # header line
+        depth = len(name) - len(name.lstrip()) - 1
+        rows.append((int(cumulative_us), name.strip(), depth))
+
+    total = next((us for us, name, _ in rows if name == "main"), 0) / 1e6
+    print(f"import main: {total:.3f}s")
+    print("most expensive direct dependencies:")
+    shallow = sorted((r for r in rows if 0 < r[2] <= 4), reverse=True)[:top]
+    for us, name, _ in shallow:
+        print(f"  {us / 1e6:7.3f}s  {name}")
+
+    eager = [m for m in LAZY_MODULES if any(name == m for _, name, _ in rows)]
+    if eager:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(eager)}")
+    return total if not eager else float("inf")
+
+
+def time_to_first_response(timeout: float = 30.0) -> float:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=os.environ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health/live", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.02)
+        raise RuntimeError("server did not respond in time")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", type=float, default=2.5, help="max seconds to first response")
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    import_seconds = import_profile(args.top)
+
+    first_boot = time_to_first_response()
+    warm_boot = time_to_first_response()
+    print(f"time to first response: first boot {first_boot:.3f}s, schema current {warm_boot:.3f}s "
+          f"(target {args.target:.2f}s)")
+
+    ok = import_seconds != float("inf") and warm_boot <= args.target
+    print("OK" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main_()
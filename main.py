@@ -3,22 +3,66 @@ from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from contextlib import asynccontextmanager
-from app.api import auth, schedules, feedback, analytics, topics, due_today
+from app.api import auth, schedules, feedback, analytics, topics, due_today, health, metrics, search, events
+from app.core.assets import STATIC_DIR, FingerprintedStaticFiles, configure_templates, warm_templates
 from app.core.config import settings
 from app.core.dependencies import get_current_user_optional
+from app.core.admission import AdmissionMiddleware
+from app.core.middleware import HeadFastPathMiddleware, ReadYourWritesMiddleware
+from app.core.metrics import MetricsMiddleware, monitor_event_loop
+from app.core.logging_config import RequestIdMiddleware, setup_logging
 from app.models.user import User
 from app.db.init_db import init_db  # ADD THIS
+from app.db.events import PgEventListener, run_keepalive
+from app.db.session import engine, replicator
+from app.db.types import InvalidId
+from app.db.writer import use_write_queue, write_queue
+from app.services.archive_service import run_archive_job
+from app.services.memory_service import run_status_sweeper
+from app.services.rollup_service import run_rollup_job
+from sqlalchemy.exc import StatementError
+import asyncio
+import logging
+
+setup_logging()
+logger = logging.getLogger("app.main")
 
 # ADD THIS: Lifespan manager for startup/shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Initialize database
-    print("🚀 Initializing database...")
+    logger.info("Initializing database...")
     init_db()
-    print("✅ Database ready")
+    logger.info("Database ready")
+    loop_monitor = asyncio.create_task(monitor_event_loop())
+    # Off the loop and not awaited: pages render (compiling on demand) meanwhile
+    asyncio.get_running_loop().run_in_executor(None, warm_templates, templates.env)
+    if use_write_queue():
+        write_queue.start()
+    if replicator is not None:
+        replicator.start()
+    status_sweeper = asyncio.create_task(run_status_sweeper())
+    rollup_job = asyncio.create_task(run_rollup_job())
+    archive_job = asyncio.create_task(run_archive_job()) if settings.ARCHIVE_ENABLED else None
+    sse_keepalive = asyncio.create_task(run_keepalive())
+    event_listener = None
+    if settings.EVENTS_PG_NOTIFY and engine.dialect.name == "postgresql":
+        event_listener = PgEventListener(engine)
+        event_listener.start()
     yield
     # Shutdown: cleanup if needed
-    print("👋 Shutting down...")
+    if event_listener is not None:
+        event_listener.stop()
+    sse_keepalive.cancel()
+    if archive_job is not None:
+        archive_job.cancel()
+    rollup_job.cancel()
+    status_sweeper.cancel()
+    loop_monitor.cancel()
+    write_queue.stop()
+    if replicator is not None:
+        replicator.stop()
+    logger.info("Shutting down...")
 
 # UPDATE THIS LINE: Add lifespan
 app = FastAPI(
@@ -29,6 +73,17 @@ app = FastAPI(
 )
 
 templates = Jinja2Templates(directory="app/templates")
+configure_templates(templates.env)
+app.mount("/static", FingerprintedStaticFiles(directory=STATIC_DIR), name="static")
+
+# Pin a client's reads to the primary right after it writes
+app.add_middleware(ReadYourWritesMiddleware)
+# Per-client rate limits and a cap on requests in flight (429 / 503)
+app.add_middleware(AdmissionMiddleware)
+# Uptime pings send HEAD / - answer them without DB or template work
+app.add_middleware(HeadFastPathMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
 # Include routers
 app.include_router(auth.router)
@@ -37,6 +92,17 @@ app.include_router(feedback.router)
 app.include_router(analytics.router)
 app.include_router(topics.router)
 app.include_router(due_today.router)
+app.include_router(search.router)
+app.include_router(events.router)
+app.include_router(health.router)
+app.include_router(metrics.router)
+
+# A malformed id in a URL or body can't match any row
+@app.exception_handler(StatementError)
+async def statement_error_handler(request: Request, exc: StatementError):
+    if isinstance(exc.orig, InvalidId):
+        return JSONResponse(status_code=404, content={"detail": "Not found"})
+    raise exc
 
 @app.api_route("/", methods=["GET", "HEAD"], response_class=HTMLResponse)
 async def home(request: Request, user: User = Depends(get_current_user_optional)):
@@ -112,35 +178,13 @@ async def terms(request: Request):
     """Terms of Service"""
     return templates.TemplateResponse("terms.html", {"request": request})
 
-# Health check
+# Health check (kept for existing monitors - same cost as /health/ready)
 @app.get("/health")
-async def health_check():
+def health_check():
     """Health check endpoint for monitoring"""
-    
-    # Test database connection
-    try:
-        from app.db.session import SessionLocal
-        db = SessionLocal()
-        
-        # Count users to verify DB is working
-        from app.models.user import User
-        user_count = db.query(User).count()
-        
-        db.close()
-        
-        return {
-            "status": "healthy",
-            "environment": settings.ENVIRONMENT,
-            "database": "connected",
-            "database_type": "PostgreSQL" if "postgresql" in settings.DATABASE_URL else "SQLite",
-            "user_count": user_count
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "database": "disconnected"
-        }
+    payload, status_code = health.readiness_payload()
+    payload["status"] = "healthy" if status_code == 200 else "unhealthy"
+    return JSONResponse(content=payload, status_code=status_code)
 
 # Include HEAD method for pinging
 @app.head("/health")
@@ -1,24 +1,20 @@
-"""Force database migration to add missing tables"""
-from app.db.session import engine
+"""Force database migration to add missing tables and apply schema migrations"""
+from app.core.logging_config import setup_logging
 from app.db.base import Base
-
-# Import ALL models
-from app.models.user import User
-from app.models.oauth_token import OAuthToken
-from app.models.schedule import Schedule
-from app.models.feedback import Feedback
-from app.models.analytics import UserAnalytics
+from app.db.init_db import init_db
+from app.db.migrations import SCHEMA_VERSION
 
 def migrate():
-    print("🔄 Checking database tables...")
+    print("🔄 Checking database schema...")
     
-    # This will create any missing tables without dropping existing ones
-    Base.metadata.create_all(bind=engine)
+    # Creates missing tables and runs any pending migrations
+    init_db()
     
-    print("✅ Database migration complete!")
+    print(f"✅ Database migration complete (schema v{SCHEMA_VERSION})!")
     print("📊 Tables that should exist:")
     for table in Base.metadata.sorted_tables:
         print(f"   - {table.name}")
 
 if __name__ == "__main__":
+    setup_logging()
     migrate()